@@ -0,0 +1,107 @@
+"""
+Network scan timings against a fake neighbor table and a simulated subnet.
+
+Writes a /proc/net/arp-format table, then sweeps a /24 and a /16 with a fake
+probe: live hosts answer after a few ms, the rest time out after --timeout,
+like the real TCP probe against silent addresses. A real-socket sweep of
+127.0.0.0/24 (every address answers with a refusal) shows the per-probe
+overhead of the asyncio loop itself:
+
+    python -m benchmarks.bench_lan
+    python -m benchmarks.bench_lan --timeout 0.6 --concurrency 256 1024
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def write_fake_table(path: str, network: str, entries: int, seed: int = 0) -> list:
+    """A /proc/net/arp file with `entries` complete rows (plus one incomplete) using bundled vendor prefixes."""
+    from tools.neighbors import OUI_TABLE
+    rng = random.Random(seed)
+    prefixes = [line.split("\t")[0] for line in OUI_TABLE.read_text(encoding="utf-8").splitlines()
+                if line and not line.startswith("#")]
+    hosts = rng.sample(list(ipaddress.ip_network(network).hosts()), entries + 1)
+    rows = ["IP address       HW type     Flags       HW address            Mask     Device"]
+    for i, ip in enumerate(hosts):
+        p = rng.choice(prefixes)
+        mac = ":".join([p[0:2], p[2:4], p[4:6]] + [f"{rng.randrange(256):02x}" for _ in range(3)]).lower()
+        flags, mac = ("0x0", "00:00:00:00:00:00") if i == entries else ("0x2", mac)
+        rows.append(f"{ip}\t0x1\t{flags}\t{mac}\t*\teth0")
+    Path(path).write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return [str(ip) for ip in hosts[:entries]]
+
+
+def fake_probe(alive: set, timeout: float):
+    async def probe(ip: str) -> bool:
+        if ip in alive:
+            await asyncio.sleep(random.uniform(0.002, 0.02))
+            return True
+        await asyncio.sleep(timeout)
+        return False
+    return probe
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--timeout", type=float, default=0.1, help="simulated probe timeout for silent addresses (s)")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[256, 1024])
+    p.add_argument("--alive", type=int, default=40, help="live hosts per subnet")
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    from tools.neighbors import OUITable, discover, sweep, tcp_probe, read_proc_arp
+
+    table = os.path.join(tempfile.mkdtemp(prefix="q_bench_"), "arp")
+    oui = OUITable()  # bundled table only; the tool adds OUI_FILE from config
+    results = {"probe_timeout": args.timeout}
+
+    for network in ("192.168.1.0/24", "10.20.0.0/16"):
+        known = write_fake_table(table, network, entries=args.alive // 2)
+        start = time.perf_counter()
+        n_table = len(read_proc_arp(table))
+        table_ms = (time.perf_counter() - start) * 1000
+        alive = set(known) | set(random.Random(1).sample(
+            [ip for ip in map(str, ipaddress.ip_network(network).hosts()) if ip not in known],
+            args.alive - len(known)))
+        runs = {}
+        for concurrency in args.concurrency:
+            report = discover(do_sweep=True, network=network, arp_table=table, oui=oui,
+                              concurrency=concurrency, probe=fake_probe(alive, args.timeout))
+            hosts = 2 ** (32 - int(network.split("/")[1])) - 2
+            runs[str(concurrency)] = {
+                "sweep_seconds": round(report["sweep_seconds"], 2),
+                "floor_seconds": round(hosts / concurrency * args.timeout, 2),  # all-silent lower bound
+                "devices": len(report["devices"]),
+                "with_vendor": sum(1 for d in report["devices"] if d["vendor"]),
+            }
+        results[network] = {"table_entries": n_table, "table_read_ms": round(table_ms, 3), "sweeps": runs}
+
+    _, seconds = asyncio.run(sweep("127.0.0.0/24", lambda ip: tcp_probe(ip, ports=(9,), timeout=0.5), 256))
+    results["loopback_/24_real_sockets_seconds"] = round(seconds, 3)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Matrix mode cost: the in-app diff-rendering widget against the old full-frame loop.
+
+"frame" times one MatrixState step plus rebuilding the rows that changed, next to
+the old loop's per-frame work (fresh 2-D list, every row joined and printed).
+"textual" runs the real MatrixScreen headless for a few seconds per size and
+reports the FPS and process CPU% it settled on:
+
+    python -m benchmarks.bench_matrix
+    python -m benchmarks.bench_matrix --sizes 80x24 240x70 --seconds 5
+"""
+
+import io
+import random
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+from benchmarks.run_bench import distribution
+
+
+def legacy_frame(width: int, height: int, drops: list, chars: str, out) -> None:
+    """One frame of the old Windows script, minus os.system("cls")."""
+    screen = [[" " for _ in range(width)] for _ in range(height)]
+    for i in range(width):
+        if drops[i] < height:
+            screen[drops[i]][i] = random.choice(chars)
+        drops[i] += 1
+        if drops[i] > height and random.random() > 0.95:
+            drops[i] = 0
+    for row in screen:
+        print("".join(row), file=out)
+
+
+def bench_frames(width: int, height: int, frames: int) -> dict:
+    from core.matrix_view import MatrixState
+    state = MatrixState(width, height, seed=0)
+    for _ in range(height):  # fill the screen before measuring
+        state.step()
+    samples, changed_cells = [], []
+    for _ in range(frames):
+        start = time.perf_counter()
+        changed = state.step()
+        for y in np.flatnonzero(changed.any(axis=1)).tolist():
+            state.row_strip(y)
+        samples.append((time.perf_counter() - start) * 1000)
+        changed_cells.append(int(changed.sum()))
+
+    drops = [random.randint(0, height) for _ in range(width)]
+    legacy = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        legacy_frame(width, height, drops, "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ", io.StringIO())
+        legacy.append((time.perf_counter() - start) * 1000)
+    return {"diff_ms": distribution(samples), "legacy_full_ms": distribution(legacy),
+            "changed_fraction": sum(changed_cells) / len(changed_cells) / (width * height)}
+
+
+async def bench_textual(width: int, height: int, seconds: float) -> dict:
+    from textual.app import App
+    from core.matrix_view import MatrixScreen
+
+    class _Bench(App):
+        def on_mount(self):
+            self.push_screen(MatrixScreen())
+
+    app = _Bench()
+    async with app.run_test(size=(width, height)) as pilot:
+        await pilot.pause(seconds)
+        rain = app.screen.rain
+        cpu = rain._cpu_samples[1:] or rain._cpu_samples  # first second includes startup
+        return {"target_fps": round(rain._target, 1), "settled_fps": round(rain.fps, 1),
+                "measured_fps": round(rain.measured_fps, 1),
+                "cpu_percent": round(sum(cpu) / len(cpu), 1) if cpu else None,
+                "cells_per_frame": round(rain.cells / max(1, rain.frames))}
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--sizes", nargs="+", default=["80x24", "160x48", "320x90"])
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--seconds", type=float, default=4.0, help="headless Textual run per size (0 skips it)")
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    results = {}
+    for size in args.sizes:
+        width, height = (int(n) for n in size.lower().split("x"))
+        results[size] = {"frame": bench_frames(width, height, args.frames)}
+        if args.seconds > 0:
+            results[size]["textual"] = asyncio.run(bench_textual(width, height, args.seconds))
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
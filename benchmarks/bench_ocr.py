@@ -0,0 +1,169 @@
+"""
+Capture-to-text latency: the old two-step path (PNG written by capture_screenshot,
+decoded by read_latest_screenshot) against the in-memory read_screen path, cold
+and with the OCR cache warm, plus the tiled engine against full-frame OCR: cold,
+and re-reading after one line of text changed.
+
+Frames come from a generated text fixture by default so the numbers don't depend
+on what's on screen; --live grabs the real primary monitor instead (needs a display):
+
+    python -m benchmarks.bench_ocr
+    python -m benchmarks.bench_ocr --live --repeat 5
+    python -m benchmarks.bench_ocr --width 3840 --max-width 3840   # two-monitor sized frame
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from benchmarks.run_bench import distribution
+
+LOREM = ("The quick brown fox jumps over the lazy dog while the assistant reads "
+         "every line of this generated screen, one column after another.").split()
+
+
+def make_text_frame(width: int = 1920, height: int = 1080, font_size: int = 18, seed: int = 0) -> np.ndarray:
+    """A screen-like BGRA frame full of dark text on a light background."""
+    rng = np.random.default_rng(seed)
+    img = Image.new("RGB", (width, height), (245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    font = _font(font_size)
+    y = 10
+    while y < height - font_size:
+        words = rng.choice(LOREM, size=rng.integers(6, 14))
+        draw.text((20, y), " ".join(words), fill=(20, 20, 20), font=font)
+        y += int(font_size * 1.6)
+    rgb = np.asarray(img)
+    alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+    return np.concatenate([rgb[..., ::-1], alpha], axis=2)  # BGRA, like mss
+
+
+def _font(font_size: int):
+    try:
+        return ImageFont.load_default(size=font_size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def edit_line(frame: np.ndarray, line: int, text: str, font_size: int = 18) -> np.ndarray:
+    """Copy of a make_text_frame frame with one line of text replaced."""
+    img = Image.fromarray(np.ascontiguousarray(frame[..., 2::-1]))
+    y = 10 + line * int(font_size * 1.6)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, y - 2, img.width, y + font_size + 2), fill=(245, 245, 245))
+    draw.text((20, y), text, fill=(20, 20, 20), font=_font(font_size))
+    rgb = np.asarray(img)
+    return np.concatenate([rgb[..., ::-1], frame[..., 3:]], axis=2)
+
+
+def two_step(frame: np.ndarray, path: str) -> str:
+    """What capture_screenshot + read_latest_screenshot did: PNG encode, then decode and OCR."""
+    import mss.tools
+    import pytesseract
+    h, w = frame.shape[:2]
+    mss.tools.to_png(np.ascontiguousarray(frame[..., 2::-1]).tobytes(), (w, h), output=path)
+    return pytesseract.image_to_string(Image.open(path)).strip()
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return distribution(samples)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--live", action="store_true", help="grab the real screen instead of a fixture")
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.add_argument("--max-width", type=int, default=None, help="downscale frames wider than this (default: OCR_MAX_WIDTH)")
+    p.add_argument("--workers", type=int, default=None, help="tiled engine OCR workers (default: OCR_WORKERS)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    import pytesseract
+    from tools.OCR import MAX_WIDTH, OCR_WORKERS, TiledOCR, ocr_image, preprocess, _ocr_cache
+    max_width = args.max_width or MAX_WIDTH
+
+    if args.live:
+        from tools.screen_reader import grab
+        source = grab
+    else:
+        fixture = make_text_frame(args.width, args.height)
+        source = lambda: fixture  # noqa: E731
+
+    png_path = os.path.join(tempfile.mkdtemp(prefix="q_bench_"), "example.png")
+    _ocr_cache.clear()
+
+    def cold():
+        _ocr_cache.clear()
+        ocr_image(source(), max_width)
+
+    # Tiled vs full frame. "incremental" alternates between two frames that
+    # differ in a single line, like asking again after a chat message arrived.
+    engine = TiledOCR(workers=args.workers or OCR_WORKERS, max_width=max_width)
+    first = source()
+    frames = [first, first if args.live else edit_line(first, 3, "a new message just arrived on screen")]
+    turn = itertools.count()
+
+    def full_frame():
+        pytesseract.image_to_string(preprocess(source(), max_width))
+
+    # the tiled modes skip the whole-frame cache so they time the tiling itself
+    def tiled_cold():
+        engine.reset()
+        engine.read(source(), use_cache=False)
+
+    def tiled_incremental():
+        engine.read(frames[next(turn) % 2], use_cache=False)
+
+    results = {
+        "frame": "live" if args.live else f"fixture {args.width}x{args.height}",
+        "two_step_png": timed(lambda: two_step(source(), png_path), args.repeat),
+        "in_memory": timed(cold, args.repeat),
+        "in_memory_cached": timed(lambda: ocr_image(source(), max_width), args.repeat),
+        "capture_only": timed(source, args.repeat),
+        "full_frame": timed(full_frame, args.repeat),
+        "tiled_cold": timed(tiled_cold, args.repeat),
+    }
+    results["tiled_cached"] = timed(lambda: engine.read(source()), args.repeat)
+    engine.reset()
+    engine.read(frames[1], use_cache=False)  # prime, so every timed read is diffed against the other frame
+    engine.stats.clear()
+    results["tiled_incremental"] = timed(tiled_incremental, args.repeat)
+    results["tiled"] = {"workers": engine.workers, "tiles": len(engine.layout(np.asarray(preprocess(first, max_width)))),
+                        "incremental_stats": dict(engine.stats)}
+    full = results["full_frame"]["p50"]
+    results["speedup_vs_full_frame"] = {
+        mode: round(full / results[mode]["p50"], 2) if results[mode]["p50"] else None
+        for mode in ("tiled_cold", "tiled_incremental")
+    }
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
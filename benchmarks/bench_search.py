@@ -0,0 +1,91 @@
+"""
+Search-to-play latency for the Spotify track search, cold and warm.
+
+Runs query_best_song + start_playback against the fake Spotify Web API. The cold
+pass starts with an empty search cache, the warm pass repeats the same queries:
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --latency 0.12 --out search.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fake_spotify import FakeSpotify
+from benchmarks.run_bench import distribution
+
+QUERIES = [
+    "Blinding Lights by The Weeknd",
+    "nokia by drake",
+    "bohemian rhapsody",
+    "Levitating by Dua Lipa",
+    "as it was",
+    "hotline bling by drake",
+    "yellow by coldplay",
+    "take on me",
+]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--latency", type=float, default=0.05, help="fake Spotify per-request latency (s)")
+    p.add_argument("--max-tracks", type=int, default=100)
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def run_pass(player, spotify: FakeSpotify, queries, max_tracks: int) -> dict:
+    sp, _ = player.initiate_spotify_clients()
+    spotify.reset_counts()
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        _, _, _, uri, _ = player.query_best_song(query, max_tracks=max_tracks)
+        sp.start_playback(device_id="bench-device", uris=[uri])
+        latencies.append(time.perf_counter() - start)
+    return {"search_to_play": distribution(latencies), "calls_by_endpoint": dict(spotify.calls),
+            "search_calls_per_query": spotify.calls["search"] / len(queries)}
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    spotify = FakeSpotify(latency=args.latency).start()
+    data_dir = tempfile.mkdtemp(prefix="q_bench_")
+    os.environ.update({
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+        "OPENAI_MODEL_NAME": os.getenv("OPENAI_MODEL_NAME", "bench-strong"),
+        "DATA_DIR": data_dir,
+        "LOG_FILE": str(Path(data_dir) / "project.log"),
+        "METRICS_PORT": "0",
+        "SPOTIFY_API_PREFIX": spotify.prefix,
+        "SPOTIFY_ACCESS_TOKEN": "bench",
+    })
+
+    import tools.spotify_player as player
+    player.get_search_cache().clear()
+    results = {
+        "latency_per_request": args.latency,
+        "cold": run_pass(player, spotify, QUERIES, args.max_tracks),
+        "warm": run_pass(player, spotify, QUERIES, args.max_tracks),
+    }
+    spotify.stop()
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
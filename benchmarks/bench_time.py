@@ -0,0 +1,93 @@
+"""
+Time tool city lookup at full-table scale.
+
+Builds the real index (IANA zones, countries, assets/cities.tsv), pads it with
+synthetic city names up to --size entries (roughly what a GeoNames cities15000
+dump adds), then times exact, alias, prefix, typo and miss lookups:
+
+    python -m benchmarks.bench_time
+    python -m benchmarks.bench_time --size 150000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+from benchmarks.run_bench import distribution
+
+SYLLABLES = ("ka", "ro", "mi", "san", "ta", "ber", "lin", "vo", "grad", "po", "ri", "ville",
+             "dor", "es", "ul", "na", "chi", "ko", "bu", "ra", "stan", "ford", "wick", "ham")
+
+QUERIES = {
+    "exact": ["London", "Tokyo", "Buenos Aires", "Nairobi", "Reykjavik", "Germany"],
+    "alias": ["nyc", "bombay", "sf", "kiev", "uae", "saigon"],
+    "prefix": ["johannesb", "san fran", "kuala lum", "ho chi", "rio de", "addis ab"],
+    "typo": ["londn", "frankfrut", "new yrok", "sydeny", "barcelnoa", "stokholm"],
+    "miss": ["qqqqq", "xzxzxz", "zzyzx road", "notaplace"],
+}
+
+
+def synthetic_names(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(SYLLABLES), size=(n, 5))
+    lengths = rng.integers(3, 6, size=n)
+    return ["".join(SYLLABLES[j] for j in row[:k]).title() for row, k in zip(picks, lengths)]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--size", type=int, default=50000, help="index entries after padding")
+    p.add_argument("--repeat", type=int, default=200, help="lookups per query")
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    from tools.timezones import CityIndex, CITIES_FILE, add_iana, add_table, add_countries
+
+    start = time.perf_counter()
+    index = CityIndex()
+    add_iana(index)
+    add_table(index, CITIES_FILE)
+    add_countries(index)
+    index.freeze()
+    build_real = time.perf_counter() - start
+    real_size = len(index)
+
+    zones = ["Europe/Berlin", "America/Chicago", "Asia/Kolkata", "Africa/Lagos", "Asia/Tokyo"]
+    start = time.perf_counter()
+    for i, name in enumerate(synthetic_names(max(0, args.size - real_size))):
+        index.add(name, zones[i % len(zones)], "XX", population=i % 5000)
+    index.freeze()
+    build_padded = time.perf_counter() - start
+
+    results = {"entries": len(index), "bundled_entries": real_size,
+               "build_ms": {"bundled": build_real * 1000, "padding": build_padded * 1000}}
+    for kind, queries in QUERIES.items():
+        samples, found = [], 0
+        for query in queries:
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                place, _ = index.lookup(query)
+                samples.append((time.perf_counter() - t) * 1e6)
+            found += place is not None
+        results[f"{kind}_us"] = {**distribution(samples), "found": f"{found}/{len(queries)}"}
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Search-to-answer latency for the web search tool against a local fake backend.
+
+Each query goes through WebSearch + format_report, i.e. everything the
+duckduckgo_search tool does before its text reaches the user. Page fetches run
+sequentially (one worker) and concurrently, cold and with the cache warm:
+
+    python -m benchmarks.bench_web_search
+    python -m benchmarks.bench_web_search --page-latency 0.8 --slow-every 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fake_search import FakeSearch
+from benchmarks.run_bench import distribution
+
+QUERIES = [
+    "weather in paris today",
+    "latest tech news",
+    "who won the champions league",
+    "python 3.13 release notes",
+    "how tall is mount everest",
+    "current ai news",
+]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--search-latency", type=float, default=0.3)
+    p.add_argument("--page-latency", type=float, default=0.4)
+    p.add_argument("--slow-every", type=int, default=0, help="every Nth page hangs past the timeout (0: none)")
+    p.add_argument("--results", type=int, default=5)
+    p.add_argument("--fetch", type=int, default=3, help="pages read per query")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--timeout", type=float, default=2.0, help="per-page timeout (s)")
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def run_pass(searcher, fake: FakeSearch, args) -> dict:
+    from tools.web_search import format_report
+    fake.reset_counts()
+    latencies, chars = [], []
+    for query in QUERIES:
+        start = time.perf_counter()
+        report = searcher.search(query, n=args.results, fetch=args.fetch)
+        chars.append(len(format_report(report)))
+        latencies.append(time.perf_counter() - start)
+    return {"search_to_answer": distribution(latencies), "backend_calls": dict(fake.calls),
+            "answer_chars": distribution(chars)}
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    fake = FakeSearch(args.search_latency, args.page_latency, slow_every=args.slow_every,
+                      slow_latency=args.timeout * 3).start()
+
+    from tools.web_search import WebSearch, HTTPBackend
+    results = {"search_latency": args.search_latency, "page_latency": args.page_latency,
+               "fetch": args.fetch, "page_timeout": args.timeout}
+    for name, workers in (("sequential", 1), ("concurrent", args.workers)):
+        searcher = WebSearch(HTTPBackend(fake.url), workers=workers, page_timeout=args.timeout)
+        cold = run_pass(searcher, fake, args)
+        warm = run_pass(searcher, fake, args)
+        results[name] = {"workers": workers, "cold": cold, "warm": warm, "summary": searcher.summary()}
+    fake.stop()
+
+    seq, conc = results["sequential"]["cold"], results["concurrent"]["cold"]
+    results["concurrent_speedup"] = round(seq["search_to_answer"]["p50"] / conc["search_to_answer"]["p50"], 2)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
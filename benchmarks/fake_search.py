@@ -0,0 +1,107 @@
+"""
+Fake web search backend for benchmarks.
+
+`GET /search?q=...&n=...` answers like WEB_SEARCH_BACKEND expects (a JSON list
+of {title, href, body}) and every result links to a generated article page on
+the same server. Search and page requests each have their own latency, and one
+page in `slow_every` hangs for `slow_latency` so page timeouts get exercised.
+"""
+
+import json
+import time
+import zlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote
+
+_NAV = "".join(f"<li><a href='/section/{i}'>Section {i}</a></li>" for i in range(40))
+
+
+class FakeSearch:
+    def __init__(self, search_latency: float = 0.3, page_latency: float = 0.4, slow_every: int = 0,
+                 slow_latency: float = 10.0, host: str = "127.0.0.1", port: int = 0):
+        self.search_latency = search_latency
+        self.page_latency = page_latency
+        self.slow_every = slow_every
+        self.slow_latency = slow_latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return self.base + "/search"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+
+    # ---------------- CONTENT ----------------
+
+    def results(self, q: str, n: int) -> list:
+        return [{
+            "title": f"{q.title()} — result {i + 1}",
+            "href": f"{self.base}/page/{i}?q={quote(q)}",
+            "body": f"Snippet {i + 1} about {q}: the short summary a search engine shows under the link.",
+        } for i in range(n)]
+
+    def page(self, i: int, q: str) -> str:
+        body = "".join(
+            f"<p>Paragraph {p} of article {i} on {q}. It has enough words to look like real body text, "
+            f"which is what the extractor keeps while it drops menus.</p>" for p in range(30))
+        return (f"<html><head><title>{q} {i}</title><script>var x = 1;</script></head><body>"
+                f"<nav><ul>{_NAV}</ul></nav><article><h1>{q.title()}</h1>{body}</article>"
+                f"<footer>Copyright</footer></body></html>")
+
+    def _handler(self):
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, data: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                qs = parse_qs(url.query)
+                q = (qs.get("q") or [""])[0]
+                if url.path == "/search":
+                    time.sleep(fake.search_latency)
+                    with fake._lock:
+                        fake.calls["search"] += 1
+                    n = int((qs.get("n") or ["5"])[0])
+                    self._send(200, json.dumps(fake.results(q, n)).encode("utf-8"), "application/json")
+                elif url.path.startswith("/page/"):
+                    i = int(url.path.rsplit("/", 1)[1])
+                    slow = fake.slow_every and (zlib.crc32(q.encode("utf-8")) + i) % fake.slow_every == 0
+                    time.sleep(fake.slow_latency if slow else fake.page_latency)
+                    with fake._lock:
+                        fake.calls["page"] += 1
+                    self._send(200, fake.page(i, q).encode("utf-8"), "text/html; charset=utf-8")
+                else:
+                    self._send(404, b"", "text/plain")
+
+        return _Handler
@@ -0,0 +1,206 @@
+"""
+Fake Spotify Web API for benchmarks.
+
+Serves the endpoints the assistant's Spotify tools use, from a deterministic
+generated catalog, with optional per-request latency. Every call is counted
+per endpoint so benchmarks can report API calls per command. `fail_next()`
+makes the next requests answer with an error status (e.g. 429 + Retry-After).
+"""
+
+import json
+import time
+import zlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def _id(seed: str) -> str:
+    return f"{zlib.crc32(seed.encode('utf-8')):08x}".ljust(22, "0")
+
+
+def _artist(name: str) -> dict:
+    aid = _id("artist:" + name)
+    return {"id": aid, "name": name, "uri": f"spotify:artist:{aid}", "type": "artist"}
+
+
+def _track(name: str, artist: str) -> dict:
+    tid = _id(f"track:{name}:{artist}")
+    return {
+        "id": tid, "name": name, "uri": f"spotify:track:{tid}", "type": "track",
+        "artists": [_artist(artist)], "duration_ms": 200000,
+        "album": {"id": _id("album:" + name), "name": name},
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{tid}"},
+    }
+
+
+class FakeSpotify:
+    def __init__(self, latency: float = 0.05, playlists: int = 120, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.calls = Counter()
+        self.queue = []
+        self.playing = None
+        self._failures = []  # (status, retry_after) answered before routing, oldest first
+        # Liked Songs, newest first; tests remove items to simulate un-likes
+        self.saved = [{"added_at": f"2024-01-01T00:00:{59 - i:02d}Z", "track": _track(f"Saved {i}", "Bench Artist")}
+                      for i in range(50)]
+        self._lock = threading.Lock()
+        self.playlists = [{
+            "id": _id(f"playlist:{i}"), "name": f"Playlist {i}", "snapshot_id": f"snap-{i}-0",
+            "uri": f"spotify:playlist:{_id(f'playlist:{i}')}",
+            "tracks": {"total": 3},
+        } for i in range(playlists)]
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def prefix(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+
+    def fail_next(self, status: int = 429, retry_after: float | None = 1, times: int = 1):
+        """Answer the next `times` requests with `status` (and a Retry-After header if given)."""
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * times)
+
+    # ---------------- CATALOG ----------------
+
+    def search(self, q: str, limit: int, offset: int) -> dict:
+        title, _, artist = q.partition(" by ")
+        artist = artist or "Bench Artist"
+        items = [_track(title.title(), artist.title())]
+        items += [_track(f"{title.title()} (Remix {i})", f"Artist {i}") for i in range(1, 100)]
+        page = items[offset:offset + limit]
+        return {"tracks": {"items": page, "total": len(items), "limit": limit, "offset": offset,
+                           "next": None if offset + limit >= len(items) else "more"}}
+
+    def track(self, tid: str) -> dict:
+        return {**_track(f"Track {tid[:6]}", "Bench Artist"), "id": tid, "uri": f"spotify:track:{tid}"}
+
+    def related(self, aid: str) -> dict:
+        return {"artists": [_artist(f"Related {aid[:4]} {i}") for i in range(10)]}
+
+    def top_tracks(self, aid: str) -> dict:
+        return {"tracks": [_track(f"Top {aid[:4]} {i}", f"Artist {aid[:4]}") for i in range(10)]}
+
+    def playlist_tracks(self, pid: str, limit: int, offset: int) -> dict:
+        items = [{"added_at": "2024-01-01T00:00:00Z", "track": _track(f"{pid[:4]} Song {i}", "Bench Artist")}
+                 for i in range(3)]
+        return {"items": items[offset:offset + limit], "total": len(items), "next": None}
+
+    # ---------------- HTTP ----------------
+
+    def _route(self, method: str, path: str, query: dict):
+        q = {k: v[0] for k, v in query.items()}
+        limit, offset = int(q.get("limit", 20)), int(q.get("offset", 0))
+        parts = [p for p in path.split("/") if p][1:]  # drop "v1"
+        key = "/".join(parts)
+
+        if method == "GET" and key == "search":
+            return "search", 200, self.search(q.get("q", ""), limit, offset)
+        if key == "me/player/devices":
+            return "devices", 200, {"devices": [{"id": "bench-device", "name": "Bench", "is_active": True,
+                                                 "type": "Computer", "volume_percent": 50}]}
+        if method == "GET" and key == "me/player":
+            return "playback", 200, {"is_playing": self.playing is not None,
+                                     "item": self.playing, "device": {"id": "bench-device", "name": "Bench"}}
+        if method == "GET" and key == "me/player/queue":
+            return "queue", 200, {"currently_playing": self.playing, "queue": list(self.queue)}
+        if key == "me/player/play":
+            return "play", 204, None
+        if key == "me/player/pause":
+            return "pause", 204, None
+        if key == "me/player/next":
+            return "next", 204, None
+        if key == "me/player/queue":
+            self.queue.append({"uri": q.get("uri")})
+            return "add_to_queue", 204, None
+        if method == "GET" and key == "me/playlists":
+            items = self.playlists[offset:offset + limit]
+            nxt = None if offset + limit >= len(self.playlists) else (
+                f"{self.prefix}me/playlists?limit={limit}&offset={offset + limit}")
+            return "playlists", 200, {"items": items, "total": len(self.playlists), "limit": limit,
+                                      "offset": offset, "next": nxt}
+        if method == "GET" and key == "me/tracks":
+            items = list(self.saved)
+            nxt = None if offset + limit >= len(items) else (
+                f"{self.prefix}me/tracks?limit={limit}&offset={offset + limit}")
+            return "saved_tracks", 200, {"items": items[offset:offset + limit], "total": len(items),
+                                         "next": nxt}
+        if len(parts) == 2 and parts[0] == "tracks":
+            return "track", 200, self.track(parts[1])
+        if len(parts) == 3 and parts[0] == "artists" and parts[2] == "related-artists":
+            return "related_artists", 200, self.related(parts[1])
+        if len(parts) == 3 and parts[0] == "artists" and parts[2] == "top-tracks":
+            return "top_tracks", 200, self.top_tracks(parts[1])
+        # newer spotipy releases use /items, older ones /tracks
+        if len(parts) == 3 and parts[0] == "playlists" and parts[2] in ("tracks", "items"):
+            if method == "GET":
+                return "playlist_tracks", 200, self.playlist_tracks(parts[1], limit, offset)
+            return "playlist_add", 201, {"snapshot_id": "snap-added"}
+        if len(parts) == 2 and parts[0] == "playlists":
+            match = next((p for p in self.playlists if p["id"] == parts[1]), None)
+            return "playlist", 200 if match else 404, match or {"error": {"status": 404}}
+        return "unknown", 404, {"error": {"status": 404, "message": f"no fake for {method} {path}"}}
+
+    def _handler(self):
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                if length:
+                    self.rfile.read(length)
+                time.sleep(fake.latency)
+                with fake._lock:
+                    failure = fake._failures.pop(0) if fake._failures else None
+                if failure:
+                    status, retry_after = failure
+                    name, payload = f"error_{status}", {"error": {"status": status, "message": "fake failure"}}
+                else:
+                    retry_after = None
+                    name, status, payload = fake._route(method, url.path, parse_qs(url.query))
+                with fake._lock:
+                    fake.calls[name] += 1
+                data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header("Retry-After", str(retry_after))
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if data:
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_PUT(self):
+                self._serve("PUT")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def do_DELETE(self):
+                self._serve("DELETE")
+
+        return _Handler
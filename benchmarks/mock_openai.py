@@ -0,0 +1,139 @@
+"""
+Local OpenAI-compatible chat completions server for benchmarks.
+
+Streams SSE chunks with a configurable time-to-first-token and token rate.
+Replies come from a scenario script keyed on the last user message; a turn
+may instead answer with a tool call. Unknown prompts get a filler reply.
+"""
+
+import json
+import time
+import threading
+import itertools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.response_cache import normalize_prompt
+
+_FILLER = ("Sure, here is a short answer to that question so the benchmark has "
+           "something realistic to stream back token by token.")
+
+
+class MockOpenAI:
+    def __init__(self, script: dict | None = None, ttft: float = 0.25, tokens_per_sec: float = 60.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.script = {normalize_prompt(k): v for k, v in (script or {}).items()}
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _reply_for(self, body: dict) -> dict:
+        prompt = ""
+        for msg in reversed(body.get("messages", [])):
+            if msg.get("role") == "user":
+                prompt = normalize_prompt(msg.get("content") or "")
+                break
+        spec = self.script.get(prompt)
+        if spec is None:
+            return {"reply": _FILLER}
+        # only answer with a tool call when the client actually offered that tool
+        offered = {t["function"]["name"] for t in body.get("tools") or []}
+        if "tool_call" in spec and spec["tool_call"]["name"] not in offered:
+            return {"reply": spec.get("reply", _FILLER)}
+        return spec
+
+    def _handler(self):
+        mock = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                mock.requests += 1
+                spec = mock._reply_for(body)
+                model = body.get("model", "mock")
+                call_id = f"chatcmpl-{next(mock._ids)}"
+                if body.get("stream"):
+                    self._stream(spec, model, call_id)
+                else:
+                    self._complete(spec, model, call_id)
+
+            def _chunk(self, call_id, model, delta, finish=None):
+                payload = {"id": call_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                           "model": model,
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+                data = f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, spec, model, call_id):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(mock.ttft)
+                interval = 1.0 / mock.tokens_per_sec if mock.tokens_per_sec else 0.0
+                if "tool_call" in spec:
+                    call = spec["tool_call"]
+                    self._chunk(call_id, model, {"role": "assistant", "tool_calls": [{
+                        "index": 0, "id": f"call_{call_id}", "type": "function",
+                        "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+                    }]})
+                    finish = "tool_calls"
+                else:
+                    words = spec["reply"].split(" ")
+                    for i, w in enumerate(words):
+                        if i:
+                            time.sleep(interval)
+                        token = w + (" " if i < len(words) - 1 else "")
+                        self._chunk(call_id, model, {"role": "assistant", "content": token} if i == 0 else
+                                    {"content": token})
+                    finish = "stop"
+                self._chunk(call_id, model, {}, finish)
+                done = b"data: [DONE]\n\n"
+                self.wfile.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+                self.wfile.flush()
+
+            def _complete(self, spec, model, call_id):
+                time.sleep(mock.ttft)
+                message = {"role": "assistant", "content": spec.get("reply")}
+                if "tool_call" in spec:
+                    call = spec["tool_call"]
+                    message = {"role": "assistant", "content": None, "tool_calls": [{
+                        "id": f"call_{call_id}", "type": "function",
+                        "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+                    }]}
+                body = json.dumps({"id": call_id, "object": "chat.completion", "created": int(time.time()),
+                                   "model": model,
+                                   "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                                   "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}})
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return _Handler
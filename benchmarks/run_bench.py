@@ -0,0 +1,293 @@
+"""
+End-to-end benchmark.
+
+Boots the assistant's completion and tool path against local stand-ins (a mock
+OpenAI-compatible streaming server, a fake Spotify Web API and a stub or real
+TTS), runs scripted conversations, and writes JSON that can be diffed between
+commits:
+
+    python -m benchmarks.run_bench --out bench.json
+    python -m benchmarks.run_bench --ttft 0.4 --tokens-per-sec 30 --tts real
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import platform
+import tempfile
+import threading
+import subprocess
+import statistics
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import psutil
+from benchmarks.mock_openai import MockOpenAI
+from benchmarks.fake_spotify import FakeSpotify
+
+DEFAULT_SCENARIO = Path(__file__).resolve().parent / "scenarios" / "default.json"
+
+
+def load_scenario(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def build_script(scenario: dict) -> dict:
+    """Map each scripted user prompt to the mock server's reply or tool call."""
+    script = {}
+    for conv in scenario["conversations"]:
+        for turn in conv["turns"]:
+            script[turn["user"]] = {k: v for k, v in turn.items() if k != "user"}
+    return script
+
+
+def distribution(values) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pct(q):
+        return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+    return {"n": len(ordered), "mean": statistics.fmean(ordered), "p50": pct(0.5),
+            "p95": pct(0.95), "max": ordered[-1]}
+
+
+class ResourceMonitor:
+    """Samples this process's RSS in the background and CPU time over the run."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.proc = psutil.Process()
+        self.rss_peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.rss_peak = max(self.rss_peak, self.proc.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._cpu0 = self.proc.cpu_times()
+        self._t0 = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        cpu1 = self.proc.cpu_times()
+        self.wall = time.perf_counter() - self._t0
+        self.cpu_seconds = (cpu1.user - self._cpu0.user) + (cpu1.system - self._cpu0.system)
+        self.rss_final = self.proc.memory_info().rss
+        self.rss_peak = max(self.rss_peak, self.rss_final)
+
+    def report(self) -> dict:
+        return {"wall_seconds": self.wall, "cpu_seconds": self.cpu_seconds,
+                "cpu_percent": self.cpu_seconds / self.wall * 100 if self.wall else 0.0,
+                "rss_peak_mb": self.rss_peak / 1024 ** 2, "rss_final_mb": self.rss_final / 1024 ** 2}
+
+
+def make_tts(mode: str, seconds_per_char: float):
+    if mode == "none":
+        return None
+    if mode == "real":
+        from core.utils import get_tts
+        tts = get_tts()
+
+        def _real(text):
+            tts.tts(text=text, speaker="p347")
+        return _real
+
+    def _stub(text):
+        time.sleep(len(text) * seconds_per_char)
+    return _stub
+
+
+def run_turn(cfg, history: list, text: str, tts, spotify: FakeSpotify) -> dict:
+    """One turn through the same path as the TUI worker, minus the UI."""
+    from core.utils import stream_ai_response
+
+    trace = cfg.tracer.start_turn("bench")
+    history.append({"role": "user", "content": text})
+    messages_for_call = history.copy()
+    selected_tools, selection = cfg.tool_selector.select(messages_for_call)
+    route = cfg.model_router.route(messages_for_call, selected_tools)
+    spotify_before = sum(spotify.calls.values())
+
+    start = time.perf_counter()
+    warm = cfg.warmup.start(text, cfg.tool_map)
+    ttft, tokens, tools, cached, reply = None, 0, [], False, []
+    for event in stream_ai_response(messages_for_call, cfg.CLIENT, route.model, selected_tools,
+                                    history=history, trace=trace):
+        kind = event["type"]
+        if kind == "token":
+            tokens += 1
+            reply.append(event["text"])
+        elif kind == "timing" and event["stage"] == "first_token":
+            ttft = event["ttft"]
+            if not event["cached"]:  # a replay says nothing about the model's latency
+                cfg.tool_selector.record_ttft(selection, ttft)
+                cfg.model_router.record_ttft(route, ttft)
+        elif kind == "timing" and event["stage"] == "done":
+            cached = event["cached"]
+        elif kind == "tool_call" and warm:
+            warm.tool_called(event["name"])
+        elif kind == "tool_result":
+            tools.append({"name": event["name"], "ok": True})
+        elif kind == "tool_error":
+            tools.append({"name": event["name"], "ok": False, "error": str(event["error"])})
+        elif kind == "error":
+            tools.append({"name": "completion", "ok": False, "error": str(event["error"])})
+    stream_done = time.perf_counter() - start
+    if not cached:
+        cfg.model_router.record_turn(route)
+    if warm:
+        warm.finish(trace)
+
+    text_reply = "".join(reply)
+    if text_reply and not tools:
+        history.append({"role": "assistant", "content": text_reply})
+    if text_reply and tts is not None:
+        with trace.span("synthesis"):
+            tts(text_reply)
+        trace.mark("playback_start")
+    trace.finish()
+
+    return {
+        "user": text,
+        "model": route.model,
+        "ttft": ttft,
+        "stream_seconds": stream_done,
+        "turn_seconds": time.perf_counter() - start,
+        "tokens": tokens,
+        "cached": cached,
+        "tools": tools,
+        "schema_tokens_sent": selection.tools_tokens_sent,
+        "schema_tokens_saved": selection.tokens_saved,
+        "spotify_calls": sum(spotify.calls.values()) - spotify_before,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--scenario", type=Path, default=DEFAULT_SCENARIO)
+    p.add_argument("--repeat", type=int, default=3, help="times to run every conversation")
+    p.add_argument("--ttft", type=float, default=0.25, help="mock server time-to-first-token (s)")
+    p.add_argument("--tokens-per-sec", type=float, default=60.0, help="mock server token rate")
+    p.add_argument("--spotify-latency", type=float, default=0.05, help="fake Spotify per-request latency (s)")
+    p.add_argument("--tts", choices=("stub", "real", "none"), default="stub")
+    p.add_argument("--tts-seconds-per-char", type=float, default=0.002)
+    p.add_argument("--response-cache", action="store_true", help="enable RESPONSE_CACHE")
+    p.add_argument("--fast-model", default=None, help="route chit-chat to this model name")
+    p.add_argument("--no-warmup", action="store_true", help="disable speculative tool warm-up (TOOL_WARMUP=0)")
+    p.add_argument("--out", type=Path, default=None, help="write JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    scenario = load_scenario(args.scenario)
+    mock = MockOpenAI(build_script(scenario), ttft=args.ttft, tokens_per_sec=args.tokens_per_sec).start()
+    spotify = FakeSpotify(latency=args.spotify_latency).start()
+    data_dir = tempfile.mkdtemp(prefix="q_bench_")
+
+    # Configure before core.config is imported: it reads the environment at import time.
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_MODEL_NAME": "bench-strong",
+        "OPENAI_BASE_URL": mock.base_url,
+        "DATA_DIR": data_dir,
+        "LOG_FILE": str(Path(data_dir) / "project.log"),
+        "METRICS_PORT": "0",
+        "RESPONSE_CACHE": "1" if args.response_cache else "0",
+        "TOOL_WARMUP": "0" if args.no_warmup else "1",
+        "SPOTIFY_API_PREFIX": spotify.prefix,
+        "SPOTIFY_ACCESS_TOKEN": "bench",
+        # the "Spotify process" is this interpreter, so the launch path is skipped
+        "SPOTIFY_PROC": psutil.Process().name(),
+    })
+    if args.fast_model:
+        os.environ["OPENAI_FAST_MODEL_NAME"] = args.fast_model
+
+    import_start = time.perf_counter()
+    import core.config as cfg
+    import_seconds = time.perf_counter() - import_start
+    tts = make_tts(args.tts, args.tts_seconds_per_char)
+
+    turns = []
+    with ResourceMonitor() as monitor:
+        for _ in range(args.repeat):
+            for conv in scenario["conversations"]:
+                history = [cfg.messages[0]]
+                for turn in conv["turns"]:
+                    result = run_turn(cfg, history, turn["user"], tts, spotify)
+                    result["conversation"] = conv["name"]
+                    turns.append(result)
+
+    mock.stop()
+    spotify.stop()
+
+    tool_turns = [t for t in turns if t["tools"]]
+    stream_seconds = sum(t["stream_seconds"] for t in turns)
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "scenario": scenario.get("name", str(args.scenario)),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+            "config_import_seconds": import_seconds,
+            "tools_registered": sorted(cfg.tool_map),
+        },
+        "latency": {
+            "ttft": distribution([t["ttft"] for t in turns if t["ttft"] is not None]),
+            "stream": distribution([t["stream_seconds"] for t in turns]),
+            "turn": distribution([t["turn_seconds"] for t in turns]),
+            "tool_turn": distribution([t["turn_seconds"] for t in tool_turns]),
+        },
+        "throughput": {
+            "turns": len(turns),
+            "turns_per_second": len(turns) / monitor.wall if monitor.wall else 0.0,
+            "tokens_per_second": sum(t["tokens"] for t in turns) / stream_seconds if stream_seconds else 0.0,
+            "completion_requests": mock.requests,
+        },
+        "resources": monitor.report(),
+        "spotify": {
+            "calls_by_endpoint": dict(spotify.calls),
+            "calls_per_tool_turn": (sum(t["spotify_calls"] for t in tool_turns) / len(tool_turns)
+                                    if tool_turns else 0.0),
+        },
+        "tool_errors": [{"user": t["user"], **tool} for t in turns for tool in t["tools"] if not tool["ok"]],
+        "stages": {stage: {"n": n, "p50": p50, "p95": p95}
+                   for stage, (n, p50, p95) in cfg.tracer.stage_stats().items()},
+        "response_cache": cfg.response_cache.summary(),
+        "warmup": cfg.warmup.summary(),
+        "turns": turns,
+    }
+
+    text = json.dumps(results, indent=2, sort_keys=True, default=str)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ TTS playback.
 
 
 import os
+import threading
 import sounddevice as sd
 import soundfile as sf
 from core.utils import get_tts
@@ -14,7 +15,19 @@ ESPEAK_PATH = r"C:\Program Files\eSpeak NG\command-line"
 
 os.environ["PATH"] = ESPEAK_PATH + os.pathsep + os.environ.get("PATH", "")
 
-def initiate_tts(text="Sorry!>msiexec /i espeak-ng.msi Haven't quite caught that.", speaker_id = "p347", file_path = "assets/sounds/temp.wav"):
+# bytes of decoded waveform currently held by TTS threads (reported by /mem)
+_held_audio = {}
+_held_audio_lock = threading.Lock()
+
+
+def held_audio_bytes() -> int:
+    with _held_audio_lock:
+        return sum(_held_audio.values())
+
+def initiate_tts(text="Sorry!>msiexec /i espeak-ng.msi Haven't quite caught that.", speaker_id = "p347", file_path = "assets/sounds/temp.wav", trace=None):
+    """Synthesize and play `text`. If a turn trace is given, records synthesis/playback and finishes it."""
+    from core.tracing import NULL_TRACE
+    trace = trace or NULL_TRACE
     tts = get_tts()
 
     folder = os.path.dirname(file_path)
@@ -27,18 +40,27 @@ def initiate_tts(text="Sorry!>msiexec /i espeak-ng.msi Haven't quite caught that
         noise_scale = 0.7   # reduces robotic artifacts
         noise_scale_w = 0.8   # affects prosody
 
-        tts.tts_to_file(
-            text=text,
-            speaker=speaker_id,
-            file_path=file_path,
-            length_scale=length_scale,
-            noise_scale=noise_scale,
-            noise_scale_w=noise_scale_w
-        )
+        with trace.span("synthesis"):
+            tts.tts_to_file(
+                text=text,
+                speaker=speaker_id,
+                file_path=file_path,
+                length_scale=length_scale,
+                noise_scale=noise_scale,
+                noise_scale_w=noise_scale_w
+            )
 
         wav, sr = sf.read(file_path)
+        with _held_audio_lock:
+            _held_audio[threading.get_ident()] = wav.nbytes
         sd.play(wav, samplerate=sr)
+        trace.mark("playback_start")  # offset from the start of the turn
+        trace.finish()
         sd.wait()
 
     except Exception as e:
         print(f"TTS error: {e}")
+    finally:
+        with _held_audio_lock:
+            _held_audio.pop(threading.get_ident(), None)
+        trace.finish()
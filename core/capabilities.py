@@ -9,3 +9,9 @@ cap['sounddevice'] = importlib.util.find_spec('sounddevice') is not None
 cap['coqui_tts'] = importlib.util.find_spec('TTS') is not None
 cap['spotipy'] = importlib.util.find_spec('spotipy') is not None
 
+cap['pycaw'] = importlib.util.find_spec('pycaw') is not None
+cap['mss'] = importlib.util.find_spec('mss') is not None
+cap['pytesseract'] = importlib.util.find_spec('pytesseract') is not None and shutil.which('tesseract') is not None
+cap['duckduckgo_search'] = importlib.util.find_spec('duckduckgo_search') is not None
+cap['pytz'] = importlib.util.find_spec('pytz') is not None
+cap['pygetwindow'] = importlib.util.find_spec('pygetwindow') is not None
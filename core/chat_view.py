@@ -0,0 +1,145 @@
+"""
+Bounded chat log: keeps a fixed window of entries in memory, spills older ones
+to a JSONL file under DATA_DIR and pages them back in on scroll-back.
+"""
+
+import json
+import time
+from array import array
+from collections import deque
+from pathlib import Path
+from rich.text import Text
+from textual.widgets import RichLog
+
+
+def _encode(content) -> str:
+    if isinstance(content, Text):
+        return json.dumps({"m": content.markup}, ensure_ascii=False)
+    return json.dumps({"s": str(content)}, ensure_ascii=False)
+
+
+def _decode(line: str):
+    data = json.loads(line)
+    if "m" in data:
+        return Text.from_markup(data["m"])
+    return data.get("s", "")
+
+
+class ChatLog(RichLog):
+    """
+    RichLog with bounded memory. The newest `window` entries stay in memory;
+    older ones are appended to a per-session spill file and only their byte
+    offsets are kept. Scrolling to the top pages older entries back in; scrolling
+    to the bottom of a paged view moves forward again until it's live.
+    """
+
+    def __init__(self, *args, spill_dir: Path | None = None, window: int = 300,
+                 max_lines: int = 2000, keep_sessions: int = 10, **kwargs):
+        super().__init__(*args, max_lines=max_lines, **kwargs)
+        self.window = window
+        self.page = max(1, window // 2)
+        self._memory = deque()      # encoded entries, newest last
+        self._offsets = array("Q")  # byte offset of each spilled entry
+        self._spill_path = None
+        self._spill_file = None
+        self._view_start = None     # global index of first rendered entry; None = live
+        if spill_dir is not None:
+            spill_dir = Path(spill_dir)
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            old = sorted(spill_dir.glob("session-*.jsonl"))
+            for path in old[:max(0, len(old) - keep_sessions + 1)]:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._spill_path = spill_dir / f"session-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+    # ---------------- STORAGE ----------------
+
+    @property
+    def spilled(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def total_entries(self) -> int:
+        return self.spilled + len(self._memory)
+
+    def _spill(self, encoded: str):
+        if self._spill_path is None:
+            return  # no spill dir: behave like a plain bounded log
+        if self._spill_file is None:
+            self._spill_file = open(self._spill_path, "ab+")
+        self._spill_file.seek(0, 2)
+        self._offsets.append(self._spill_file.tell())
+        self._spill_file.write(encoded.encode("utf-8") + b"\n")
+        self._spill_file.flush()
+
+    def _entry(self, index: int):
+        if index >= self.spilled:
+            return _decode(self._memory[index - self.spilled])
+        self._spill_file.seek(self._offsets[index])
+        return _decode(self._spill_file.readline().decode("utf-8"))
+
+    def _store(self, content):
+        self._memory.append(_encode(content))
+        while len(self._memory) > self.window:
+            self._spill(self._memory.popleft())
+
+    # ---------------- RENDERING ----------------
+
+    def write(self, content, *args, **kwargs):
+        self._store(content)
+        if self._view_start is not None:
+            # new output snaps a paged-back view to live
+            self._render_range(self.spilled, self.total_entries, live=True)
+            return self
+        return super().write(content, *args, **kwargs)
+
+    def _render_range(self, start: int, end: int, live: bool = False, anchor: int | None = None,
+                      anchor_bottom: bool = False):
+        """Re-render entries [start, end); keep entry `anchor` at the top (or bottom) of the viewport."""
+        super().clear()
+        anchor_line = 0
+        for i in range(start, end):
+            if anchor is not None and i == anchor:
+                anchor_line = len(self.lines)
+            super().write(self._entry(i), scroll_end=False)
+        self._view_start = None if live else start
+        if live:
+            self.scroll_end(animate=False)
+        elif anchor_bottom:
+            self.scroll_to(y=max(0, anchor_line - self.scrollable_content_region.height), animate=False)
+        else:
+            self.scroll_to(y=anchor_line, animate=False)
+
+    def page_back(self):
+        start = self.spilled if self._view_start is None else self._view_start
+        if start <= 0 or self.spilled == 0:
+            return
+        new_start = max(0, start - self.page)
+        end = min(self.total_entries, new_start + self.window)
+        self._render_range(new_start, end, anchor=start)
+
+    def page_forward(self):
+        if self._view_start is None:
+            return
+        old_end = self._view_start + self.window
+        new_start = self._view_start + self.page
+        end = new_start + self.window
+        if end >= self.total_entries:
+            self._render_range(self.spilled, self.total_entries, live=True)
+        else:
+            self._render_range(new_start, end, anchor=old_end, anchor_bottom=True)
+
+    def on_mouse_scroll_up(self, event) -> None:
+        if self.scroll_y <= 0:
+            self.page_back()
+
+    def on_mouse_scroll_down(self, event) -> None:
+        if self._view_start is not None and self.scroll_y >= self.max_scroll_y:
+            self.page_forward()
+
+    def on_unmount(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
@@ -6,13 +6,28 @@ Global config and constants vars.
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import logging
 from openai import OpenAI
 import speech_recognition as sr
+from core.tool_selection import ToolSelector, compact_prompt
+from core.response_cache import ResponseCache
+from core.model_router import ModelRouter
+from core.tracing import Tracer
+from core.memprof import MemoryProfiler
+from core.warmup import Warmup
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data")).expanduser()
 
+# The TUI owns stdout, so diagnostics go to project.log.
+LOG_FILE = Path(os.getenv("LOG_FILE", BASE_DIR / "project.log")).expanduser()
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
 
 def get_env(name, required=False, default=None):
     val = os.getenv(name, default)
@@ -23,6 +38,8 @@ def get_env(name, required=False, default=None):
 OPENAI_API_KEY = get_env("OPENAI_API_KEY", required=True)
 OPENAI_MODEL_NAME = get_env("OPENAI_MODEL_NAME", required=True)
 OPENAI_BASE_URL = get_env("OPENAI_BASE_URL", default="https://api.openai.com/v1")
+# Optional cheaper/faster model for short chit-chat; unset routes everything to OPENAI_MODEL_NAME.
+OPENAI_FAST_MODEL_NAME = get_env("OPENAI_FAST_MODEL_NAME")
 
 CLIENT = OpenAI(
     base_url=OPENAI_BASE_URL,
@@ -43,7 +60,12 @@ else:
         MIC_INDEX = None
 
 recognizer = sr.Recognizer()
-mic = sr.Microphone(device_index=MIC_INDEX)
+try:
+    mic = sr.Microphone(device_index=MIC_INDEX)
+except (OSError, AttributeError) as e:
+    # no PyAudio / no input device (headless runs, benchmarks): chat mode still works
+    logging.getLogger(__name__).warning("microphone unavailable: %s", e)
+    mic = None
 
 # SPOTIFY CONSISTENTS -------------------
 
@@ -77,46 +99,101 @@ SPOTIFY_CACHE_FILE = str(SPOTIFY_CACHE_FILE.resolve())
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 REDIRECT_URI = "http://127.0.0.1:8888/callback"
-SCOPE = "user-read-playback-state user-modify-playback-state user-read-currently-playing user-read-private user-read-playback-state user-modify-playback-state playlist-modify-public playlist-modify-private"
-SPOTIFY_PROC = "Spotify.exe"
+SCOPE = "user-read-playback-state user-modify-playback-state user-read-currently-playing user-read-private user-read-playback-state user-modify-playback-state playlist-modify-public playlist-modify-private user-library-read playlist-read-private"
+SPOTIFY_PROC = os.getenv("SPOTIFY_PROC", "Spotify.exe")
+# Point the Web API at another host (e.g. the benchmark's fake Spotify) and skip OAuth
+# with a fixed bearer token. Leave both unset for the real API.
+SPOTIFY_API_PREFIX = os.getenv("SPOTIFY_API_PREFIX") or None
+SPOTIFY_ACCESS_TOKEN = os.getenv("SPOTIFY_ACCESS_TOKEN") or None
+# Shared token bucket for all Spotify Web API calls (requests/second, burst size).
+SPOTIFY_RATE = float(os.getenv("SPOTIFY_RATE", "10"))
+SPOTIFY_BURST = int(os.getenv("SPOTIFY_BURST", "20"))
+# Seconds before the playlist index refreshes itself (in the background).
+PLAYLIST_INDEX_TTL = float(os.getenv("PLAYLIST_INDEX_TTL", "600"))
+# Track search results are cached per normalized query.
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+# Opt-in SQLite mirror of saved tracks + playlists (DATA_DIR/spotify_library.sqlite3), checked before search.
+SPOTIFY_LIBRARY = os.getenv("SPOTIFY_LIBRARY", "0").strip().lower() in ("1", "true", "yes")
+LIBRARY_SYNC_INTERVAL = float(os.getenv("LIBRARY_SYNC_INTERVAL", "1800"))
+
+# Web search: results per query, how many of their pages to read, and the cache.
+# WEB_SEARCH_BACKEND=<url> swaps DuckDuckGo for a local stand-in (see benchmarks/fake_search.py).
+WEB_SEARCH_BACKEND = os.getenv("WEB_SEARCH_BACKEND") or None
+WEB_SEARCH_RESULTS = int(os.getenv("WEB_SEARCH_RESULTS", "5"))
+WEB_SEARCH_FETCH = int(os.getenv("WEB_SEARCH_FETCH", "2"))
+WEB_SEARCH_TTL = float(os.getenv("WEB_SEARCH_TTL", "600"))
+WEB_SEARCH_WORKERS = int(os.getenv("WEB_SEARCH_WORKERS", "4"))
+WEB_SEARCH_PAGE_TIMEOUT = float(os.getenv("WEB_SEARCH_PAGE_TIMEOUT", "4"))
+# Optional GeoNames cities*.txt dump; the time tool always knows IANA zones, countries and assets/cities.tsv.
+TIME_CITIES_FILE = os.getenv("TIME_CITIES_FILE") or None
+# Network scan: probes in flight during a subnet sweep, an alternate neighbor table
+# (/proc/net/arp format, e.g. a fake one for testing) and the full IEEE oui.csv if you have it.
+LAN_SCAN_CONCURRENCY = int(os.getenv("LAN_SCAN_CONCURRENCY", "256"))
+ARP_TABLE = os.getenv("ARP_TABLE") or None
+OUI_FILE = os.getenv("OUI_FILE") or None
 
 
 def get_tools():
-    """Return tools and openai_tools, lazily imported to avoid circular imports."""
-    from tools.spotify_player import (query_and_play_track,
-                                  stop_current_playback,
-                                  play_next_track, 
-                                  play_user_playlist,
-                                  add_song_to_playlist)
-    from tools.tools import tool_to_openai, change_volume
-
-    tools = [
-            query_and_play_track,
-            stop_current_playback,
-            change_volume,
-            play_next_track,
-            play_user_playlist,
-            add_song_to_playlist]
-
-    openai_tools = [tool_to_openai(t) for t in tools]
+    """Return tools and openai_tools from the lazy registry; tool modules import on first use."""
+    from tools.registry import discover_tools
+
+    tools = discover_tools(cache_file=DATA_DIR / "tool_registry.json")
+
+    openai_tools = [t.schema for t in tools]
 
     tool_map = {t.name: t for t in tools}
     return tools, openai_tools, tool_map
 
 tools, openai_tools, tool_map = get_tools()
 
+# Attach only the schemas relevant to each turn; TOOL_SELECTION=0 sends all of them.
+TOOL_SELECTION = os.getenv("TOOL_SELECTION", "1").strip().lower() not in ("0", "false", "no")
+tool_selector = ToolSelector(openai_tools, enabled=TOOL_SELECTION)
+
+# Optional reply cache for repeated questions (RESPONSE_CACHE=1).
+response_cache = ResponseCache(
+    enabled=os.getenv("RESPONSE_CACHE", "0").strip().lower() in ("1", "true", "yes"),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+)
+
+# Start likely tools' warm_up() (e.g. launching Spotify) while the completion streams.
+warmup = Warmup(enabled=os.getenv("TOOL_WARMUP", "1").strip().lower() not in ("0", "false", "no"))
+
+model_router = ModelRouter(
+    OPENAI_MODEL_NAME,
+    fast_model=OPENAI_FAST_MODEL_NAME,
+    slow_ttft=float(os.getenv("ROUTER_SLOW_TTFT", "3.0")),
+)
+
+# Per-turn stage timings: DATA_DIR/traces/traces.jsonl, /stats in the TUI, and /metrics
+# on METRICS_PORT (unset/0: no endpoint; 9464 is the usual exporter port).
+tracer = Tracer(DATA_DIR / "traces" / "traces.jsonl")
+METRICS_PORT = int(os.getenv("METRICS_PORT") or 0)
+
+# Opt-in tracemalloc snapshots + RSS/object counts (MEMPROF=1); /mem in the TUI.
+memprof = MemoryProfiler(
+    DATA_DIR / "memprof",
+    enabled=os.getenv("MEMPROF", "0").strip().lower() in ("1", "true", "yes"),
+    interval=float(os.getenv("MEMPROF_INTERVAL", "300")),
+)
+
+# The running TerminalGUI (set on mount), for tools that show something in-app like matrix_mode.
+ui = None
+
 # ---------------- GLOBALS ----------------
 _global_tts = None
 last_3_lines=["","",""] 
 TRIGGER_WORD = "Supporter"
 CONVERSATION_TIMEOUT = 30 # seconds of inactivity before exiting conversation mode
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "300")) # chat entries kept in memory; older ones spill to DATA_DIR/chat_logs
 WINFETCH_TIMEOUT = 5 
 chat_mode = True
 
 # ---------------- MESSAGES ---------------
 
-messages=[
-    {"role": "system", "content": """You are 'Supporter', a smart and friendly AI assistant.
+SYSTEM_PROMPT = compact_prompt("""You are 'Supporter', a smart and friendly AI assistant.
             You can chat casually, answer questions, give advice, perform web searches, and assist with tasks.
             Only use specialized tools when explicitly needed.
 
@@ -144,6 +221,8 @@ messages=[
 
 Always be friendly and helpful. Only invoke Spotify when the user clearly requests it.
     - While answering, don't use asterisk (*) for non-mathematical purposes.
-"""},
-    
+""")
+
+messages=[
+    {"role": "system", "content": SYSTEM_PROMPT},
 ]
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Matrix rain drawn inside the GUI (the matrix_mode tool and /matrix).
+
+`MatrixState` keeps the rain in a few NumPy arrays (glyph and age per cell,
+head position/speed/trail length per column) and reports which cells changed
+each step. `MatrixRain` is a line-API widget that only rebuilds and refreshes
+the row spans that changed, picks its frame rate from the terminal size, and
+backs off when the process uses more CPU than its budget.
+"""
+
+import time
+import numpy as np
+from rich.segment import Segment
+from rich.style import Style
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.geometry import Region
+from textual.screen import Screen
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.widgets import Static
+
+CHARSET = "ｱｲｳｴｵｶｷｸｹｺｻｼｽｾｿﾀﾁﾂﾃﾄﾅﾆﾇﾈﾉﾊﾋﾌﾍﾎﾏﾐﾑﾒﾓﾔﾕﾖﾗﾘﾙﾚﾛﾜﾝ0123456789Z:.=*+-<>|"
+# code points with index 0 = blank, so a row's text is one vectorized lookup + decode
+_CODEPOINTS = np.array([ord(" ")] + [ord(c) for c in CHARSET], dtype="<u4")
+
+# Brightness buckets: 0 blank, 1 dim, 2 mid, 3 bright, 4 head
+STYLES = [
+    Style(bgcolor="black"),
+    Style(color="#005f00", bgcolor="black"),
+    Style(color="#00af00", bgcolor="black"),
+    Style(color="#33ff33", bgcolor="black"),
+    Style(color="#e0ffe0", bgcolor="black", bold=True),
+]
+
+_SATURATED = np.iinfo(np.uint16).max
+
+
+class MatrixState:
+    def __init__(self, width: int, height: int, trail=(6, 24), speed=(0.3, 1.0),
+                 mutate: float = 0.01, seed=None):
+        self.trail_range = trail
+        self.speed_range = speed
+        self.mutate = mutate
+        self.rng = np.random.default_rng(seed)
+        self.resize(width, height)
+
+    def resize(self, width: int, height: int):
+        self.width, self.height = max(1, width), max(1, height)
+        w, h = self.width, self.height
+        self.glyph = self.rng.integers(0, len(CHARSET), size=(h, w), dtype=np.uint8)
+        self.age = np.full((h, w), _SATURATED, dtype=np.uint16)  # frames since the head left the cell
+        self.bucket = np.zeros((h, w), dtype=np.uint8)
+        self.head = -self.rng.uniform(0, h, size=w).astype(np.float32)
+        self.speed = self.rng.uniform(*self.speed_range, size=w).astype(np.float32)
+        self.trail = self.rng.integers(*self.trail_range, size=w).astype(np.float32)
+        self._cols = np.arange(w)
+
+    def _respawn(self, cols: np.ndarray):
+        n = len(cols)
+        self.head[cols] = -self.rng.uniform(0, self.height / 2, size=n)
+        self.speed[cols] = self.rng.uniform(*self.speed_range, size=n)
+        self.trail[cols] = self.rng.integers(*self.trail_range, size=n)
+
+    def step(self) -> np.ndarray:
+        """Advance one frame. Returns a bool HxW mask of cells whose text or style changed."""
+        before = self.head.astype(np.int32)
+        self.head += self.speed
+        after = self.head.astype(np.int32)
+
+        np.add(self.age, 1, out=self.age, where=self.age < _SATURATED)
+        moved = (after > before) & (after >= 0) & (after < self.height)
+        cols = self._cols[moved]
+        rows = after[moved]
+        self.age[rows, cols] = 0
+        self.glyph[rows, cols] = self.rng.integers(0, len(CHARSET), size=len(cols))
+
+        # a column's trail lasts trail/speed frames; brightness falls off along it
+        fade = self.age / (self.trail / self.speed)
+        bucket = np.select([self.age == 0, fade < 0.25, fade < 0.6, fade < 1.0], [4, 3, 2, 1], 0).astype(np.uint8)
+        changed = bucket != self.bucket
+        self.bucket = bucket
+
+        if self.mutate:
+            flicker = (self.rng.random(bucket.shape) < self.mutate) & (bucket > 0)
+            self.glyph[flicker] = self.rng.integers(0, len(CHARSET), size=int(flicker.sum()))
+            changed |= flicker
+
+        done = self.head - self.trail > self.height
+        if done.any():
+            self._respawn(self._cols[done])
+        return changed
+
+    def row_strip(self, y: int) -> Strip:
+        bucket = self.bucket[y]
+        text = _CODEPOINTS[np.where(bucket > 0, self.glyph[y] + 1, 0)].tobytes().decode("utf-32-le")
+        cuts = (np.flatnonzero(bucket[1:] != bucket[:-1]) + 1).tolist()
+        starts = [0, *cuts]
+        styles = bucket[starts].tolist()
+        return Strip([Segment(text[a:b], STYLES[k]) for a, b, k in zip(starts, cuts + [len(text)], styles)], len(text))
+
+
+class MatrixRain(Widget):
+    DEFAULT_CSS = """
+    MatrixRain { width: 1fr; height: 1fr; background: black; }
+    """
+
+    REF_CELLS = 80 * 24  # terminal size that gets max_fps
+
+    def __init__(self, max_fps: float = 30, min_fps: float = 6, cpu_budget: float = 25.0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.cpu_budget = cpu_budget  # % of one core for the whole process before backing off
+        self.state = MatrixState(80, 24)
+        self.fps = max_fps
+        self._target = max_fps
+        self._timer = None
+        self._strips = {}
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.cells = 0
+        self.measured_fps = 0.0
+        self.cpu = 0.0
+        self._cpu_samples = []
+        self._window = (time.perf_counter(), time.process_time(), 0)
+
+    def on_mount(self):
+        self._schedule()
+        self.set_interval(1.0, self._measure)
+
+    def on_resize(self, event):
+        self.state.resize(event.size.width, event.size.height)
+        self._strips.clear()
+        # cost grows with cells; keep frames x cells roughly flat past REF_CELLS
+        cells = self.state.width * self.state.height
+        self._target = max(self.min_fps, min(self.max_fps, self.max_fps * (self.REF_CELLS / cells) ** 0.5))
+        self.fps = min(self.fps, self._target) if self.frames else self._target
+        self._schedule()
+        self.refresh()
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.stop()
+        self._timer = self.set_interval(1 / self.fps, self._tick)
+
+    def _tick(self):
+        changed = self.state.step()
+        rows = np.flatnonzero(changed.any(axis=1))
+        regions = []
+        for y in rows.tolist():
+            xs = np.flatnonzero(changed[y])
+            self._strips.pop(y, None)
+            regions.append(Region(int(xs[0]), y, int(xs[-1] - xs[0] + 1), 1))
+        if regions:
+            self.refresh(*regions)
+        self.frames += 1
+        self.cells += int(changed.sum())
+
+    def _measure(self):
+        """Once a second: actual FPS and process CPU%, and nudge the frame rate toward the budget."""
+        wall, cpu, frames = self._window
+        now, now_cpu = time.perf_counter(), time.process_time()
+        self.measured_fps = (self.frames - frames) / max(1e-6, now - wall)
+        self.cpu = (now_cpu - cpu) / max(1e-6, now - wall) * 100
+        self._cpu_samples.append(self.cpu)
+        self._window = (now, now_cpu, self.frames)
+        fps = self.fps
+        if self.cpu > self.cpu_budget:
+            fps = max(self.min_fps, fps * 0.8)
+        elif self.cpu < self.cpu_budget / 2:
+            fps = min(self._target, fps * 1.25)
+        if abs(fps - self.fps) / self.fps > 0.1:
+            self.fps = fps
+            self._schedule()
+
+    def render_line(self, y: int) -> Strip:
+        if y >= self.state.height:
+            return Strip.blank(self.size.width, STYLES[0])
+        strip = self._strips.get(y)
+        if strip is None:
+            strip = self._strips[y] = self.state.row_strip(y)
+        return strip
+
+    def status(self) -> str:
+        per_frame = self.cells / self.frames if self.frames else 0
+        return (f"{self.measured_fps:.1f} fps (target {self.fps:.0f}) · {self.cpu:.0f}% CPU · "
+                f"{per_frame:.0f} cells/frame of {self.state.width * self.state.height}")
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        cpu = sum(self._cpu_samples) / len(self._cpu_samples) if self._cpu_samples else 0.0
+        per_frame = self.cells / self.frames if self.frames else 0
+        return (f"Matrix: {elapsed:.0f}s at {self.frames / max(elapsed, 1e-6):.1f} fps avg, "
+                f"{cpu:.0f}% CPU avg, {per_frame:.0f} cells redrawn per frame "
+                f"({self.state.width}x{self.state.height})")
+
+
+class MatrixScreen(Screen):
+    """Full-screen rain; Escape dismisses it with the run's summary."""
+
+    BINDINGS = [Binding("escape", "exit", "Exit"), Binding("s", "toggle_status", "Stats")]
+    DEFAULT_CSS = """
+    MatrixScreen { background: black; }
+    #matrix_status { dock: bottom; height: 1; color: #00af00; background: black; }
+    """
+
+    def compose(self) -> ComposeResult:
+        self.rain = MatrixRain()
+        yield self.rain
+        yield Static("Esc to exit · s to hide stats", id="matrix_status")
+
+    def on_mount(self):
+        self.set_interval(1.0, self._update_status)
+
+    def _update_status(self):
+        status = self.query_one("#matrix_status", Static)
+        if status.display:
+            status.update(self.rain.status() + " · Esc to exit")
+
+    def action_toggle_status(self):
+        status = self.query_one("#matrix_status", Static)
+        status.display = not status.display
+
+    def action_exit(self):
+        self.dismiss(self.rain.summary())
@@ -0,0 +1,139 @@
+"""
+Opt-in memory instrumentation: periodic tracemalloc snapshots, RSS tracking
+and per-subsystem object counts.
+"""
+
+import time
+import logging
+import threading
+import tracemalloc
+from collections import deque
+from pathlib import Path
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by the profiler itself or the import machinery are noise.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryProfiler:
+    """
+    When enabled, starts tracemalloc and takes a snapshot every `interval`
+    seconds. Each snapshot is dumped to `snapshot_dir` (load them with
+    tracemalloc.Snapshot.load for offline comparison); only the newest
+    `keep` files are kept. `report()` compares the latest two snapshots.
+    """
+
+    def __init__(self, snapshot_dir: Path, enabled: bool = False, interval: float = 300.0,
+                 frames: int = 10, keep: int = 20):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.enabled = enabled
+        self.interval = interval
+        self.frames = frames
+        self.keep = keep
+        self._counters = {}  # name -> callable returning a number
+        self._proc = psutil.Process()
+        self._lock = threading.Lock()
+        self._prev = None
+        self._last = None
+        self._history = deque(maxlen=288)  # (ts, rss, counters)
+        self._stop = threading.Event()
+        self._seq = 0
+
+    def register(self, name: str, fn):
+        """Track a per-subsystem count, e.g. register("history entries", lambda: len(messages))."""
+        self._counters[name] = fn
+
+    def counts(self) -> dict:
+        out = {}
+        for name, fn in self._counters.items():
+            try:
+                out[name] = fn()
+            except Exception:
+                out[name] = None
+        return out
+
+    def start(self):
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        threading.Thread(target=self._run, daemon=True).start()
+        logger.info("memory profiling on: snapshots every %.0fs in %s", self.interval, self.snapshot_dir)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.warning("memory snapshot failed: %s", e)
+
+    def snapshot(self):
+        """Take, record and dump a snapshot now."""
+        snap = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        rss = self._proc.memory_info().rss
+        counts = self.counts()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._prev, self._last = self._last, snap
+            self._history.append((time.time(), rss, counts))
+        path = self.snapshot_dir / f"memprof-{time.strftime('%Y%m%d-%H%M%S')}-{seq:04d}.snap"
+        snap.dump(str(path))
+        old = sorted(self.snapshot_dir.glob("memprof-*.snap"))
+        for stale in old[:max(0, len(old) - self.keep)]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+        logger.info("memory snapshot %s: rss=%.0fMB %s", path.name, rss / 1024 ** 2, counts)
+        return snap
+
+    def report(self, top: int = 10) -> str:
+        if not self.enabled:
+            return "Memory profiling is off (set MEMPROF=1 to enable)."
+        self.snapshot()
+        with self._lock:
+            prev, last = self._prev, self._last
+            history = list(self._history)
+
+        ts, rss, counts = history[-1]
+        lines = [f"RSS: {rss / 1024 ** 2:.1f}MB"]
+        if len(history) > 1:
+            _, rss0, counts0 = history[-2]
+            lines[0] += f" ({(rss - rss0) / 1024 ** 2:+.1f}MB since last snapshot)"
+        else:
+            counts0 = {}
+        for name, value in counts.items():
+            before = counts0.get(name)
+            delta = ""
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)):
+                delta = f" ({value - before:+})"
+            lines.append(f"  {name}: {value}{delta}")
+
+        traced, peak = tracemalloc.get_traced_memory()
+        lines.append(f"Traced: {traced / 1024 ** 2:.1f}MB (peak {peak / 1024 ** 2:.1f}MB)")
+        lines.append("Top allocation sites (size, growth since last snapshot):")
+        if prev is not None:
+            stats = last.compare_to(prev, "lineno")
+            stats.sort(key=lambda s: s.size, reverse=True)
+            for stat in stats[:top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size / 1024:>9.1f}KB {stat.size_diff / 1024:>+9.1f}KB  "
+                             f"{frame.filename}:{frame.lineno}")
+        else:
+            for stat in last.statistics("lineno")[:top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size / 1024:>9.1f}KB  {frame.filename}:{frame.lineno}")
+        lines.append(f"Snapshots: {self.snapshot_dir}")
+        return "\n".join(lines)
@@ -0,0 +1,171 @@
+"""
+Routes each turn to a fast or a strong model from local heuristics and measured latency.
+"""
+
+import re
+import time
+import logging
+import threading
+import statistics
+from collections import deque
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Words that suggest the turn needs the strong model even when it's short.
+_COMPLEX_HINTS = ("explain", "why", "how", "compare", "difference", "code", "write", "summarize",
+                  "summarise", "plan", "analyze", "analyse", "translate", "calculate", "debug", "step")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    started_at: float = field(default_factory=time.perf_counter)
+    ttft: float | None = None
+    fallback_from: str | None = None
+
+
+class _ModelHealth:
+    def __init__(self, window: int):
+        self.ttft = deque(maxlen=window)  # (monotonic timestamp, seconds)
+        self.errors = deque(maxlen=window)  # monotonic timestamps
+        self.cooldown_until = 0.0
+        self.probed_at = 0.0  # last turn sent here despite looking slow
+
+
+class ModelRouter:
+    """
+    Sends short chit-chat to `fast_model` and tool use / complex questions to
+    `strong_model`. A model is skipped while it's cooling down after repeated
+    errors, or when its median TTFT exceeds `slow_ttft` and the other one is faster.
+    TTFT samples expire after `ttft_max_age`, and a model skipped for being slow
+    gets one turn every `probe_interval` so it can show it has recovered. Turns
+    with tools never leave the strong model over latency alone.
+    With no fast model configured every turn goes to the strong one.
+    """
+
+    def __init__(self, strong_model: str, fast_model: str | None = None, max_fast_words: int = 12,
+                 slow_ttft: float = 3.0, error_limit: int = 2, error_window: float = 120.0,
+                 cooldown: float = 60.0, window: int = 20, ttft_max_age: float = 600.0,
+                 probe_interval: float = 60.0):
+        self.strong_model = strong_model
+        self.fast_model = fast_model if fast_model and fast_model != strong_model else None
+        self.max_fast_words = max_fast_words
+        self.slow_ttft = slow_ttft
+        self.error_limit = error_limit
+        self.error_window = error_window
+        self.cooldown = cooldown
+        self.ttft_max_age = ttft_max_age
+        self.probe_interval = probe_interval
+        self._window = window
+        self._health = {}
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def _h(self, model: str) -> _ModelHealth:
+        if model not in self._health:
+            self._health[model] = _ModelHealth(self._window)
+        return self._health[model]
+
+    def median_ttft(self, model: str) -> float | None:
+        cutoff = time.monotonic() - self.ttft_max_age
+        with self._lock:
+            samples = [s for t, s in self._h(model).ttft if t >= cutoff]
+        return statistics.median(samples) if samples else None
+
+    def _available(self, model: str) -> bool:
+        with self._lock:
+            return self._h(model).cooldown_until <= time.monotonic()
+
+    def _slow(self, model: str, other: str) -> bool:
+        mine, theirs = self.median_ttft(model), self.median_ttft(other)
+        return mine is not None and mine > self.slow_ttft and (theirs is None or theirs < mine)
+
+    def _probe_due(self, model: str) -> bool:
+        """True (and claims the probe) if `model` hasn't had a turn for probe_interval."""
+        now = time.monotonic()
+        with self._lock:
+            h = self._h(model)
+            last = max(h.probed_at, h.ttft[-1][0] if h.ttft else 0.0)
+            if now - last < self.probe_interval:
+                return False
+            h.probed_at = now
+            return True
+
+    def route(self, messages, selected_tools=None) -> RouteDecision:
+        if not self.fast_model:
+            return self._decide(RouteDecision(self.strong_model, "single model"))
+
+        text = ""
+        for msg in reversed(messages):
+            if msg.get("role") == "user":
+                text = (msg.get("content") or "").lower()
+                break
+        words = _WORD_RE.findall(text)
+
+        if selected_tools:
+            preferred, reason = self.strong_model, "tools attached"
+        elif len(words) > self.max_fast_words:
+            preferred, reason = self.strong_model, f"{len(words)} words"
+        elif any(w in _COMPLEX_HINTS for w in words):
+            preferred, reason = self.strong_model, "complex question"
+        else:
+            preferred, reason = self.fast_model, "chit-chat"
+
+        other = self.strong_model if preferred == self.fast_model else self.fast_model
+        if not self._available(preferred) and self._available(other):
+            return self._decide(RouteDecision(other, f"{reason}; {preferred} cooling down", fallback_from=preferred))
+        if preferred == self.strong_model and selected_tools:
+            return self._decide(RouteDecision(preferred, reason))  # the fast model may not handle the tools
+        if self._slow(preferred, other) and self._available(other):
+            if self._probe_due(preferred):
+                return self._decide(RouteDecision(preferred, f"{reason}; re-probing slow {preferred}"))
+            return self._decide(RouteDecision(other, f"{reason}; {preferred} slow", fallback_from=preferred))
+        return self._decide(RouteDecision(preferred, reason))
+
+    def _decide(self, decision: RouteDecision) -> RouteDecision:
+        with self._lock:
+            self.counts[decision.model] = self.counts.get(decision.model, 0) + 1
+        return decision
+
+    def fallback(self, decision: RouteDecision) -> RouteDecision:
+        """Pick the other model after `decision.model` failed mid-turn."""
+        if not self.fast_model:
+            return RouteDecision(self.strong_model, "retry", fallback_from=decision.model)
+        other = self.strong_model if decision.model == self.fast_model else self.fast_model
+        return self._decide(RouteDecision(other, f"fallback after {decision.model} error", fallback_from=decision.model))
+
+    def record_ttft(self, decision: RouteDecision, ttft: float):
+        decision.ttft = ttft
+        with self._lock:
+            self._h(decision.model).ttft.append((time.monotonic(), ttft))
+
+    def record_error(self, decision: RouteDecision, error: Exception):
+        now = time.monotonic()
+        with self._lock:
+            h = self._h(decision.model)
+            h.errors.append(now)
+            recent = [t for t in h.errors if now - t <= self.error_window]
+            if len(recent) >= self.error_limit:
+                h.cooldown_until = now + self.cooldown
+        logger.warning("model %s errored (%s): %s", decision.model, decision.reason, error)
+
+    def record_turn(self, decision: RouteDecision):
+        """Log the routing decision and how the turn went."""
+        total = time.perf_counter() - decision.started_at
+        ttft = f"{decision.ttft * 1000:.0f}ms" if decision.ttft is not None else "n/a"
+        logger.info("route: model=%s reason=%s ttft=%s total=%.0fms", decision.model, decision.reason,
+                    ttft, total * 1000)
+
+    def summary(self) -> str:
+        lines = []
+        for model in filter(None, (self.strong_model, self.fast_model)):
+            med = self.median_ttft(model)
+            med = f"{med * 1000:.0f}ms" if med is not None else "n/a"
+            state = "ok" if self._available(model) else "cooling down"
+            lines.append(f"{model}: {self.counts.get(model, 0)} turns, median TTFT {med}, {state}")
+        if not self.fast_model:
+            lines.append("No fast model configured (set OPENAI_FAST_MODEL_NAME).")
+        return "\n".join(lines)
@@ -0,0 +1,80 @@
+"""
+Render pump: worker threads push UI updates, the UI thread drains them on a frame timer.
+"""
+
+import itertools
+import threading
+from collections import deque
+
+
+class RenderPump:
+    """
+    Workers call `begin`/`delta`/`write`/`end` from any thread; these only
+    append to a deque (atomic in CPython, no lock and no cross-thread call).
+    The UI calls `drain()` once per frame and renders everything at once.
+
+    Events are (kind, turn_id, payload) tuples:
+        ("start", turn, prefix)     a streamed message begins
+        ("delta", turn, text)       streamed text for that message
+        ("write", turn|None, obj)   a standalone line for the log
+        ("end", turn, None)         the streamed message is complete
+    """
+
+    def __init__(self, max_events_per_frame: int = 5000):
+        self._queue = deque()
+        self._ids = itertools.count(1)
+        self.max_events_per_frame = max_events_per_frame
+        self._stats_lock = threading.Lock()
+        self.frames = 0
+        self.events = 0
+        self.max_depth = 0
+        self._depth_total = 0
+
+    # ---------------- WORKER SIDE ----------------
+
+    def begin(self, prefix: str = "") -> int:
+        turn = next(self._ids)
+        self._queue.append(("start", turn, prefix))
+        return turn
+
+    def delta(self, turn: int, text: str):
+        self._queue.append(("delta", turn, text))
+
+    def write(self, renderable, turn: int | None = None):
+        self._queue.append(("write", turn, renderable))
+
+    def end(self, turn: int):
+        self._queue.append(("end", turn, None))
+
+    # ---------------- UI SIDE ----------------
+
+    def drain(self) -> list:
+        """Pop up to `max_events_per_frame` queued events (UI thread)."""
+        depth = len(self._queue)
+        if not depth:
+            return []
+        events = []
+        pop = self._queue.popleft
+        for _ in range(min(depth, self.max_events_per_frame)):
+            try:
+                events.append(pop())
+            except IndexError:
+                break
+        with self._stats_lock:
+            self.frames += 1
+            self.events += len(events)
+            self._depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+        return events
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def summary(self) -> str:
+        with self._stats_lock:
+            avg_depth = self._depth_total / self.frames if self.frames else 0.0
+            per_frame = self.events / self.frames if self.frames else 0.0
+            return (f"Render pump: {self.frames} frames rendered, {self.events} events "
+                    f"({per_frame:.1f}/frame), queue depth now {self.depth}, "
+                    f"avg {avg_depth:.1f}, max {self.max_depth}")
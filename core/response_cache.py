@@ -0,0 +1,140 @@
+"""
+Exact and near-duplicate cache for plain-text assistant replies.
+"""
+
+import re
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # near-duplicate matching is optional
+    process = None
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = _PUNCT_RE.sub(" ", (text or "").lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    latency: float  # how long the live completion took
+    created_at: float
+
+
+class ResponseCache:
+    """
+    Caches replies keyed on (model, history fingerprint, normalized prompt).
+    The fingerprint covers the system prompt and the last `history_window`
+    messages before the current user turn, so context-dependent replies
+    ("and the second one?") don't leak between conversations. A near hit also
+    needs the same numbers in the same order: "12*13" and "12*14" are
+    different questions however similar they look.
+    """
+
+    def __init__(self, enabled: bool = False, ttl: float = 3600.0, maxsize: int = 256,
+                 history_window: int = 2, near_threshold: float = 97.0):
+        self.enabled = enabled
+        self.history_window = history_window
+        self.near_threshold = near_threshold
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.latency_saved = 0.0
+
+    def _split(self, messages):
+        """Return (fingerprint, normalized prompt) or None when the turn isn't cacheable."""
+        if not messages or messages[-1].get("role") != "user":
+            return None
+        prompt = normalize_prompt(messages[-1].get("content") or "")
+        if not prompt:
+            return None
+        context = []
+        if messages[0].get("role") == "system":
+            context.append(messages[0].get("content") or "")
+        history = [m for m in messages[1:-1] if m.get("role") in ("user", "assistant")]
+        for m in history[-self.history_window:] if self.history_window else []:
+            context.append(f"{m['role']}:{normalize_prompt(m.get('content') or '')}")
+        fingerprint = hashlib.sha1("\x1f".join(context).encode("utf-8")).hexdigest()
+        return fingerprint, prompt
+
+    def get(self, messages, model: str) -> CachedResponse | None:
+        if not self.enabled:
+            return None
+        key = self._split(messages)
+        if key is None:
+            return None
+        fingerprint, prompt = key
+
+        hit = self._cache.get((model, fingerprint, prompt))
+        kind = "exact"
+        if hit is None and process is not None:
+            numbers = _NUMBER_RE.findall(prompt)
+            candidates = {k[2]: v for k, v in self._cache.items()
+                          if k[0] == model and k[1] == fingerprint and _NUMBER_RE.findall(k[2]) == numbers}
+            if candidates:
+                match = process.extractOne(prompt, list(candidates), scorer=fuzz.token_sort_ratio,
+                                           score_cutoff=self.near_threshold)
+                if match:
+                    hit, kind = candidates[match[0]], "near"
+
+        with self._lock:
+            if hit is None:
+                self.misses += 1
+                return None
+            if kind == "exact":
+                self.exact_hits += 1
+            else:
+                self.near_hits += 1
+            self.latency_saved += hit.latency
+        logger.info("response cache %s hit for %r (saved ~%.0fms)", kind, prompt, hit.latency * 1000)
+        return hit
+
+    def put(self, messages, model: str, text: str, latency: float):
+        """Store a reply. Callers must not store turns that produced tool calls."""
+        if not self.enabled or not text:
+            return
+        key = self._split(messages)
+        if key is None:
+            return
+        fingerprint, prompt = key
+        self._cache.set((model, fingerprint, prompt), CachedResponse(text, latency, time.time()))
+        with self._lock:
+            self.stores += 1
+
+    def __len__(self):
+        return len(self._cache)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Response cache is disabled (set RESPONSE_CACHE=1 to enable)."
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            lookups = hits + self.misses
+            rate = hits / lookups * 100 if lookups else 0.0
+            return (f"Response cache: {len(self._cache)} entries, {rate:.0f}% hit rate "
+                    f"({self.exact_hits} exact, {self.near_hits} near, {self.misses} misses), "
+                    f"{self.stores} stored, ~{self.latency_saved:.1f}s latency saved")
+
+
+def replay_tokens(text: str):
+    """Re-chunk a cached reply into word-sized tokens, like a live stream."""
+    words = text.split(" ")
+    for i, w in enumerate(words):
+        yield w + (" " if i < len(words) - 1 else "")
@@ -0,0 +1,107 @@
+"""
+Non-blocking system telemetry with fixed-size history.
+"""
+
+import time
+import datetime
+import platform
+import numpy as np
+import psutil
+
+
+class RingBuffer:
+    """Fixed-size float history backed by a NumPy array."""
+
+    def __init__(self, size: int):
+        self._data = np.zeros(size, dtype=np.float64)
+        self._idx = 0
+        self._count = 0
+
+    def append(self, value: float):
+        self._data[self._idx] = value
+        self._idx = (self._idx + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+
+    def values(self) -> np.ndarray:
+        """Samples in chronological order (oldest first)."""
+        if self._count < len(self._data):
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._idx:], self._data[:self._idx]))
+
+    def last(self) -> float:
+        return float(self._data[self._idx - 1]) if self._count else 0.0
+
+    def __len__(self):
+        return self._count
+
+
+class TelemetrySampler:
+    """
+    Samples CPU, memory, disk, network throughput and the assistant's own
+    RSS/thread count. CPU and network use deltas since the previous sample,
+    so `sample()` never sleeps.
+    """
+
+    FIELDS = ("cpu", "mem", "disk", "net_rx", "net_tx", "rss", "threads")
+
+    def __init__(self, size: int = 120, disk_path: str = "/"):
+        self.disk_path = disk_path
+        self.history = {f: RingBuffer(size) for f in self.FIELDS}
+        self._proc = psutil.Process()
+        self._uname = platform.uname()
+        self._boot = psutil.boot_time()
+        # prime the delta counters: the first cpu_percent(None) call returns 0.0
+        psutil.cpu_percent(interval=None)
+        self._net = psutil.net_io_counters()
+        self._net_at = time.monotonic()
+        self._last_key = None
+
+    def sample(self) -> dict:
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+        elapsed = max(now - self._net_at, 1e-6)
+        mem = psutil.virtual_memory()
+        with self._proc.oneshot():
+            rss = self._proc.memory_info().rss
+            threads = self._proc.num_threads()
+        values = {
+            "cpu": psutil.cpu_percent(interval=None),
+            "mem": mem.percent,
+            "disk": psutil.disk_usage(self.disk_path).percent,
+            "net_rx": (net.bytes_recv - self._net.bytes_recv) / elapsed,
+            "net_tx": (net.bytes_sent - self._net.bytes_sent) / elapsed,
+            "rss": rss,
+            "threads": threads,
+        }
+        self._net, self._net_at = net, now
+        for field, value in values.items():
+            self.history[field].append(value)
+        values["mem_used"], values["mem_total"] = mem.used, mem.total
+        return values
+
+    def changed(self, values: dict) -> bool:
+        """True when the displayed (rounded) values differ from the last call that returned True."""
+        key = (int(time.time() - self._boot) // 60,
+               round(values["cpu"]), round(values["mem"]), round(values["disk"]),
+               int(values["net_rx"] // 1024), int(values["net_tx"] // 1024),
+               values["rss"] // 1024 ** 2, values["threads"])
+        if key == self._last_key:
+            return False
+        self._last_key = key
+        return True
+
+    def header(self) -> str:
+        u = self._uname
+        return f"{u.system} {u.release} ({u.machine})"
+
+    def format(self, values: dict) -> str:
+        # minute resolution, so the panel doesn't need a repaint every second
+        uptime = str(datetime.timedelta(minutes=int(time.time() - self._boot) // 60))
+        return (
+            f"{self.header()}  Uptime: {uptime}\n"
+            f"CPU: {values['cpu']:.0f}%  Mem: {values['mem']:.0f}% "
+            f"({int(values['mem_used']/1024**2)}MB/{int(values['mem_total']/1024**2)}MB)  "
+            f"Disk: {values['disk']:.0f}%  "
+            f"Net: {values['net_rx']/1024:.0f}KB/s down {values['net_tx']/1024:.0f}KB/s up\n"
+            f"Assistant: RSS {values['rss']/1024**2:.0f}MB  Threads: {values['threads']}"
+        )
@@ -4,48 +4,47 @@ Terminal GUI — cleaned up input handler and sanitized system summary.
 """
 import time
 import threading
-import platform
-import datetime
 from rich.text import Text
 from textual.app import App, ComposeResult
+from textual.containers import Horizontal
 from core.utils import stream_ai_response
+from core.render_pump import RenderPump
+from core.chat_view import ChatLog
+from core.telemetry import TelemetrySampler
+from core.tracing import SpeechEndClock
+from tools import spotify_state, spotify_library, spotify_client, web_search
+import core.config as config
 from core.config import (
     last_3_lines,
     CLIENT,
-    OPENAI_MODEL_NAME,
-    openai_tools,
+    tool_selector,
+    model_router,
+    warmup,
+    tool_map,
+    response_cache,
+    tracer,
+    METRICS_PORT,
+    memprof,
     messages,
     mic,
     recognizer,
     TRIGGER_WORD,
     CONVERSATION_TIMEOUT,
+    CHAT_WINDOW,
+    DATA_DIR,
 )
-from textual.widgets import Static, RichLog, Input
+from textual.widgets import Static, Input, Sparkline
 import core.audio_feedback as af
 import speech_recognition as sr
-import psutil
-
-
-def _get_system_summary() -> str:
-    """Return a short, ASCII-safe system summary (no fancy box art)."""
-    try:
-        uname = platform.uname()
-        cpu = psutil.cpu_percent(interval=0.1)
-        mem = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
-        uptime_seconds = time.time() - psutil.boot_time()
-        uptime = str(datetime.timedelta(seconds=int(uptime_seconds)))
-        return (
-            f"{uname.system} {uname.release} ({uname.machine})\n"
-            f"CPU: {cpu:.0f}%  Mem: {mem.percent:.0f}% ({int(mem.used/1024**2)}MB/{int(mem.total/1024**2)}MB)\n"
-            f"Disk: {disk.percent:.0f}%  Uptime: {uptime}"
-        )
-    except Exception:
-        return "System info unavailable."
 
 
 class TerminalGUI(App):
     CSS_PATH = None
+    RENDER_FPS = 30
+    CSS = """
+    #telemetry { height: 1; }
+    #telemetry Sparkline { width: 1fr; margin: 0 1; }
+    """
 
     def __init__(self):
         super().__init__()
@@ -55,20 +54,36 @@ class TerminalGUI(App):
         self.conversation_mode = False
         self.last_interaction_time = None
 
+        self.telemetry = TelemetrySampler()
         self._response_lock = threading.Lock()
         self._stop_threads = False
 
+        # Worker threads push output here; _drain_render_pump paints it once per frame.
+        self.render_pump = RenderPump()
+        self._live = {}  # turn id -> Text still being streamed
+        self._prefixes = {}  # turn id -> speaker prefix, used by the first delta
+
     def compose(self) -> ComposeResult:
         yield Static("Loading...", id="startup_status") 
-        yield Static(_get_system_summary(), id="system_summary")
-        self.chat_log = RichLog(id="chat_log")
+        # no sampling here: the refresher thread fills these in after first paint
+        yield Static(self.telemetry.header(), id="system_summary")
+        yield Static("", id="now_playing")
+        with Horizontal(id="telemetry"):
+            yield Sparkline([], id="spark_cpu", summary_function=max)
+            yield Sparkline([], id="spark_mem", summary_function=max)
+            yield Sparkline([], id="spark_net", summary_function=max)
+            yield Sparkline([], id="spark_rss", summary_function=max)
+        self.chat_log = ChatLog(id="chat_log", spill_dir=DATA_DIR / "chat_logs", window=CHAT_WINDOW)
         yield self.chat_log
+        yield Static("", id="live_message")
         self.input_widget = Input(placeholder="What's on your mind?", id="chat_input")
         yield self.input_widget
 
     def on_mount(self):
+        config.ui = self
         self._update_input_placeholder()
         self.set_focus(self.input_widget)
+        self.set_interval(1 / self.RENDER_FPS, self._drain_render_pump)
         self.query_one("#startup_status", Static).update("Loading...")
 
         def _init_heavy():
@@ -90,6 +105,18 @@ class TerminalGUI(App):
             )
 
         threading.Thread(target=_init_heavy, daemon=True).start()
+        if METRICS_PORT:
+            tracer.serve(METRICS_PORT)
+        if memprof.enabled:
+            memprof.register("history entries", lambda: len(messages))
+            memprof.register("log lines (rendered)", lambda: len(self.chat_log.lines))
+            memprof.register("log entries (in memory)", lambda: len(self.chat_log._memory))
+            memprof.register("log entries (spilled)", lambda: self.chat_log.spilled)
+            memprof.register("held audio bytes", af.held_audio_bytes)
+            memprof.register("cached replies", lambda: len(response_cache))
+            memprof.register("render queue depth", lambda: self.render_pump.depth)
+            memprof.register("threads", threading.active_count)
+            memprof.start()
         # refresh the system summary periodically in the background
         threading.Thread(target=self._system_summary_refresher, daemon=True).start()
         # start voice listener in background
@@ -97,16 +124,31 @@ class TerminalGUI(App):
 
     def on_unmount(self) -> None:
         self._stop_threads = True
+        config.ui = None
+
+    def enter_matrix(self):
+        """Full-screen matrix rain until Escape; its FPS/CPU summary lands in the chat log."""
+        from core.matrix_view import MatrixScreen
+        if isinstance(self.screen, MatrixScreen):
+            return
+        self.push_screen(MatrixScreen(), callback=lambda summary: self.chat_log.write(Text(summary, style="green")))
 
-    def _system_summary_refresher(self, interval: float = 5.0):
+    def _system_summary_refresher(self, interval: float = 2.0):
+        now_playing = ""
         while not self._stop_threads:
             try:
-                summary = _get_system_summary()
-                # update widget safely on the main thread
-                try:
-                    self.call_from_thread(self._update_system_summary, summary)
-                except Exception:
-                    pass
+                values = self.telemetry.sample()
+                # only hop to the UI thread when something visible changed
+                if self.telemetry.changed(values):
+                    try:
+                        self.call_from_thread(self._update_system_summary, self.telemetry.format(values))
+                    except Exception:
+                        pass
+                # cached by the Spotify tools; reading it makes no API calls
+                text = spotify_state.current.describe() if spotify_state.current else ""
+                if text != now_playing:
+                    now_playing = text
+                    self.call_from_thread(self.query_one("#now_playing", Static).update, text)
             except Exception:
                 pass
             time.sleep(interval)
@@ -121,10 +163,57 @@ class TerminalGUI(App):
 
 
 
+    # ---------------- RENDER PUMP ----------------
+
+    def _commit_live(self, turn):
+        """Move a streamed message from the live widget into the log."""
+        live = self._live.get(turn)
+        if live is not None and live.plain.strip():
+            self.chat_log.write(live)
+            # anything streamed after this continues on a fresh, unprefixed line
+            self._live[turn] = Text()
+
+    def _drain_render_pump(self):
+        events = self.render_pump.drain()
+        if not events:
+            return
+        live_changed = False
+        for kind, turn, payload in events:
+            if kind == "start":
+                self._prefixes[turn] = payload
+            elif kind == "delta":
+                if turn not in self._live:
+                    self._live[turn] = Text(self._prefixes.get(turn, ""))
+                self._live[turn].append(payload)
+                live_changed = True
+            elif kind == "write":
+                # keep ordering: text streamed so far lands above tool lines
+                if turn in self._live:
+                    self._commit_live(turn)
+                    live_changed = True
+                self.chat_log.write(payload)
+            elif kind == "end":
+                self._commit_live(turn)
+                self._live.pop(turn, None)
+                self._prefixes.pop(turn, None)
+                live_changed = True
+        if live_changed:
+            try:
+                live = [t for t in self._live.values() if t.plain]
+                self.query_one("#live_message", Static).update(Text("\n").join(live) if live else "")
+            except Exception:
+                pass
+
     def _update_system_summary(self, text: str):
         try:
             widget = self.query_one("#system_summary", Static)
             widget.update(text)
+            history = self.telemetry.history
+            self.query_one("#spark_cpu", Sparkline).data = history["cpu"].values().tolist()
+            self.query_one("#spark_mem", Sparkline).data = history["mem"].values().tolist()
+            net = history["net_rx"].values() + history["net_tx"].values()
+            self.query_one("#spark_net", Sparkline).data = net.tolist()
+            self.query_one("#spark_rss", Sparkline).data = history["rss"].values().tolist()
         except Exception:
             pass
 
@@ -143,8 +232,8 @@ class TerminalGUI(App):
         # delegate
         self.handle_input(user_input)
 
-    def handle_input(self, text: str):
-        """Common handler for typed and voice text."""
+    def handle_input(self, text: str, trace=None):
+        """Common handler for typed and voice text. Touches widgets, so it runs on the UI thread (voice goes through call_from_thread)."""
         cmd = text.strip().lower()
 
         # Mode switching
@@ -161,6 +250,43 @@ class TerminalGUI(App):
             self.chat_log.write(Text("Switched to CHAT mode — type to interact.", style="bold yellow"))
             self._update_input_placeholder()
             return
+        if cmd == "/tools":
+            self.chat_log.write(Text(tool_selector.summary(), style="cyan"))
+            return
+        if cmd == "/cache":
+            self.chat_log.write(Text(response_cache.summary(), style="cyan"))
+            return
+        if cmd == "/route":
+            self.chat_log.write(Text(model_router.summary(), style="cyan"))
+            return
+        if cmd == "/matrix":
+            self.enter_matrix()
+            return
+        if cmd == "/render":
+            self.chat_log.write(Text(self.render_pump.summary(), style="cyan"))
+            return
+        if cmd == "/stats":
+            self.chat_log.write(Text(tracer.summary(), style="cyan"))
+            if spotify_state.current:
+                self.chat_log.write(Text(spotify_state.current.summary(), style="cyan"))
+            if spotify_library.current:
+                self.chat_log.write(Text(spotify_library.current.summary(), style="cyan"))
+            self.chat_log.write(Text(warmup.summary(), style="cyan"))
+            if spotify_client.current:
+                self.chat_log.write(Text(spotify_client.current.summary(), style="cyan"))
+            if web_search.current:
+                self.chat_log.write(Text(web_search.current.summary(), style="cyan"))
+            return
+        if cmd == "/mem":
+            # snapshots can take a while on a big heap; keep the UI thread free
+            threading.Thread(
+                target=lambda: self.render_pump.write(Text(memprof.report(), style="cyan")),
+                daemon=True,
+            ).start()
+            return
+
+        if trace is None:
+            trace = tracer.start_turn("chat")
 
         # Log user message
         global last_3_lines, messages
@@ -172,203 +298,102 @@ class TerminalGUI(App):
         # Start assistant in a thread (no lock here)
         threading.Thread(
             target=self._background_stream_and_display,
-            args=(messages.copy(),),
+            args=(messages.copy(), trace),
             daemon=True
         ).start()
 
     
     
-    def _background_stream_and_display(self, messages_for_call):
+    def _background_stream_and_display(self, messages_for_call, trace=None):
         """Stream AI responses, handle tool calls safely, and update the UI with RichLog."""
-        import json
+        pump = self.render_pump
+        turn = pump.begin("Supporter: ")
+        trace = trace or tracer.start_turn("chat")
+        tts_started = False
+        warm = None
         try:
-            buffer = []
-            last_flush = time.time()
-            flush_interval = 0.12  # seconds
-            final_text = ""
-            prefix_written = False
-            tool_calls = []
-            current_tool_call = None
+            # e.g. "play ..." starts launching Spotify now instead of after the completion
+            warm = warmup.start(messages_for_call[-1].get("content") or "", tool_map)
 
-            # ---------------- STREAMING ----------------
-            try:
-                # Create the stream properly
-                stream = CLIENT.chat.completions.create(
-                    messages=messages_for_call,
-                    tools=openai_tools,
-                    model=OPENAI_MODEL_NAME,
-                    stream=True  # Enable streaming mode
-                )
+            final_text = ""
+            used_tools = False
+            cached = False
+            failed = None
 
-                # Iterate over the stream
-                for chunk in stream:
-                    # Get the delta from the first choice
-                    if chunk.choices and chunk.choices[0].delta:
-                        delta = chunk.choices[0].delta
-                        
-                        # Handle regular content
-                        if delta.content:
-                            token = delta.content
-                            buffer.append(token)
-                            final_text += token
-
-                            now = time.time()
-                            if now - last_flush >= flush_interval:
-                                chunk_text = "".join(buffer)
-                                buffer.clear()
-                                last_flush = now
-                                if not prefix_written:
-                                    self.call_from_thread(self.chat_log.write, Text(f"Supporter: {chunk_text}"))
-                                    prefix_written = True
-                                else:
-                                    self.call_from_thread(self.chat_log.write, chunk_text)
-                        
-                        # Handle tool calls
-                        if delta.tool_calls:
-                            for tool_call_chunk in delta.tool_calls:
-                                # Start of a new tool call
-                                if tool_call_chunk.id:
-                                    current_tool_call = {
-                                        "id": tool_call_chunk.id,
-                                        "name": "",
-                                        "arguments": ""
-                                    }
-                                    tool_calls.append(current_tool_call)
-                                
-                                # Accumulate function name
-                                if tool_call_chunk.function and tool_call_chunk.function.name:
-                                    if current_tool_call:
-                                        current_tool_call["name"] = tool_call_chunk.function.name
-                                
-                                # Accumulate arguments
-                                if tool_call_chunk.function and tool_call_chunk.function.arguments:
-                                    if current_tool_call:
-                                        current_tool_call["arguments"] += tool_call_chunk.function.arguments
-
-                # Execute any tool calls that were accumulated
-                if tool_calls:
-                    self.call_from_thread(self.chat_log.write, Text("\n[Executing tools...]", style="bold cyan"))
-                    
-                    for tool_call in tool_calls:
-                        try:
-                            from core.config import tool_map
-                            tool_name = tool_call["name"]
-                            tool_args = json.loads(tool_call["arguments"])
-                            
-                            self.call_from_thread(self.chat_log.write, 
-                                Text(f"[Calling {tool_name} with args: {tool_args}]", style="cyan"))
-                            
-                            result = tool_map[tool_name].run(tool_args)
-                            
-                            self.call_from_thread(self.chat_log.write, 
-                                Text(f"[Tool result]: {result}", style="green"))
-                            
-                            # Add tool result to messages for potential follow-up
-                            messages.append({
-                                "role": "assistant",
-                                "content": None,
-                                "tool_calls": [{
-                                    "id": tool_call["id"],
-                                    "type": "function",
-                                    "function": {
-                                        "name": tool_name,
-                                        "arguments": tool_call["arguments"]
-                                    }
-                                }]
-                            })
-                            messages.append({
-                                "role": "tool",
-                                "content": str(result),
-                                "tool_call_id": tool_call["id"]
-                            })
-                            
-                        except Exception as e:
-                            error_msg = f"Error executing tool {tool_call.get('name', 'unknown')}: {e}"
-                            self.call_from_thread(self.chat_log.write, Text(error_msg, style="red"))
+            def _emit(token):
+                nonlocal final_text
+                final_text += token
+                pump.delta(turn, token)
 
-            except Exception as e:
-                # Non-stream fallback (create())
-                self.call_from_thread(self.chat_log.write, Text(f"Stream failed, using non-stream: {e}", style="yellow"))
-                
-                resp = CLIENT.chat.completions.create(
-                    messages=messages_for_call,
-                    model=OPENAI_MODEL_NAME,
-                    tools=openai_tools,
-                    stream=False  # Explicitly disable streaming for fallback
-                )
-                
-                message = resp.choices[0].message
-                
-                # Handle content
-                if message.content:
-                    final_text = message.content
-                    self.call_from_thread(self.chat_log.write, Text(f"Supporter: {final_text}"))
-                
-                # Handle tool calls
-                if message.tool_calls:
-                    self.call_from_thread(self.chat_log.write, Text("\n[Executing tools...]", style="bold cyan"))
-                    
-                    for tool_call in message.tool_calls:
-                        try:
-                            from core.config import tool_map
-                            tool_name = tool_call.function.name
-                            tool_args = json.loads(tool_call.function.arguments)
-                            
-                            self.call_from_thread(self.chat_log.write, 
-                                Text(f"[Calling {tool_name} with args: {tool_args}]", style="cyan"))
-                            
-                            result = tool_map[tool_name].run(tool_args)
-                            
-                            self.call_from_thread(self.chat_log.write, 
-                                Text(f"[Tool result]: {result}", style="green"))
-                            
-                            # Add to messages
-                            messages.append({
-                                "role": "assistant",
-                                "content": None,
-                                "tool_calls": [{
-                                    "id": tool_call.id,
-                                    "type": "function",
-                                    "function": {
-                                        "name": tool_name,
-                                        "arguments": tool_call.function.arguments
-                                    }
-                                }]
-                            })
-                            messages.append({
-                                "role": "tool",
-                                "content": str(result),
-                                "tool_call_id": tool_call.id
-                            })
-                            
-                        except Exception as e:
-                            error_msg = f"Error executing tool: {e}"
-                            self.call_from_thread(self.chat_log.write, Text(error_msg, style="red"))
+            # Only attach the schemas this turn can plausibly need.
+            selected_tools, selection = tool_selector.select(messages_for_call)
+            route = model_router.route(messages_for_call, selected_tools)
 
-            # Flush remaining buffer if any
-            if buffer:
-                chunk_text = "".join(buffer)
-                if not prefix_written:
-                    self.call_from_thread(self.chat_log.write, Text(f"Supporter: {chunk_text}"))
-                else:
-                    self.call_from_thread(self.chat_log.write, chunk_text)
+            # ---------------- STREAMING ----------------
+            # A stream that fails before producing anything is retried once on the fallback model.
+            for attempt in range(2):
+                failed = None
+                for event in stream_ai_response(messages_for_call, CLIENT, route.model, selected_tools,
+                                                history=messages, trace=trace):
+                    kind = event["type"]
+                    if kind == "token":
+                        _emit(event["text"])
+                    elif kind == "timing" and event["stage"] == "first_token" and not event["cached"]:
+                        tool_selector.record_ttft(selection, event["ttft"])
+                        model_router.record_ttft(route, event["ttft"])
+                    elif kind == "timing" and event["stage"] == "done":
+                        cached = event["cached"]
+                    elif kind == "tool_call":
+                        if warm:
+                            warm.tool_called(event["name"])
+                        if not used_tools:
+                            used_tools = True
+                            pump.write(Text("\n[Executing tools...]", style="bold cyan"), turn)
+                        pump.write(Text(f"[Calling {event['name']} with args: {event['arguments']}]", style="cyan"), turn)
+                    elif kind == "tool_result":
+                        pump.write(Text(f"[Tool result]: {event['result']}", style="green"), turn)
+                    elif kind == "tool_error":
+                        pump.write(Text(f"Error executing tool {event['name']}: {event['error']}", style="red"), turn)
+                    elif kind == "error":
+                        failed = event["error"]
+
+                if failed is None or final_text or used_tools or attempt:
+                    break
+                model_router.record_error(route, failed)
+                route = model_router.fallback(route)
+                pump.write(Text(f"Stream failed, retrying on {route.model}: {failed}", style="yellow"), turn)
+
+            if failed is not None:
+                pump.write(Text(f"Error in response: {failed}", style="red"), turn)
+            if not cached:
+                model_router.record_turn(route)
+            if warm:
+                warm.finish(trace)
 
             # Add assistant message to history if there was text content
-            if final_text:
+            if final_text and not used_tools:
                 def _append_messages():
                     messages.append({"role": "assistant", "content": final_text})
                     last_3_lines.append(final_text)
                     last_3_lines[:] = last_3_lines[-3:]
-                
+
                 self.call_from_thread(_append_messages)
 
+            if final_text:
                 # TTS announcement
                 import core.audio_feedback as af
-                threading.Thread(target=af.initiate_tts, args=(final_text,), daemon=True).start()
+                threading.Thread(target=af.initiate_tts, args=(final_text,), kwargs={"trace": trace},
+                                 daemon=True).start()
+                tts_started = True  # the TTS thread finishes the trace once playback starts
 
         except Exception as e:
-            self.call_from_thread(self.chat_log.write, Text(f"Error in response: {e}", style="red"))
+            pump.write(Text(f"Error in response: {e}", style="red"), turn)
         finally:
+            pump.end(turn)
+            if warm:
+                warm.finish()  # no-op unless the turn failed before recording it
+            if not tts_started:
+                trace.finish()
             try:
                 self._response_lock.release()
             except Exception:
@@ -376,26 +401,38 @@ class TerminalGUI(App):
 
     def voice_loop(self):
         """Continuously listens to mic input for wake word / prompts."""
-    
+        if mic is None:
+            self.render_pump.write(Text("Voice input unavailable: no microphone found.", style="yellow"))
+            return
+
         try:
             with mic as source:
                 recognizer.adjust_for_ambient_noise(source)
+                clock = SpeechEndClock(source, recognizer)
                 while not self._stop_threads:
                     try:
+                        clock.reset()
                         audio = recognizer.listen(source, timeout=10)
+                        endpointing = clock.endpointing()
+                        trace = tracer.start_turn("voice")
+                        # listen() only returns after ~pause_threshold of silence following the
+                        # last voiced chunk: the endpointing delay every voice turn pays.
+                        if endpointing is not None:
+                            trace.add("endpointing", endpointing)
                         try:
-                            transcript = recognizer.recognize_google(audio)
+                            with trace.span("recognition"):
+                                transcript = recognizer.recognize_google(audio)
                         except sr.UnknownValueError:
                             continue
                         except Exception as e:
-                            self.call_from_thread(self.chat_log.write, f"Speech recognition error: {e}")
+                            self.render_pump.write(f"Speech recognition error: {e}")
                             continue
 
                         current_time = time.time()
                         if TRIGGER_WORD.lower() in transcript.lower():
                             self.conversation_mode = True
                             self.last_interaction_time = time.time()
-                            threading.Thread(target=self.handle_input, args=("Hey! How can i help you today?",), daemon=True).start()
+                            self.call_from_thread(self.handle_input, "Hey! How can i help you today?", trace)
                             continue
                         
                         if self.mode == "voice" and self.conversation_mode:    
@@ -403,7 +440,7 @@ class TerminalGUI(App):
                                 self.conversation_mode = False
                                 continue
                             self.last_interaction_time = current_time
-                            threading.Thread(target=self.handle_input, args=(transcript,), daemon=True).start()
+                            self.call_from_thread(self.handle_input, transcript, trace)
 
 
                         elif self.mode == "chat":
@@ -413,6 +450,6 @@ class TerminalGUI(App):
                     except sr.UnknownValueError:
                         continue
                     except Exception as e:
-                        self.call_from_thread(self.chat_log.write, f"Voice loop error: {e}")
+                        self.render_pump.write(f"Voice loop error: {e}")
         except Exception as e:
-            self.call_from_thread(self.chat_log.write, f"Voice setup error: {e}")
+            self.render_pump.write(f"Voice setup error: {e}")
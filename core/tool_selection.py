@@ -0,0 +1,222 @@
+"""
+Per-turn tool selection: attach only the tool schemas relevant to the current turn.
+"""
+
+import json
+import re
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# ---------------- TOKEN COUNTING ----------------
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Load tiktoken once; fall back to a char heuristic if it isn't available."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+@lru_cache(maxsize=256)
+def count_tokens(text: str) -> int:
+    """Approximate prompt tokens for a string (cached, texts here are static)."""
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    return max(1, len(text) // 4)
+
+
+def compact_prompt(text: str) -> str:
+    """Strip the indentation of a triple-quoted prompt so it doesn't cost tokens."""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return "\n".join(lines)
+
+
+def serialize_schema(schema: dict) -> str:
+    """Serialize a schema the way it goes over the wire (compact JSON)."""
+    return json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+
+
+# ---------------- HINTS ----------------
+
+# Cheap local signals for each tool. Single words match as word prefixes
+# ("play" matches "playing"), multi-word hints match as substrings.
+TOOL_HINTS = {
+    "query_and_play_track": ("play", "song", "track", "music", "listen", "artist", "album", "put on"),
+    "stop_current_playback": ("stop", "pause", "music", "playback", "spotify", "silence"),
+    "change_volume": ("volume", "louder", "quieter", "mute", "unmute", "sound", "loud", "quiet"),
+    "play_next_track": ("next", "skip", "song", "track"),
+    "play_user_playlist": ("playlist", "play"),
+    "add_song_to_playlist": ("playlist", "add"),
+    "read_latest_screenshot": ("read", "screen", "screenshot", "text", "extract"),
+    "capture_screenshot": ("screenshot", "capture", "screen"),
+    "read_screen": ("read", "screen", "window", "text", "ocr", "says"),
+    "duckduckgo_search": ("search", "look up", "lookup", "google", "news", "weather", "latest", "internet", "web"),
+    "get_time": ("time", "clock", "timezone"),
+    "matrix_mode": ("matrix", "screensaver", "neo"),
+    "scan_network": ("arp", "network", "devices", "lan", "scan", "wifi", "router"),
+}
+
+# Words in tool names that say nothing about intent.
+_NAME_STOPWORDS = {"and", "the", "to", "get", "current", "user", "query", "change", "run",
+                   "take", "from", "latest", "mode", "tool", "text", "image"}
+
+# Replies that continue the previous turn rather than start a new one.
+_FOLLOW_UP_MAX_WORDS = 4
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _hints_for(name: str) -> tuple:
+    if name in TOOL_HINTS:
+        return TOOL_HINTS[name]
+    return tuple(w for w in name.lower().split("_") if len(w) > 2 and w not in _NAME_STOPWORDS)
+
+
+def _matches(words: list, text: str, hints: tuple) -> bool:
+    for hint in hints:
+        if " " in hint:
+            if hint in text:
+                return True
+        elif any(w.startswith(hint) for w in words):
+            return True
+    return False
+
+
+# ---------------- SELECTOR ----------------
+
+@dataclass
+class SelectionReport:
+    """What one turn sent, and what it would have cost with every schema attached."""
+    selected: tuple
+    system_tokens: int
+    tools_tokens_full: int
+    tools_tokens_sent: int
+    created_at: float = field(default_factory=time.time)
+    ttft: float | None = None
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tools_tokens_full - self.tools_tokens_sent
+
+    @property
+    def trimmed(self) -> bool:
+        return self.tools_tokens_sent < self.tools_tokens_full
+
+    def format(self) -> str:
+        ttft = f"{self.ttft * 1000:.0f}ms" if self.ttft is not None else "n/a"
+        tools = ", ".join(self.selected) or "none"
+        return (f"tools=[{tools}] system={self.system_tokens}tok "
+                f"tools={self.tools_tokens_sent}/{self.tools_tokens_full}tok "
+                f"saved={self.tokens_saved}tok ttft={ttft}")
+
+
+class ToolSelector:
+    """
+    Picks the tool schemas to attach to a completion request.
+    Schemas are serialized and token-counted once, at construction.
+    """
+
+    def __init__(self, openai_tools, enabled: bool = True, history: int = 50):
+        self.enabled = enabled
+        self._schemas = {s["function"]["name"]: s for s in openai_tools}
+        self._schema_tokens = {name: count_tokens(serialize_schema(s)) for name, s in self._schemas.items()}
+        self._hints = {name: _hints_for(name) for name in self._schemas}
+        self._full_tokens = sum(self._schema_tokens.values())
+        self._last_selected = ()
+        self._lock = threading.Lock()
+        # rolling TTFT samples, split by whether the schema list was trimmed
+        self._ttft = {"trimmed": deque(maxlen=history), "full": deque(maxlen=history)}
+        self._saved = deque(maxlen=history)
+        self.last_report = None
+
+    def _recently_called(self, messages, lookback: int = 4) -> set:
+        names = set()
+        for msg in messages[-lookback:]:
+            for call in msg.get("tool_calls") or []:
+                names.add(call.get("function", {}).get("name"))
+        return names
+
+    def select(self, messages):
+        """Return (schemas, report) for the turn ending in messages[-1]."""
+        system = ""
+        if messages and messages[0].get("role") == "system":
+            system = messages[0].get("content") or ""
+        system_tokens = count_tokens(system)
+
+        if not self.enabled:
+            names = tuple(self._schemas)
+        else:
+            text = ""
+            for msg in reversed(messages):
+                if msg.get("role") == "user":
+                    text = msg.get("content") or ""
+                    break
+            words = _WORD_RE.findall(text.lower())
+
+            chosen = self.likely(text)
+            chosen |= self._recently_called(messages) & self._schemas.keys()
+            if not chosen and len(words) <= _FOLLOW_UP_MAX_WORDS:
+                chosen = set(self._last_selected)
+            # keep the original registration order so prompts stay cache-friendly
+            names = tuple(n for n in self._schemas if n in chosen)
+
+        with self._lock:
+            self._last_selected = names
+
+        report = SelectionReport(
+            selected=names,
+            system_tokens=system_tokens,
+            tools_tokens_full=self._full_tokens,
+            tools_tokens_sent=sum(self._schema_tokens[n] for n in names),
+        )
+        self.last_report = report
+        return [self._schemas[n] for n in names], report
+
+    def likely(self, text: str) -> set:
+        """Tools whose hints match `text`, whether or not selection is enabled."""
+        text = (text or "").lower()
+        words = _WORD_RE.findall(text)
+        return {name for name, hints in self._hints.items() if _matches(words, text, hints)}
+
+    def record_ttft(self, report: SelectionReport, ttft: float):
+        """Attach a measured time-to-first-token to a turn and log the report."""
+        report.ttft = ttft
+        with self._lock:
+            self._ttft["trimmed" if report.trimmed else "full"].append(ttft)
+            self._saved.append(report.tokens_saved)
+        logger.info("tool selection: %s", report.format())
+
+    def summary(self) -> str:
+        with self._lock:
+            trimmed = list(self._ttft["trimmed"])
+            full = list(self._ttft["full"])
+            saved = list(self._saved)
+
+        def _avg_ms(xs):
+            return f"{sum(xs) / len(xs) * 1000:.0f}ms (n={len(xs)})" if xs else "n/a"
+
+        lines = []
+        if self.last_report:
+            lines.append(f"Last turn: {self.last_report.format()}")
+        avg_saved = sum(saved) / len(saved) if saved else 0
+        lines.append(f"Avg tokens saved/turn: {avg_saved:.0f} of {self._full_tokens} schema tokens")
+        lines.append(f"Avg TTFT trimmed: {_avg_ms(trimmed)}  full: {_avg_ms(full)}")
+        if not self.enabled:
+            lines.append("Tool selection is disabled (TOOL_SELECTION=0), every schema is sent.")
+        return "\n".join(lines)
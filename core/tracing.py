@@ -0,0 +1,213 @@
+"""
+Lightweight per-turn latency tracing.
+
+A TurnTrace collects (stage, seconds) spans for one voice/chat turn. Finished
+turns go to a rotating JSONL file, feed per-stage percentiles for the TUI's
+/stats command, and are exposed as Prometheus text on /metrics.
+"""
+
+import json
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class TurnTrace:
+    def __init__(self, tracer, turn_id: int, source: str):
+        self.tracer = tracer
+        self.turn_id = turn_id
+        self.source = source
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def add(self, stage: str, seconds: float, **attrs):
+        with self._lock:
+            self.spans.append({"stage": stage, "seconds": round(seconds, 6), **attrs})
+
+    def mark(self, stage: str, **attrs):
+        """Record a point in time as its offset from the start of the turn."""
+        self.add(stage, time.perf_counter() - self._t0, **attrs)
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, **attrs)
+
+    def finish(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        self.add("turn_total", time.perf_counter() - self._t0)
+        self.tracer.record(self)
+
+    def to_dict(self) -> dict:
+        return {"turn": self.turn_id, "source": self.source, "ts": self.started_at, "spans": self.spans}
+
+
+class _NullTrace:
+    """Stand-in when a caller has no trace; every method is a no-op."""
+
+    def add(self, *args, **kwargs):
+        pass
+
+    def mark(self, *args, **kwargs):
+        pass
+
+    @contextmanager
+    def span(self, *args, **kwargs):
+        yield
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Tracer:
+    def __init__(self, trace_file: Path | None = None, max_bytes: int = 5 * 1024 ** 2,
+                 backup_count: int = 3, window: int = 500):
+        self._ids = itertools.count(1)
+        self._window = window
+        self._samples = {}  # stage -> deque of seconds
+        self._totals = {}   # stage -> [count, sum]
+        self._lock = threading.Lock()
+        self._writer = None
+        if trace_file is not None:
+            trace_file = Path(trace_file)
+            trace_file.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = logging.getLogger("q_assistant.traces")
+            self._writer.propagate = False
+            self._writer.setLevel(logging.INFO)
+            handler = RotatingFileHandler(trace_file, maxBytes=max_bytes, backupCount=backup_count,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._writer.addHandler(handler)
+        self._server = None
+
+    def start_turn(self, source: str = "chat") -> TurnTrace:
+        return TurnTrace(self, next(self._ids), source)
+
+    def record(self, trace: TurnTrace):
+        with self._lock:
+            for span in trace.spans:
+                stage = span["stage"]
+                self._samples.setdefault(stage, deque(maxlen=self._window)).append(span["seconds"])
+                totals = self._totals.setdefault(stage, [0, 0.0])
+                totals[0] += 1
+                totals[1] += span["seconds"]
+        if self._writer is not None:
+            self._writer.info(json.dumps(trace.to_dict()))
+
+    def stage_stats(self) -> dict:
+        """stage -> (count, p50, p95) over the recent window."""
+        with self._lock:
+            snapshot = {stage: sorted(values) for stage, values in self._samples.items()}
+        return {stage: (len(v), percentile(v, 0.5), percentile(v, 0.95)) for stage, v in snapshot.items()}
+
+    def summary(self) -> str:
+        stats = self.stage_stats()
+        if not stats:
+            return "No turns traced yet."
+        lines = [f"{'stage':<28}{'n':>6}{'p50':>10}{'p95':>10}"]
+        for stage, (n, p50, p95) in sorted(stats.items()):
+            lines.append(f"{stage:<28}{n:>6}{p50 * 1000:>8.0f}ms{p95 * 1000:>8.0f}ms")
+        return "\n".join(lines)
+
+    def prometheus(self) -> str:
+        stats = self.stage_stats()
+        with self._lock:
+            totals = {k: list(v) for k, v in self._totals.items()}
+        out = ["# HELP q_stage_seconds Per-turn stage latency.", "# TYPE q_stage_seconds summary"]
+        for stage, (_, p50, p95) in sorted(stats.items()):
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            out.append(f'q_stage_seconds{{stage="{label}",quantile="0.5"}} {p50:.6f}')
+            out.append(f'q_stage_seconds{{stage="{label}",quantile="0.95"}} {p95:.6f}')
+            count, total = totals.get(stage, (0, 0.0))
+            out.append(f'q_stage_seconds_sum{{stage="{label}"}} {total:.6f}')
+            out.append(f'q_stage_seconds_count{{stage="{label}"}} {count}')
+        return "\n".join(out) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Expose /metrics in Prometheus text format on a daemon thread."""
+        tracer = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            logger.warning("metrics endpoint unavailable on %s:%s: %s", host, port, e)
+            return None
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("metrics endpoint on http://%s:%s/metrics", host, port)
+        return self._server
+
+
+class SpeechEndClock:
+    """
+    Wraps a speech_recognition source's stream to measure endpointing: the time
+    from the last chunk louder than the recognizer's energy threshold to listen()
+    returning. Chunks arrive in real time, so a chunk's read time is when it ended.
+    """
+
+    def __init__(self, source, recognizer):
+        import audioop
+        self._rms = audioop.rms
+        self._stream = source.stream
+        self._width = source.SAMPLE_WIDTH
+        self.recognizer = recognizer
+        self.last_voice = None
+        source.stream = self
+
+    def read(self, size):
+        buffer = self._stream.read(size)
+        if self._rms(buffer, self._width) > self.recognizer.energy_threshold:
+            self.last_voice = time.perf_counter()
+        return buffer
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def reset(self):
+        self.last_voice = None
+
+    def endpointing(self) -> float | None:
+        """Seconds since the last voiced chunk; call right after listen() returns."""
+        return None if self.last_voice is None else time.perf_counter() - self.last_voice
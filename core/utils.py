@@ -3,15 +3,14 @@
 Helper functions: stream_ai_response, initiate_winfetch, TTS, Spotify tools.
 """
 
-from TTS.api import TTS
 import psutil
 import json
 import sys
 import os
 import subprocess
 from contextlib import contextmanager
-import win32com.client
 import time
+from core.capabilities import cap
 # ---------------- WINFETCH ----------------
 def initiate_winfetch():
     """Run Winfetch and return its output as string."""
@@ -43,6 +42,7 @@ def suppress_stdout_stderr():
 def get_tts():
     import core.config as cfg
     if getattr(cfg, "_global_tts", None) is None:
+        from TTS.api import TTS  # heavy (torch); only import when the model is needed
         print("Initializing TTS model...")
         with suppress_stdout_stderr():
             cfg._global_tts = TTS(model_name="tts_models/en/vctk/vits", progress_bar=False)
@@ -52,12 +52,23 @@ def get_tts():
 
 # ---------------- SPOTIFY UTIL ----------------
 
+_spotify_proc = None  # cached psutil.Process for the Spotify client
+
+
 def find_spotify_process():
+    """Check if Spotify is running. The PID is cached, so repeat checks skip the process-table scan."""
     import core.config as cfg
-    """Check if Spotify is running."""
-    for p_spotify in psutil.process_iter():
+    global _spotify_proc
+    proc = _spotify_proc
+    # is_running() also compares create times, so a recycled PID doesn't count
+    if proc is not None and proc.is_running():
+        return True
+    _spotify_proc = None
+    target = cfg.SPOTIFY_PROC.lower()
+    for p_spotify in psutil.process_iter(["name"]):
         try:
-            if p_spotify.name().lower() == cfg.SPOTIFY_PROC.lower():
+            if (p_spotify.info.get("name") or "").lower() == target:
+                _spotify_proc = p_spotify
                 return True
         except Exception:
             continue
@@ -66,6 +77,9 @@ def find_spotify_process():
 
 def start_spotify_exe():
     """Start Spotify via Shell.Application."""
+    if not cap['win32com']:
+        return
+    import win32com.client
     shell = win32com.client.Dispatch("Shell.Application")
     folder_items = shell.Namespace("shell:AppsFolder")
     for item in folder_items.Items():
@@ -74,73 +88,168 @@ def start_spotify_exe():
             break
 
 
-def wait_for_spotify_boot(max_timeout=30):
-    """Wait for Spotify to start."""
+def wait_for_spotify_boot(max_timeout=30, ready=None, poll=0.25):
+    """
+    Wait for Spotify to start. `ready` is an optional check (e.g. "a device is
+    available") polled once the process exists, instead of a fixed settle delay.
+    """
     start_time = time.time()
     while time.time() - start_time < max_timeout:
         if find_spotify_process():
-            print('Spotify is up.')
-            time.sleep(2.5)
-            return True
-        else:
-            time.sleep(0.5)
+            break
+        time.sleep(poll)
+    else:
+        return False
+    print('Spotify is up.')
+    if ready is None:
+        time.sleep(2.5)
+        return True
+    while time.time() - start_time < max_timeout:
+        try:
+            if ready():
+                return True
+        except Exception:
+            pass
+        time.sleep(poll)
     return False
 
 # ---------------- OPENAI TOOL HELPERS ----------------
 
 
+def run_tool(name, arguments, tool_map=None):
+    """Execute a tool call by name through config.tool_map; `arguments` is the JSON string from the model."""
+    if tool_map is None:
+        from core.config import tool_map
+    if name not in tool_map:
+        raise KeyError(f"Tool {name} not found")
+    args = json.loads(arguments) if arguments else {}
+    return tool_map[name].run(args)
+
+
 def handle_tool_call(tool_call):
-    from core.config import tool_map
-    func_name = tool_call.function.name
-    func_args = json.loads(tool_call.function.arguments)
-    if func_name in tool_map:
-        return tool_map[func_name].run(func_args)
-    return f"Tool {func_name} not found"
-
-def stream_ai_response(messages, client, model_name, openai_tools):
+    try:
+        return run_tool(tool_call.function.name, tool_call.function.arguments)
+    except KeyError as e:
+        return str(e.args[0])
+
+
+def _merge_tool_call_deltas(calls, deltas):
+    """Accumulate streamed tool-call fragments into {"id", "name", "arguments"} dicts."""
+    for tc in deltas:
+        index = getattr(tc, "index", None)
+        if index is None:
+            # Some OpenAI-compatible servers omit the index; a new id starts a new call.
+            index = len(calls) if tc.id or not calls else len(calls) - 1
+        call = calls.setdefault(index, {"id": "", "name": "", "arguments": ""})
+        if tc.id:
+            call["id"] = tc.id
+        if tc.function and tc.function.name:
+            call["name"] = tc.function.name
+        if tc.function and tc.function.arguments:
+            call["arguments"] += tc.function.arguments
+
+
+def stream_ai_response(messages, client, model_name, openai_tools, cache=None, tool_map=None, history=None,
+                       trace=None):
     """
-    Replacement for streaming: synchronous .create() with manual token yielding.
-    Executes any tool calls and yields strings to be displayed in the GUI.
+    Stream a completion and yield events as they arrive:
+        {"type": "token", "text": ...}
+        {"type": "timing", "stage": "first_token", "ttft": ..., "cached": ...}
+        {"type": "tool_call", "id": ..., "name": ..., "arguments": ...}
+        {"type": "tool_result", "id": ..., "name": ..., "result": ...}
+        {"type": "tool_error", "id": ..., "name": ..., "error": ...}
+        {"type": "error", "error": ...}
+        {"type": "timing", "stage": "done", "ttft": ..., "total": ..., "tokens": ..., "cached": ...}
+    Tool calls run through config.tool_map once the stream ends. If `history` is
+    given, the assistant tool_calls message and each tool result are appended to it.
+    Replies are served from / stored in `cache` (defaults to config.response_cache).
+    Stage timings are added to `trace` (a core.tracing.TurnTrace) when given.
+    A cache replay's first_token is marked cached so it stays out of model TTFT stats.
     """
-    try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            tools=openai_tools
-        )
+    from core.response_cache import replay_tokens
+    from core.tracing import NULL_TRACE
+    if cache is None:
+        from core.config import response_cache as cache
+    trace = trace or NULL_TRACE
+
+    start = time.perf_counter()
+    hit = cache.get(messages, model_name)
+    if hit is not None:
+        n = 0
+        for token in replay_tokens(hit.text):
+            if n == 0:
+                yield {"type": "timing", "stage": "first_token", "ttft": time.perf_counter() - start, "cached": True}
+            n += 1
+            yield {"type": "token", "text": token}
+        trace.add("cache_hit", time.perf_counter() - start)
+        yield {"type": "timing", "stage": "done", "ttft": None, "total": time.perf_counter() - start,
+               "tokens": n, "cached": True}
+        return
+
+    ttft = None
+    n_tokens = 0
+    content = []
+    calls = {}
+    tool_kwargs = {"tools": openai_tools} if openai_tools else {}
 
-        # Extract assistant message text
-        content = ""
-        try:
-            content = resp.choices[0].message.content
-        except Exception:
-            content = str(resp)
-
-        if content:
-            # Yield in word-sized chunks for incremental GUI updates
-            words = content.split()
-            for i, w in enumerate(words):
-                yield w + (" " if i < len(words) - 1 else "")
-        else:
-            # If assistant returned nothing
-            yield "[Empty response from assistant]"
-
-        # Check if any tool calls are embedded in the response (e.g., JSON commands)
-        # Example: {"tool":"play_user_playlist","arguments":{"playlist_name":"Dont Drake and Drive"}}
-        # For each tool call, execute and yield result
-        # Here we assume the assistant wraps tool calls in a recognizable format
-        import re, json
-        tool_matches = re.findall(r"\{.*?\"tool\".*?\}", content or "")
-        for t_json in tool_matches:
+    try:
+        with trace.span("request_send", model=model_name):
+            stream = client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                stream=True,
+                **tool_kwargs
+            )
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta:
+                continue
+            delta = chunk.choices[0].delta
+            if ttft is None and (delta.content or delta.tool_calls):
+                ttft = time.perf_counter() - start
+                trace.add("ttft", ttft, model=model_name)
+                yield {"type": "timing", "stage": "first_token", "ttft": ttft, "cached": False}
+            if delta.content:
+                n_tokens += 1
+                content.append(delta.content)
+                yield {"type": "token", "text": delta.content}
+            if delta.tool_calls:
+                _merge_tool_call_deltas(calls, delta.tool_calls)
+    except Exception as e:
+        yield {"type": "error", "error": e}
+        yield {"type": "timing", "stage": "done", "ttft": ttft, "total": time.perf_counter() - start,
+               "tokens": n_tokens, "cached": False}
+        return
+
+    stream_time = time.perf_counter() - start
+    trace.add("stream_complete", stream_time, model=model_name, tokens=n_tokens)
+    text = "".join(content)
+
+    if calls:
+        ordered = [calls[i] for i in sorted(calls)]
+        if history is not None:
+            history.append({
+                "role": "assistant",
+                "content": text or None,
+                "tool_calls": [{
+                    "id": c["id"],
+                    "type": "function",
+                    "function": {"name": c["name"], "arguments": c["arguments"]},
+                } for c in ordered],
+            })
+        for call in ordered:
+            yield {"type": "tool_call", **call}
             try:
-                t_obj = json.loads(t_json)
-                tool_name = t_obj.get("tool")
-                args = t_obj.get("arguments", {})
-                if tool_name in openai_tools:
-                    result = openai_tools[tool_name](**args)
-                    yield f"\n[Tool `{tool_name}` executed: {result}]\n"
+                with trace.span(f"tool:{call['name']}"):
+                    result = run_tool(call["name"], call["arguments"], tool_map)
+                yield {"type": "tool_result", "id": call["id"], "name": call["name"], "result": result}
             except Exception as e:
-                yield f"\n[Error executing tool: {e}]\n"
-
-    except Exception as e:
-        yield f"[Error obtaining assistant response: {e}]"
+                result = f"Error executing tool {call['name']}: {e}"
+                yield {"type": "tool_error", "id": call["id"], "name": call["name"], "error": e}
+            if history is not None:
+                history.append({"role": "tool", "content": str(result), "tool_call_id": call["id"]})
+    elif text:
+        # Tool turns depend on live state (playback, screen, time), never cache them.
+        cache.put(messages, model_name, text, stream_time)
+
+    yield {"type": "timing", "stage": "done", "ttft": ttft, "total": time.perf_counter() - start,
+           "tokens": n_tokens, "cached": False}
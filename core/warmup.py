@@ -0,0 +1,117 @@
+"""
+Speculative tool warm-up.
+
+When the user's text matches one of a module's `__warm_when__` patterns and the
+module declares `__warm_for__` tools (e.g. Spotify: launch the client, refresh
+tokens, find a device), its warm_up() runs in the background while the
+completion streams. The patterns are strict on purpose: the loose tool-selection
+hints fire on "playing football", and a warm-up has visible side effects.
+If the model never calls that tool the work is simply abandoned.
+"""
+
+import re
+import time
+import logging
+import threading
+import importlib
+from collections import deque
+from core.tracing import NULL_TRACE
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupHandle:
+    """One turn's warm-up: when it started, finished, and when the tool actually ran."""
+
+    def __init__(self, warmup, modules: tuple, tools: set):
+        self.warmup = warmup
+        self.modules = modules
+        self.tools = tools
+        self.started = time.perf_counter()
+        self.done_at = None
+        self.tool_at = None
+        self.error = None
+        self._finished = False
+
+    def _run(self):
+        try:
+            for module in self.modules:
+                importlib.import_module(module).warm_up()
+        except Exception as e:
+            self.error = e
+            logger.info("warm-up for %s failed: %s", ", ".join(self.modules), e)
+        finally:
+            self.done_at = time.perf_counter()
+
+    def tool_called(self, name: str):
+        if name in self.tools and self.tool_at is None:
+            self.tool_at = time.perf_counter()
+
+    def finish(self, trace=NULL_TRACE):
+        """
+        Call once the turn's stream and tool calls are done. Records how much of
+        the warm-up overlapped the completion, i.e. ran before the tool needed it.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        if self.tool_at is None:
+            self.warmup._record(None)
+            return
+        ready_at = self.done_at if self.done_at is not None else self.tool_at
+        overlap = min(ready_at, self.tool_at) - self.started
+        trace.add("warmup_overlap", overlap, modules=list(self.modules))
+        if self.done_at is not None:
+            trace.add("warmup", self.done_at - self.started, modules=list(self.modules))
+        self.warmup._record(overlap)
+
+
+class Warmup:
+    def __init__(self, enabled: bool = True, history: int = 50):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.started = 0
+        self.used = 0
+        self.abandoned = 0
+        self._overlaps = deque(maxlen=history)
+
+    @staticmethod
+    def matching(text: str, tool_map: dict) -> set:
+        """Warmable tools whose module's warm_when patterns match `text`."""
+        if not text:
+            return set()
+        return {name for name, t in tool_map.items()
+                if getattr(t, "warm", False) and any(re.search(p, text, re.IGNORECASE) for p in t.warm_when)}
+
+    def start(self, text: str, tool_map: dict) -> WarmupHandle | None:
+        """Kick off warm-ups for tools whose warm_when patterns match `text`; None when nothing does."""
+        if not self.enabled:
+            return None
+        tools = self.matching(text, tool_map)
+        if not tools:
+            return None
+        modules = tuple(sorted({tool_map[name].module for name in tools}))
+        handle = WarmupHandle(self, modules, tools)
+        threading.Thread(target=handle._run, daemon=True, name="warmup").start()
+        with self._lock:
+            self.started += 1
+        logger.info("warming up %s for %s", ", ".join(modules), ", ".join(sorted(tools)))
+        return handle
+
+    def _record(self, overlap: float | None):
+        with self._lock:
+            if overlap is None:
+                self.abandoned += 1
+            else:
+                self.used += 1
+                self._overlaps.append(overlap)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Warm-up is disabled (set TOOL_WARMUP=1 to enable)."
+        with self._lock:
+            overlaps = list(self._overlaps)
+            text = f"Warm-up: {self.started} started, {self.used} used, {self.abandoned} abandoned"
+        if overlaps:
+            text += f", avg {sum(overlaps) / len(overlaps) * 1000:.0f}ms hidden behind the completion"
+        return text
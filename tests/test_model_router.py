@@ -0,0 +1,67 @@
+"""
+ModelRouter latency handling: slow models get re-probed, samples expire, tool turns stay put.
+
+    python -m pytest tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from core.model_router import ModelRouter
+
+CHAT = [{"role": "user", "content": "hi there"}]
+TOOLS = [{"type": "function", "function": {"name": "play_song"}}]
+
+
+def make_router(**kwargs) -> ModelRouter:
+    return ModelRouter("strong", fast_model="fast", slow_ttft=1.0, **kwargs)
+
+
+def test_slow_fast_model_is_skipped_then_reprobed():
+    router = make_router(probe_interval=0.05)
+    router.record_ttft(router.route(CHAT), 5.0)
+    router.record_ttft(router.route(CHAT, TOOLS), 0.5)
+    assert router.route(CHAT).model == "strong"
+    time.sleep(0.06)
+    probe = router.route(CHAT)
+    assert probe.model == "fast" and "re-probing" in probe.reason
+    assert router.route(CHAT).model == "strong"  # one probe per interval
+    router.record_ttft(probe, 0.2)
+    router.record_ttft(router.route(CHAT, TOOLS), 0.2)
+    # median of (5.0, 0.2) is still slow; enough fast samples bring it back
+    for _ in range(3):
+        time.sleep(0.06)
+        router.record_ttft(router.route(CHAT), 0.2)
+    assert router.route(CHAT).model == "fast"
+
+
+def test_old_samples_expire():
+    router = make_router(ttft_max_age=0.05, probe_interval=3600)
+    router.record_ttft(router.route(CHAT), 5.0)
+    router.record_ttft(router.route(CHAT, TOOLS), 0.5)
+    assert router.route(CHAT).model == "strong"
+    time.sleep(0.06)
+    assert router.median_ttft("fast") is None
+    assert router.route(CHAT).model == "fast"
+
+
+def test_tool_turns_stay_on_strong_model_when_slow():
+    router = make_router(probe_interval=3600)
+    for _ in range(3):
+        router.record_ttft(router.route(CHAT, TOOLS), 8.0)
+        router.record_ttft(router.route(CHAT), 0.3)
+    decision = router.route(CHAT, TOOLS)
+    assert decision.model == "strong" and decision.fallback_from is None
+
+
+def test_tool_turns_leave_strong_model_while_it_cools_down():
+    router = make_router()
+    decision = router.route(CHAT, TOOLS)
+    for _ in range(2):
+        router.record_error(decision, RuntimeError("boom"))
+    assert router.route(CHAT, TOOLS).model == "fast"
@@ -0,0 +1,114 @@
+"""
+scan_network's building blocks against the fake neighbor tables in tests/fixtures.
+
+    python -m pytest tests
+"""
+
+import sys
+import asyncio
+import ipaddress
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from tools.neighbors import OUITable, check_network, discover, normalize_mac, parse_arp_output, read_proc_arp
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def read(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_read_proc_arp_skips_incomplete_rows():
+    table = read_proc_arp(FIXTURES / "proc_net_arp")
+    assert [(n.ip, n.mac, n.interface) for n in table] == [
+        ("192.168.1.1", "b8:27:eb:12:34:56", "eth0"),
+        ("192.168.1.23", "00:0c:29:ab:cd:ef", "eth0"),
+        ("192.168.1.40", "da:a1:19:00:11:22", "wlan0"),
+        ("192.168.1.90", "12:34:56:78:9a:bc", "eth0"),
+    ]
+
+
+@pytest.mark.parametrize("name, interface", [
+    ("arp_macos.txt", "en0"),
+    ("arp_linux.txt", "eth0"),
+    ("arp_windows.txt", "192.168.1.5"),
+])
+def test_parse_arp_output(name, interface):
+    # incomplete, broadcast and multicast entries are dropped; short macOS octets are padded
+    table = parse_arp_output(read(name))
+    assert [(n.ip, n.mac, n.interface) for n in table] == [
+        ("192.168.1.1", "b8:27:eb:12:34:56", interface),
+        ("192.168.1.23", "00:0c:29:ab:cd:ef", interface),
+    ]
+
+
+def test_normalize_mac():
+    assert normalize_mac("0:C:29:a:B:c") == "00:0c:29:0a:0b:0c"
+    assert normalize_mac("b8-27-eb-12-34-56") == "b8:27:eb:12:34:56"
+
+
+def test_oui_vendor():
+    oui = OUITable()
+    assert oui.vendor("b8:27:eb:12:34:56") == "Raspberry Pi"
+    assert oui.vendor("00:0c:29:ab:cd:ef") == "VMware"
+    assert oui.vendor("00:00:01:00:00:00") is None
+    assert oui.vendor("") is None
+    # locally administered bit (0x2 in the first octet): a randomized phone/laptop address
+    assert oui.vendor("da:a1:19:00:11:22") == "private (randomized MAC)"
+    assert oui.vendor("12:34:56:78:9a:bc") == "private (randomized MAC)"
+
+
+def test_oui_ieee_csv(tmp_path):
+    csv = tmp_path / "oui.csv"
+    csv.write_text("Registry,Assignment,Organization Name,Organization Address\n"
+                   'MA-L,00000C,"Cisco Systems, Inc",170 West Tasman Dr.\n', encoding="utf-8")
+    oui = OUITable(csv)
+    assert oui.vendor("00:00:0c:01:02:03") == "Cisco Systems, Inc"
+
+
+def test_discover_from_fake_table():
+    report = discover(arp_table=FIXTURES / "proc_net_arp", oui=OUITable())
+    assert report["network"] is None
+    assert [(d["ip"], d["vendor"], d["seen_by"]) for d in report["devices"]] == [
+        ("192.168.1.1", "Raspberry Pi", "table"),
+        ("192.168.1.23", "VMware", "table"),
+        ("192.168.1.40", "private (randomized MAC)", "table"),
+        ("192.168.1.90", "private (randomized MAC)", "table"),
+    ]
+
+
+def test_discover_sweep_with_fake_probe():
+    async def probe(ip):
+        await asyncio.sleep(0)
+        return ip in ("192.168.1.1", "192.168.1.9")
+
+    report = discover(do_sweep=True, network="192.168.1.0/28", arp_table=FIXTURES / "proc_net_arp",
+                      oui=OUITable(), concurrency=4, probe=probe)
+    assert report["network"] == "192.168.1.0/28"
+    # table entries outside the swept subnet are dropped; a live host with no MAC still shows up
+    assert [(d["ip"], d["mac"], d["seen_by"]) for d in report["devices"]] == [
+        ("192.168.1.1", "b8:27:eb:12:34:56", "table"),
+        ("192.168.1.9", None, "sweep"),
+    ]
+
+
+@pytest.mark.parametrize("network", ["10.0.0.0/8", "8.8.8.0/24", "fd00::/64"])
+def test_sweep_rejects_big_or_public_networks(network):
+    with pytest.raises(ValueError):
+        check_network(network)
+
+
+def test_sweep_refuses_a_public_local_network(monkeypatch):
+    async def probe(ip):
+        raise AssertionError("probed " + ip)
+
+    # a cloud VM's default route sits on a public subnet
+    monkeypatch.setattr("tools.neighbors.local_network", lambda max_prefix=16: ipaddress.ip_network("45.33.32.0/24"))
+    with pytest.raises(ValueError):
+        discover(do_sweep=True, arp_table=FIXTURES / "proc_net_arp", oui=OUITable(), probe=probe)
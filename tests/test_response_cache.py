@@ -0,0 +1,63 @@
+"""
+Near-duplicate matching in the reply cache: rewordings hit, number changes miss.
+
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from core.response_cache import ResponseCache
+
+pytest.importorskip("rapidfuzz")
+
+SYSTEM = {"role": "system", "content": "You are a helpful assistant."}
+
+
+def turn(text: str) -> list:
+    return [SYSTEM, {"role": "user", "content": text}]
+
+
+def cache_with(prompt: str, reply: str) -> ResponseCache:
+    cache = ResponseCache(enabled=True)
+    cache.put(turn(prompt), "m", reply, latency=1.0)
+    return cache
+
+
+def test_exact_and_punctuation_hits():
+    cache = cache_with("What is the capital of France?", "Paris")
+    assert cache.get(turn("what is the capital of france"), "m").text == "Paris"
+    assert cache.exact_hits == 1
+
+
+def test_near_hit_for_reworded_prompt():
+    cache = cache_with("tell me a joke about cats please", "...")
+    assert cache.get(turn("tell me a joke about cat please"), "m") is not None
+    assert cache.near_hits == 1
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("what is 12*13", "what is 12*14"),
+    ("convert 100 usd to eur", "convert 200 usd to eur"),
+    ("set a timer for 5 minutes", "set a timer for 15 minutes"),
+    ("what is 12 minus 13", "what is 13 minus 12"),
+    ("what is 12*13", "what is 12*13*2"),
+])
+def test_number_changes_miss(cached, asked):
+    cache = cache_with(cached, "answer")
+    assert cache.get(turn(asked), "m") is None
+    assert cache.near_hits == 0
+
+
+def test_other_model_or_context_misses():
+    cache = cache_with("what is the capital of france", "Paris")
+    assert cache.get(turn("what is the capital of france"), "other") is None
+    earlier = [SYSTEM, {"role": "user", "content": "talk about germany"},
+               {"role": "assistant", "content": "ok"}, {"role": "user", "content": "what is the capital of france"}]
+    assert cache.get(earlier, "m") is None
@@ -0,0 +1,63 @@
+"""
+SpotifyGate sees Spotify's 429s and 5xx itself, against the benchmark's fake Web API.
+
+    python -m pytest tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+spotipy = pytest.importorskip("spotipy")
+
+from benchmarks.fake_spotify import FakeSpotify
+from tools.spotify_client import SpotifyGate, session
+
+
+@pytest.fixture
+def fake():
+    server = FakeSpotify(latency=0).start()
+    yield server
+    server.stop()
+
+
+def client(fake, gate):
+    sp = spotipy.Spotify(auth="fake-token", requests_session=session())
+    sp.prefix = fake.prefix
+    return gate.wrap(sp)
+
+
+def test_first_429_reaches_the_gate(fake):
+    gate = SpotifyGate(rate=100, burst=10)
+    sp = client(fake, gate)
+    fake.fail_next(429, retry_after=1)
+    start = time.perf_counter()
+    assert sp.search(q="hello", limit=1)["tracks"]["items"]
+    assert fake.calls["error_429"] == 1 and fake.calls["search"] == 1
+    assert gate.stats["rate_limited"] == 1 and gate.stats["retries"] == 1
+    assert time.perf_counter() - start >= 0.9  # waited out Retry-After in the shared bucket
+
+
+def test_server_errors_retry_in_the_gate(fake):
+    gate = SpotifyGate(rate=100, burst=10, default_retry_after=0.01)
+    sp = client(fake, gate)
+    fake.fail_next(503, retry_after=None, times=2)
+    assert sp.search(q="hello", limit=1)["tracks"]["items"]
+    assert fake.calls["error_503"] == 2
+    assert gate.stats["server_errors"] == 2 and gate.stats["retries"] == 2 and gate.stats["rate_limited"] == 0
+
+
+def test_gate_gives_up_after_max_retries(fake):
+    gate = SpotifyGate(rate=100, burst=10, max_retries=1, default_retry_after=0.01)
+    sp = client(fake, gate)
+    fake.fail_next(500, retry_after=None, times=5)
+    with pytest.raises(spotipy.SpotifyException) as err:
+        sp.search(q="hello", limit=1)
+    assert err.value.http_status == 500
+    assert fake.calls["error_500"] == 2 and gate.stats["failed"] == 1
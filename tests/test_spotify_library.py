@@ -0,0 +1,54 @@
+"""
+The library mirror forgets un-liked tracks, against the benchmark's fake Web API.
+
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+spotipy = pytest.importorskip("spotipy")
+
+from benchmarks.fake_spotify import FakeSpotify
+from tools.spotify_client import session
+from tools.spotify_library import LibraryMirror
+
+
+@pytest.fixture
+def fake():
+    server = FakeSpotify(latency=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mirror(fake, tmp_path):
+    sp = spotipy.Spotify(auth="fake-token", requests_session=session())
+    sp.prefix = fake.prefix
+    return LibraryMirror(tmp_path / "library.db", sp)
+
+
+def test_unliked_track_is_dropped_on_next_sync(fake, mirror):
+    mirror.sync()
+    track, _ = mirror.resolve("Saved 7")
+    assert track and track["name"] == "Saved 7"
+
+    del fake.saved[7]
+    mirror.sync()
+    assert mirror.last_sync["saved_tracks"] == 49
+    track, _ = mirror.resolve("Saved 7")
+    assert track is None or track["name"] != "Saved 7"
+
+
+def test_unchanged_library_stays_incremental(fake, mirror):
+    mirror.sync()
+    fake.calls.clear()
+    mirror.sync()
+    assert fake.calls["saved_tracks"] == 1
+    assert mirror.last_sync["saved_tracks"] == 1  # only the newest item is re-read
@@ -0,0 +1,58 @@
+"""
+Track search sends one Search per normalized query and page, against the benchmark's fake Web API.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+pytest.importorskip("spotipy")
+
+from benchmarks.fake_spotify import FakeSpotify
+
+
+@pytest.fixture(scope="module")
+def spotify():
+    fake = FakeSpotify(latency=0).start()
+    data_dir = tempfile.mkdtemp(prefix="q_test_")
+    os.environ.update({
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test"),
+        "OPENAI_MODEL_NAME": os.getenv("OPENAI_MODEL_NAME", "test-strong"),
+        "DATA_DIR": data_dir,
+        "LOG_FILE": str(Path(data_dir) / "project.log"),
+        "SPOTIFY_API_PREFIX": fake.prefix,
+        "SPOTIFY_ACCESS_TOKEN": "test",
+    })
+    import tools.spotify_player as player
+    if player._spotify_clients is not None:
+        pytest.skip("Spotify clients already built against another API")
+    yield fake, player
+    fake.stop()
+
+
+def test_queries_that_normalize_alike_search_once(spotify):
+    fake, player = spotify
+    player.get_search_cache().clear()
+    fake.reset_counts()
+    found = player.search_tracks(["blinding lights", "Blinding Lights", "blinding  lights!"], max_tracks=100)
+    assert fake.calls["search"] == 2  # one query, offsets 0 and 50
+    assert set(found) == {"blinding lights", "Blinding Lights", "blinding  lights!"}
+    assert found["blinding lights"] == found["Blinding Lights"] and found["blinding lights"]
+
+
+def test_query_best_song_without_artist_searches_once(spotify):
+    fake, player = spotify
+    player.get_search_cache().clear()
+    fake.reset_counts()
+    _, name, _, uri, _ = player.query_best_song("Blinding Lights")
+    assert uri and name.lower() == "blinding lights"
+    assert fake.calls["search"] == 2
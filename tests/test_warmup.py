@@ -0,0 +1,57 @@
+"""
+Speculative warm-up only fires on unmistakable requests (Spotify's __warm_when__).
+
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from core.warmup import Warmup
+from tools.registry import LazyTool, parse_tool_module
+
+
+@pytest.fixture(scope="module")
+def tool_map() -> dict:
+    meta = parse_tool_module(BASE_DIR / "tools" / "spotify_player.py")
+    return {e["name"]: LazyTool("tools.spotify_player", e["attr"], e["name"], e["description"], e["parameters"],
+                                warm=e["name"] in meta["warm_for"], warm_when=meta["warm_when"])
+            for e in meta["tools"]}
+
+
+@pytest.mark.parametrize("text", [
+    "play blinding lights",
+    "Play some jazz",
+    "please play the weeknd",
+    "can you put on something relaxing",
+    "hey supporter, play my gym playlist",
+    "queue up bohemian rhapsody",
+    "open spotify",
+    "what's on my chill playlist",
+])
+def test_music_requests_warm(text, tool_map):
+    assert Warmup.matching(text, tool_map)
+
+
+@pytest.mark.parametrize("text", [
+    "I was playing football yesterday",
+    "explain how a playstation works",
+    "who is the artist that painted the mona lisa",
+    "what's your favorite song?",
+    "the kids were playing outside",
+    "tell me about the album cover art of abbey road",
+    "",
+])
+def test_conversation_does_not_warm(text, tool_map):
+    assert not Warmup.matching(text, tool_map)
+
+
+def test_modules_without_patterns_never_warm():
+    tool = LazyTool("tools.x", "f", "play_x", "", {}, warm=True)
+    assert not Warmup.matching("play something", {"play_x": tool})
@@ -0,0 +1,30 @@
+"""
+Page text decoding in web search: pages without a header charset aren't read as Latin-1.
+
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from tools.web_search import page_encoding
+
+PAGE = "<html><body><p>Café crème brûlée — naïve façade, déjà vu in der Straße.</p></body></html>"
+
+
+def test_header_charset_wins():
+    assert page_encoding("text/html; charset=ISO-8859-1", PAGE.encode("utf-8")) == "iso8859-1"
+
+
+def test_meta_charset_when_header_has_none():
+    body = b"<head><meta http-equiv='Content-Type' content='text/html; charset=windows-1252'></head>"
+    assert page_encoding("text/html", body + PAGE.encode("cp1252")) == "cp1252"
+
+
+def test_utf8_page_without_any_charset():
+    body = PAGE.encode("utf-8")
+    assert body.decode(page_encoding("text/html", body)) == PAGE
@@ -1,7 +1,226 @@
 from langchain.tools import tool
 from PIL import Image
+import numpy as np
 import pytesseract
+import hashlib
 import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from core.cache import TTLCache
+
+__requires__ = ("pytesseract",)
+
+# Frames wider than this are downscaled before OCR; screen text stays legible
+# and Tesseract's time grows with pixel count.
+MAX_WIDTH = int(os.getenv("OCR_MAX_WIDTH", "1920"))
+
+# OCR results keyed on a perceptual hash of the preprocessed frame.
+_ocr_cache = TTLCache(maxsize=32, ttl=float(os.getenv("OCR_CACHE_TTL", "60")))
+
+# Tiled engine: target tile size (tiles only ever end on blank rows/columns, so
+# they can come out bigger) and how many Tesseract processes run at once.
+TILE_HEIGHT = int(os.getenv("OCR_TILE_HEIGHT", "256"))
+TILE_WIDTH = int(os.getenv("OCR_TILE_WIDTH", "1024"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or min(8, os.cpu_count() or 2)
+
+# A row/column whose brightness range is below this counts as blank background.
+BLANK_RANGE = 16
+
+
+# ---------------- PREPROCESSING ----------------
+
+def to_gray(frame) -> Image.Image:
+    """BGRA/BGR/RGB numpy frame (e.g. from mss) or PIL image -> 8-bit grayscale PIL image, without a file round-trip."""
+    if isinstance(frame, Image.Image):
+        return frame.convert("L")
+    arr = np.asarray(frame)
+    if arr.ndim == 2:
+        return Image.fromarray(arr.astype(np.uint8, copy=False))
+    if arr.ndim == 3 and arr.shape[2] == 4 and arr.dtype == np.uint8:
+        # mss frames are BGRA: let PIL's C decoder swizzle and convert in one pass
+        h, w = arr.shape[:2]
+        return Image.frombuffer("RGB", (w, h), np.ascontiguousarray(arr), "raw", "BGRX", 0, 1).convert("L")
+    # weights follow ITU-R 601 like PIL's "L" conversion
+    b, g, r = arr[..., 0], arr[..., 1], arr[..., 2]
+    gray = (r * 0.299 + g * 0.587 + b * 0.114).astype(np.uint8)
+    return Image.fromarray(gray)
+
+
+def preprocess(frame, max_width: int = MAX_WIDTH) -> Image.Image:
+    img = to_gray(frame)
+    if max_width and img.width > max_width:
+        factor = -(-img.width // max_width)  # ceil
+        img = img.reduce(factor)  # box filter: fast and keeps glyph edges readable
+    return img
+
+
+def dhash(img: Image.Image, cols: int = 256) -> str:
+    """
+    Difference hash on a fine grid (~8px cells on a 1080p frame). A coarse 8x8
+    dHash can't tell a screen apart from the same screen with a line of text
+    erased, and that would return stale text, so near-identical frames only
+    share a key when the change is below the grid's resolution.
+    """
+    cols = max(8, min(cols, img.width // 8))
+    rows = max(8, round(cols * img.height / img.width))
+    small = np.asarray(img.resize((cols + 1, rows), Image.BILINEAR), dtype=np.int16)
+    bits = small[:, 1:] > small[:, :-1]
+    return hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16).hexdigest()
+
+
+# ---------------- OCR ----------------
+
+def ocr_image(frame, max_width: int = MAX_WIDTH, use_cache: bool = True) -> tuple:
+    """OCR a frame or image in memory. Returns (text, cached)."""
+    img = preprocess(frame, max_width)
+    key = (dhash(img), img.size) if use_cache else None
+    if key is not None:
+        hit = _ocr_cache.get(key)
+        if hit is not None:
+            return hit, True
+    text = pytesseract.image_to_string(img).strip()
+    if key is not None:
+        _ocr_cache.set(key, text)
+    return text, False
+
+
+# ---------------- TILED ENGINE ----------------
+
+def _cuts(blank: np.ndarray, target: int) -> list:
+    """
+    Boundaries roughly every `target` px along one axis, each moved to the blank
+    line nearest to it so a cut never runs through a line of text. If there's no
+    blank line nearby the tile just keeps growing until there is one.
+    """
+    n = len(blank)
+    cuts = [0]
+    candidates = np.flatnonzero(blank)
+    pos = target
+    while pos < n - target // 2:
+        i = np.searchsorted(candidates, pos - target // 2)
+        if i >= len(candidates):
+            break
+        ahead = candidates[i:]
+        cut = int(ahead[np.argmin(np.abs(ahead - pos))]) if ahead[0] <= pos + target // 2 else int(ahead[0])
+        cuts.append(cut)
+        pos = cut + target
+    cuts.append(n)
+    return cuts
+
+
+def _ocr_tile(tile: np.ndarray) -> str:
+    if int(tile.max()) - int(tile.min()) < BLANK_RANGE:
+        return ""
+    return pytesseract.image_to_string(Image.fromarray(tile)).strip()
+
+
+class TiledOCR:
+    """
+    OCR for big or repeatedly-read frames. A frame whose dhash is already in the
+    OCR cache returns that text without tiling. Otherwise it is cut into tiles along
+    blank rows/columns, tiles identical to the same tile in the previous frame
+    of that area reuse its text, the rest are read concurrently, and the text is
+    stitched back in reading order (column strips left to right, top to bottom
+    within each).
+
+    pytesseract runs every call in its own tesseract process, so a thread pool
+    is enough to keep several cores busy without pickling tiles across processes.
+    """
+
+    def __init__(self, tile_height: int = TILE_HEIGHT, tile_width: int = TILE_WIDTH,
+                 workers: int = OCR_WORKERS, max_width: int = MAX_WIDTH, areas: int = 8):
+        self.tile_height = tile_height
+        self.tile_width = tile_width
+        self.workers = workers
+        self.max_width = max_width
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self._prev = OrderedDict()  # area key -> (gray frame, {rect: text})
+        self._areas = areas
+        self._lock = threading.Lock()
+        self.stats = Counter()  # frames, cached, tiles, read, reused, empty
+        # Tesseract's own OpenMP threads would fight the pool for the same cores.
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    def layout(self, gray: np.ndarray) -> list:
+        """Tile rectangles (top, bottom, left, right) in reading order."""
+        tiles = []
+        col_blank = np.ptp(gray, axis=0) < BLANK_RANGE
+        xs = _cuts(col_blank, self.tile_width)
+        for left, right in zip(xs, xs[1:]):
+            strip = gray[:, left:right]
+            ys = _cuts(np.ptp(strip, axis=1) < BLANK_RANGE, self.tile_height)
+            tiles.extend((top, bottom, left, right) for top, bottom in zip(ys, ys[1:]))
+        return tiles
+
+    def read(self, frame, key=None, use_cache: bool = True) -> str:
+        """
+        OCR a frame. `key` names the screen area it came from (e.g. a region or
+        window); only frames with the same key are diffed against each other.
+        """
+        img = preprocess(frame, self.max_width)
+        cache_key = (dhash(img), img.size) if use_cache else None
+        if cache_key is not None:
+            hit = _ocr_cache.get(cache_key)
+            if hit is not None:
+                with self._lock:
+                    self.stats["frames"] += 1
+                    self.stats["cached"] += 1
+                return hit
+        gray = np.asarray(img)
+        rects = self.layout(gray)
+
+        with self._lock:
+            prev = self._prev.get(key)
+        texts = {}
+        if prev is not None and prev[0].shape == gray.shape:
+            prev_gray, prev_texts = prev
+            changed = prev_gray != gray
+            for r in rects:
+                top, bottom, left, right = r
+                if r in prev_texts and not changed[top:bottom, left:right].any():
+                    texts[r] = prev_texts[r]
+
+        todo = [r for r in rects if r not in texts]
+        tiles = [gray[top:bottom, left:right] for top, bottom, left, right in todo]
+        texts.update(zip(todo, self._pool.map(_ocr_tile, tiles)))
+
+        with self._lock:
+            self._prev[key] = (gray, texts)
+            self._prev.move_to_end(key)
+            while len(self._prev) > self._areas:
+                self._prev.popitem(last=False)
+            self.stats["frames"] += 1
+            self.stats["tiles"] += len(rects)
+            self.stats["read"] += len(todo)
+            self.stats["reused"] += len(rects) - len(todo)
+            self.stats["empty"] += sum(1 for r in todo if not texts[r])
+        text = "\n".join(texts[r] for r in rects if texts[r])
+        if cache_key is not None:
+            _ocr_cache.set(cache_key, text)
+        return text
+
+    def reset(self):
+        with self._lock:
+            self._prev.clear()
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"OCR: {s['frames']} frames ({s['cached']} cached), {s['tiles']} tiles, {s['read']} read, "
+                f"{s['reused']} reused from the previous frame, {s['empty']} empty")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TiledOCR:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TiledOCR()
+        return _engine
+
 
 @tool("read_latest_screenshot", return_direct=True)
 def read_text_from_latest_image() -> str:
@@ -18,8 +237,8 @@ def read_text_from_latest_image() -> str:
         return "Screenshot not found at ./path/to/example.png."
 
     try:
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img)
-        return text.strip() if text else "No readable text found in the screenshot."
+        with Image.open(image_path) as img:
+            text, _ = ocr_image(img)
+        return text if text else "No readable text found in the screenshot."
     except Exception as e:
         return f"Failed to extract text: {str(e)}"
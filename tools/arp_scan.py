@@ -1,27 +1,30 @@
 from langchain.tools import tool
-import subprocess
-import platform
+import json
 
-@tool("arp_scan_terminal", return_direct=True)
-def arp_scan_terminal() -> str:
+@tool("scan_network", return_direct=True)
+def scan_network(sweep: bool = False, subnet: str = "") -> str:
     """
-    Runs 'arp -a' in a new Terminal window on macOS.
-    Example queries:
+    Lists the devices on the local network (IP, MAC address, vendor) from the
+    system's neighbor (ARP) table. With sweep=true it first probes every address
+    in the local subnet (or `subnet`, a private range no bigger than /16, e.g.
+    "192.168.1.0/24") to find devices that have been quiet. Example queries:
     - "Show me the ARP table"
     - "Run arp scan"
-    - "Find all devices on my network"
+    - "Find all devices on my network" (sweep=true)
     """
-    system = platform.system()
-
-    if system == "Darwin":
-        apple_script = '''
-        tell application "Terminal"
-            activate
-            do script "arp -a"
-        end tell
-        '''
-        subprocess.Popen(["osascript", "-e", apple_script])
-        return "Absolutely sir! All devices on your network are now been listed in your Terminal, what else can I help with?."
+    from core.config import ARP_TABLE, LAN_SCAN_CONCURRENCY
+    from tools.neighbors import discover
+    try:
+        report = discover(do_sweep=sweep, network=subnet or None, arp_table=ARP_TABLE,
+                          concurrency=LAN_SCAN_CONCURRENCY)
+    except Exception as e:
+        return f"Network scan failed: {e}"
 
+    devices = report["devices"]
+    if report["network"]:
+        head = f"Found {len(devices)} devices on {report['network']} (sweep took {report['sweep_seconds']:.1f}s):"
     else:
-        return f"⚠️ arp scan in terminal only implemented for macOS Terminal, not {system}."
+        head = f"{len(devices)} devices in the neighbor table:"
+    if not devices:
+        return head.replace(":", ".")
+    return head + "\n" + "\n".join(json.dumps(d) for d in devices)
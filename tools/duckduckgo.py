@@ -1,10 +1,14 @@
 from langchain.tools import tool
-from duckduckgo_search import DDGS
+from tools.web_search import get_searcher, format_report
+
+# No __requires__: with WEB_SEARCH_BACKEND set, duckduckgo_search isn't needed;
+# get_searcher() says so when neither is available.
 
 @tool("duckduckgo_search", return_direct=True)
 def duckduckgo_search_tool(query: str) -> str:
     """
-    Perform a web search using DuckDuckGo and return the top result.
+    Perform a web search using DuckDuckGo and return the top results with snippets
+    and the text of the first few pages.
     Use this tool when the user asks a question that requires up-to-date information from the internet.
     
     Examples of queries:
@@ -15,16 +19,16 @@ def duckduckgo_search_tool(query: str) -> str:
     Input:
     - A natural language query string.
     """
-    with DDGS() as ddgs:
-        results = ddgs.text(query, region='wt-wt', safesearch='Moderate', max_results=1)
-        results_list = list(results)
+    from core.config import WEB_SEARCH_RESULTS, WEB_SEARCH_FETCH
+    try:
+        report = get_searcher().search(query, n=WEB_SEARCH_RESULTS, fetch=WEB_SEARCH_FETCH)
+    except Exception as e:
+        return f"Apologies, the search for \"{query}\" failed: {e}"
 
-    if not results_list:
+    if not report["results"]:
         return f"Apologies, I couldn't find any results for: \"{query}\"."
 
-    top = results_list[0]
     return (
-        f"Certainly sir, here's the top result for: \"{query}\"\n\n"
-        f"🔹 Title: {top['title']}\n"
-        f"🔗 URL: {top['href']}\n"
+        f"Certainly sir, here's what I found for: \"{query}\"\n\n"
+        + format_report(report)
     )
@@ -0,0 +1,269 @@
+"""
+LAN discovery behind the scan_network tool.
+
+The kernel's neighbor table (/proc/net/arp on Linux, `arp -a` elsewhere) already
+lists every device we've talked to recently. An optional sweep knocks on every
+address in the local subnet with short TCP connects on an asyncio loop, with a
+fixed number of probes in flight and open sockets capped below the process's
+file-descriptor limit: a handshake or a refusal proves the host is up, and even a
+silent host gets ARP-resolved along the way, so re-reading the table afterwards
+picks up its MAC. Only private IPv4 subnets of /16 or smaller are swept. Vendors
+come from a bundled OUI table.
+
+ARP_TABLE / OUI_FILE point at other files (a fake table for testing, the full
+IEEE oui.csv).
+"""
+
+import re
+import time
+import errno
+import socket
+import asyncio
+import ipaddress
+import platform
+import subprocess
+import contextlib
+from pathlib import Path
+from functools import partial
+from collections import namedtuple
+
+OUI_TABLE = Path(__file__).resolve().parent.parent / "assets" / "oui.tsv"
+PROC_ARP = "/proc/net/arp"
+
+# Closed ports answer with RST just as fast as open ones answer SYN/ACK.
+PROBE_PORTS = (80, 443, 22, 445, 62078)
+
+Neighbor = namedtuple("Neighbor", "ip mac interface source")
+
+_MAC_RE = re.compile(r"([0-9a-f]{1,2}(?:[:-][0-9a-f]{1,2}){5})", re.IGNORECASE)
+_IP_RE = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+_IFACE_RE = re.compile(r"\bon (\S+)|Interface: (\S+)")
+
+
+def normalize_mac(mac: str) -> str:
+    """'0:1b:63:a-...' style -> 'aa:bb:cc:dd:ee:ff'."""
+    return ":".join(part.zfill(2) for part in re.split(r"[:-]", mac.lower()))
+
+
+# ---------------- NEIGHBOR TABLE ----------------
+
+def read_proc_arp(path=PROC_ARP) -> list:
+    """Complete entries of a /proc/net/arp-format table (flag 0x0 means the lookup never finished)."""
+    out = []
+    with open(path, encoding="utf-8") as f:
+        next(f, None)  # header
+        for line in f:
+            cols = line.split()
+            if len(cols) < 6:
+                continue
+            ip, _, flags, mac, _, iface = cols[:6]
+            if int(flags, 16) & 0x2 and mac != "00:00:00:00:00:00":
+                out.append(Neighbor(ip, normalize_mac(mac), iface, "table"))
+    return out
+
+
+def parse_arp_output(text: str) -> list:
+    """`arp -a` output from macOS/BSD ("? (ip) at mac on en0"), Linux or Windows ("ip  mac  dynamic")."""
+    out, iface = [], None
+    for line in text.splitlines():
+        m = _IFACE_RE.search(line)
+        if m and m.group(2):  # Windows section header names the interface by its address
+            iface = m.group(2)
+            continue
+        ip, mac = _IP_RE.search(line), _MAC_RE.search(line)
+        if not ip or not mac or "incomplete" in line:
+            continue
+        mac = normalize_mac(mac.group(1))
+        if mac in ("ff:ff:ff:ff:ff:ff", "00:00:00:00:00:00") or int(mac[:2], 16) & 0x1:
+            continue  # broadcast / multicast entries
+        out.append(Neighbor(ip.group(1), mac, (m.group(1) if m else None) or iface or "", "table"))
+    return out
+
+
+def neighbor_table(path=None) -> list:
+    path = path or PROC_ARP
+    if Path(path).exists():
+        return read_proc_arp(path)
+    flags = ["-a"] if platform.system() == "Windows" else ["-an"]
+    result = subprocess.run(["arp", *flags], capture_output=True, text=True, timeout=10)
+    return parse_arp_output(result.stdout)
+
+
+# ---------------- VENDORS ----------------
+
+class OUITable:
+    def __init__(self, path: Path = OUI_TABLE):
+        self._vendors = {}
+        self.load(path)
+
+    def load(self, path: Path):
+        """Bundled TSV (prefix, vendor) or the IEEE oui.csv (Registry,Assignment,Organization Name,...)."""
+        import csv
+        with open(path, encoding="utf-8", newline="") as f:
+            if str(path).endswith(".csv"):
+                for row in csv.reader(f):
+                    if len(row) >= 3 and len(row[1]) == 6 and row[1] != "Assignment":
+                        self._vendors[row[1].upper()] = row[2].strip()
+            else:
+                for line in f:
+                    if line.strip() and not line.startswith("#"):
+                        prefix, vendor = line.rstrip("\n").split("\t", 1)
+                        self._vendors[prefix.upper()] = vendor
+
+    def __len__(self):
+        return len(self._vendors)
+
+    def vendor(self, mac: str) -> str | None:
+        if not mac:
+            return None
+        if int(mac[:2], 16) & 0x2:
+            return "private (randomized MAC)"  # locally administered: phones hide their real address
+        return self._vendors.get(mac.replace(":", "")[:6].upper())
+
+
+# ---------------- SWEEP ----------------
+
+def local_network(max_prefix: int = 16) -> ipaddress.IPv4Network | None:
+    """The subnet of the interface that carries the default route (narrowed to at most /max_prefix)."""
+    import psutil
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("192.0.2.1", 9))  # UDP connect sends nothing; it just picks the outgoing address
+            local_ip = s.getsockname()[0]
+    except OSError:
+        return None
+    for addrs in psutil.net_if_addrs().values():
+        for a in addrs:
+            if a.family == socket.AF_INET and a.address == local_ip and a.netmask:
+                net = ipaddress.IPv4Interface(f"{a.address}/{a.netmask}").network
+                if net.prefixlen < max_prefix:
+                    net = ipaddress.IPv4Interface(f"{a.address}/{max_prefix}").network
+                return net
+    return ipaddress.IPv4Interface(f"{local_ip}/24").network
+
+
+def socket_budget() -> int:
+    """Sockets a sweep may hold open at once: half the soft RLIMIT_NOFILE (256 on macOS, 1024 on most Linux)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 512
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return 1024
+    return max(8, min(1024, soft // 2))
+
+
+async def tcp_probe(ip: str, ports=PROBE_PORTS, timeout: float = 0.6, sockets: asyncio.Semaphore | None = None) -> bool:
+    """
+    True if any port completes a handshake or actively refuses within `timeout`.
+    `sockets` is shared across a sweep and held around each connect; the timeout
+    starts once a slot is free. Running out of descriptors raises instead of
+    reporting the host as down.
+    """
+    async def knock(port):
+        async with sockets or contextlib.nullcontext():
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+                writer.close()
+                with contextlib.suppress(OSError):
+                    await writer.wait_closed()
+                return True
+            except ConnectionRefusedError:
+                return True
+            except OSError as e:
+                if e.errno in (errno.EMFILE, errno.ENFILE):
+                    raise
+                return False
+            except asyncio.TimeoutError:
+                return False
+
+    tasks = [asyncio.ensure_future(knock(p)) for p in ports]
+    try:
+        for done in asyncio.as_completed(tasks):
+            if await done:
+                return True
+        return False
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def sweep(network, probe=tcp_probe, concurrency: int = 256) -> tuple:
+    """
+    Probe every host address in `network` with `concurrency` workers pulling from
+    one iterator, so a /16 never holds more than `concurrency` probes in flight.
+    Returns (alive ips, seconds).
+    """
+    network = ipaddress.ip_network(network, strict=False)
+    hosts = iter(network.hosts())
+    alive = []
+
+    async def worker():
+        for ip in hosts:
+            ip = str(ip)
+            if await probe(ip):
+                alive.append(ip)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return sorted(alive, key=ipaddress.ip_address), time.perf_counter() - start
+
+
+def check_network(network, max_prefix: int = 16) -> ipaddress.IPv4Network:
+    """`network` as an IPv4Network if it's a private subnet no bigger than /max_prefix, else ValueError."""
+    net = ipaddress.ip_network(network, strict=False)
+    if net.version != 4 or not net.is_private:
+        raise ValueError(f"{net} isn't a private IPv4 network; only the local network can be swept")
+    if net.prefixlen < max_prefix:
+        raise ValueError(f"{net} is too big to sweep; use a /{max_prefix} or smaller")
+    return net
+
+
+def discover(do_sweep: bool = False, network=None, arp_table=None, oui: OUITable | None = None,
+             concurrency: int = 256, probe=None, max_prefix: int = 16) -> dict:
+    """
+    Devices on the LAN as plain dicts (ip, mac, vendor, interface, seen_by),
+    plus the swept subnet and timings. `probe` defaults to tcp_probe with a
+    shared socket_budget() cap.
+    """
+    oui = oui or get_oui()
+    start = time.perf_counter()
+    devices = {n.ip: n for n in neighbor_table(arp_table)}
+    report = {"network": None, "sweep_seconds": None, "table_seconds": time.perf_counter() - start}
+
+    if do_sweep:
+        net = network or local_network(max_prefix)
+        if net is None:
+            raise RuntimeError("couldn't work out the local subnet; pass one like 192.168.1.0/24")
+        # the detected subnet goes through the same checks: on a VPS the default route is public
+        net = check_network(net, max_prefix)
+        if probe is None:
+            probe = partial(tcp_probe, sockets=asyncio.Semaphore(socket_budget()))
+        alive, seconds = asyncio.run(sweep(net, probe, concurrency))
+        report["network"], report["sweep_seconds"] = str(net), seconds
+        for n in neighbor_table(arp_table):  # the sweep filled in MACs for hosts that answered ARP
+            devices.setdefault(n.ip, n._replace(source="sweep"))
+        for ip in alive:
+            devices.setdefault(ip, Neighbor(ip, "", "", "sweep"))
+        devices = {ip: n for ip, n in devices.items() if ipaddress.ip_address(ip) in net}
+
+    report["devices"] = [
+        {"ip": n.ip, "mac": n.mac or None, "vendor": oui.vendor(n.mac), "interface": n.interface or None,
+         "seen_by": n.source}
+        for n in sorted(devices.values(), key=lambda n: ipaddress.ip_address(n.ip))
+    ]
+    return report
+
+
+_oui = None
+
+
+def get_oui() -> OUITable:
+    global _oui
+    if _oui is None:
+        from core.config import OUI_FILE
+        _oui = OUITable(OUI_TABLE)
+        if OUI_FILE:
+            _oui.load(Path(OUI_FILE))
+    return _oui
@@ -0,0 +1,252 @@
+"""
+Lazy tool registry.
+
+Discovers `@tool` functions in the tools package by parsing source with `ast`,
+so schemas are built without importing the module (or spotipy, pycaw, ...).
+The module is imported on the tool's first invocation. Parsed metadata is cached
+on disk keyed by file mtime/size, so startup is a stat() per module.
+
+A tool module may declare, as literals:
+    __requires__ = ("spotipy",)     # keys of core.capabilities.cap
+    __platforms__ = ("Windows",)    # platform.system() values
+    __warm_for__ = ("play_x",)      # tools worth a speculative warm_up() (see core.warmup)
+    __warm_when__ = (r"^play\b",)   # regexes the user's text must match before warming
+"""
+
+import ast
+import json
+import time
+import inspect
+import logging
+import platform
+import importlib
+import threading
+from pathlib import Path
+from core.capabilities import cap
+
+logger = logging.getLogger(__name__)
+
+TOOLS_DIR = Path(__file__).resolve().parent
+PACKAGE = "tools"
+CACHE_VERSION = 3
+
+# Modules in the package that never define tools.
+_SKIP_MODULES = {"__init__", "registry"}
+
+_JSON_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "dict": "object",
+}
+
+
+# ---------------- AST METADATA ----------------
+
+def _is_tool_decorator(node) -> bool:
+    target = node.func if isinstance(node, ast.Call) else node
+    if isinstance(target, ast.Name):
+        return target.id == "tool"
+    if isinstance(target, ast.Attribute):
+        return target.attr == "tool"
+    return False
+
+
+def _annotation_type(node) -> str:
+    """Map a (simple) annotation to a JSON schema type; unannotated args are strings."""
+    if node is None:
+        return "string"
+    if isinstance(node, ast.Name):
+        return _JSON_TYPES.get(node.id, "string")
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return _JSON_TYPES.get(node.value, "string")
+    # `X | None`
+    if isinstance(node, ast.BinOp):
+        for side in (node.left, node.right):
+            if not (isinstance(side, ast.Constant) and side.value is None):
+                return _annotation_type(side)
+    # `Optional[X]`, `list[X]`
+    if isinstance(node, ast.Subscript):
+        base = node.value.id if isinstance(node.value, ast.Name) else ""
+        if base == "Optional":
+            return _annotation_type(node.slice)
+        return _JSON_TYPES.get(base, "string")
+    return "string"
+
+
+def _parameters(func: ast.FunctionDef) -> dict:
+    args = func.args.args
+    n_required = len(args) - len(func.args.defaults)
+    properties, required = {}, []
+    for i, arg in enumerate(args):
+        properties[arg.arg] = {"type": _annotation_type(arg.annotation)}
+        if i < n_required:
+            required.append(arg.arg)
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _literal(tree: ast.Module, name: str, path: Path):
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in node.targets):
+            try:
+                return list(ast.literal_eval(node.value))
+            except ValueError:
+                logger.warning("%s must be a literal in %s", name, path.name)
+    return []
+
+
+def parse_tool_module(path: Path) -> dict:
+    """Extract tool metadata from a module's source without importing it."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    entries = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        decorator = next((d for d in node.decorator_list if _is_tool_decorator(d)), None)
+        if decorator is None:
+            continue
+        name = node.name
+        if isinstance(decorator, ast.Call) and decorator.args and isinstance(decorator.args[0], ast.Constant):
+            name = decorator.args[0].value
+        entries.append({
+            "name": name,
+            "attr": node.name,
+            "description": inspect.cleandoc(ast.get_docstring(node) or "No description available"),
+            "parameters": _parameters(node),
+        })
+    return {
+        "tools": entries,
+        "requires": _literal(tree, "__requires__", path),
+        "platforms": _literal(tree, "__platforms__", path),
+        "warm_for": _literal(tree, "__warm_for__", path),
+        "warm_when": _literal(tree, "__warm_when__", path),
+    }
+
+
+# ---------------- LAZY TOOL ----------------
+
+class LazyTool:
+    """Stands in for a langchain tool; imports its module on first `.run()`."""
+
+    def __init__(self, module: str, attr: str, name: str, description: str, parameters: dict,
+                 warm: bool = False, warm_when: tuple = ()):
+        self.module = module
+        self.attr = attr
+        self.name = name
+        self.description = description
+        self.warm = warm  # the module's warm_up() is worth running when the text matches warm_when
+        self.warm_when = tuple(warm_when)
+        self.schema = {
+            "type": "function",
+            "function": {"name": name, "description": description, "parameters": parameters},
+        }
+        self._tool = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    def load(self):
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    start = time.perf_counter()
+                    mod = importlib.import_module(self.module)
+                    self._tool = getattr(mod, self.attr)
+                    logger.info("loaded tool %s from %s in %.0fms", self.name, self.module,
+                                (time.perf_counter() - start) * 1000)
+        return self._tool
+
+    def run(self, tool_input, **kwargs):
+        return self.load().run(tool_input, **kwargs)
+
+    def __repr__(self):
+        return f"LazyTool({self.module}.{self.attr}, loaded={self.loaded})"
+
+
+# ---------------- REGISTRY ----------------
+
+class ToolRegistry:
+    def __init__(self, tools_dir: Path = TOOLS_DIR, package: str = PACKAGE, cache_file: Path | None = None):
+        self.tools_dir = Path(tools_dir)
+        self.package = package
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.skipped = {}  # tool name -> reason it was gated out
+
+    def _load_cache(self) -> dict:
+        if not self.cache_file or not self.cache_file.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data.get("modules", {}) if data.get("version") == CACHE_VERSION else {}
+
+    def _save_cache(self, modules: dict):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps({"version": CACHE_VERSION, "modules": modules}), encoding="utf-8")
+        except OSError as e:
+            logger.warning("could not write tool registry cache: %s", e)
+
+    def _gate(self, meta: dict) -> str | None:
+        """Return why a module's tools are unavailable here, or None."""
+        platforms = meta.get("platforms") or []
+        if platforms and platform.system() not in platforms:
+            return f"needs {'/'.join(platforms)}"
+        missing = [r for r in meta.get("requires") or [] if not cap.get(r, False)]
+        if missing:
+            return f"missing {', '.join(missing)}"
+        return None
+
+    def discover(self) -> list:
+        start = time.perf_counter()
+        cached = self._load_cache()
+        modules, parsed = {}, 0
+
+        for path in sorted(self.tools_dir.glob("*.py")):
+            if path.stem in _SKIP_MODULES:
+                continue
+            st = path.stat()
+            meta = cached.get(path.stem)
+            if not meta or meta.get("mtime") != st.st_mtime_ns or meta.get("size") != st.st_size:
+                try:
+                    meta = parse_tool_module(path)
+                except (SyntaxError, OSError) as e:
+                    logger.warning("skipping tool module %s: %s", path.name, e)
+                    continue
+                meta.update(mtime=st.st_mtime_ns, size=st.st_size)
+                parsed += 1
+            modules[path.stem] = meta
+
+        if parsed or modules.keys() != cached.keys():
+            self._save_cache(modules)
+
+        tools = []
+        self.skipped.clear()
+        for stem, meta in modules.items():
+            reason = self._gate(meta)
+            for entry in meta["tools"]:
+                if reason:
+                    self.skipped[entry["name"]] = reason
+                    continue
+                tools.append(LazyTool(f"{self.package}.{stem}", entry["attr"], entry["name"],
+                                      entry["description"], entry["parameters"],
+                                      warm=entry["name"] in (meta.get("warm_for") or []),
+                                      warm_when=meta.get("warm_when") or ()))
+
+        logger.info("tool registry: %d tools from %d modules (%d parsed, %d gated) in %.1fms",
+                    len(tools), len(modules), parsed, len(self.skipped), (time.perf_counter() - start) * 1000)
+        for name, reason in self.skipped.items():
+            logger.info("tool %s unavailable: %s", name, reason)
+        return tools
+
+
+def discover_tools(cache_file: Path | None = None) -> list:
+    """Discover every available tool in the tools package."""
+    return ToolRegistry(cache_file=cache_file).discover()
@@ -0,0 +1,90 @@
+"""
+Capture-and-read in one step: the mss frame goes straight to OCR as an array,
+with no PNG written or decoded in between. An unchanged screen is answered from
+the OCR cache; after a small change the tiled engine only re-reads the tiles
+that changed.
+"""
+
+from langchain.tools import tool
+import re
+import shutil
+import subprocess
+import numpy as np
+import mss
+from core.capabilities import cap
+from tools.OCR import get_engine
+
+__requires__ = ("mss", "pytesseract")
+
+
+# ---------------- CAPTURE ----------------
+
+def parse_region(region: str) -> dict | None:
+    """'x,y,width,height' (spaces or commas) -> an mss monitor dict."""
+    nums = [int(n) for n in re.findall(r"-?\d+", region or "")]
+    if len(nums) != 4 or nums[2] <= 0 or nums[3] <= 0:
+        return None
+    left, top, width, height = nums
+    return {"left": left, "top": top, "width": width, "height": height}
+
+
+def window_region(title: str) -> dict | None:
+    """Screen rectangle of the first visible window whose title contains `title`."""
+    if cap.get("pygetwindow"):
+        import pygetwindow
+        for win in pygetwindow.getWindowsWithTitle(title):
+            if win.width > 0 and win.height > 0:
+                return {"left": win.left, "top": win.top, "width": win.width, "height": win.height}
+        return None
+    if shutil.which("xdotool"):
+        found = subprocess.run(["xdotool", "search", "--onlyvisible", "--name", title],
+                               capture_output=True, text=True, timeout=2)
+        ids = found.stdout.split()
+        if not ids:
+            return None
+        geo = subprocess.run(["xdotool", "getwindowgeometry", "--shell", ids[0]],
+                             capture_output=True, text=True, timeout=2)
+        vals = dict(line.split("=", 1) for line in geo.stdout.splitlines() if "=" in line)
+        try:
+            return {"left": int(vals["X"]), "top": int(vals["Y"]),
+                    "width": int(vals["WIDTH"]), "height": int(vals["HEIGHT"])}
+        except (KeyError, ValueError):
+            return None
+    raise RuntimeError("window capture needs pygetwindow (Windows/macOS) or xdotool (Linux)")
+
+
+def grab(area: dict | None = None) -> np.ndarray:
+    """Grab the primary monitor, or `area`, as an HxWx4 BGRA array."""
+    with mss.mss() as sct:
+        shot = sct.grab(area or sct.monitors[1])  # [1] = main monitor; [0] = all monitors
+        return np.asarray(shot)
+
+
+# ---------------- TOOL ----------------
+
+@tool("read_screen", return_direct=True)
+def read_screen(region: str = "", window: str = "") -> str:
+    """
+    Captures the screen and reads its text in one step (no screenshot file).
+    Optional: region="x,y,width,height" to read part of the screen, or
+    window="<title text>" to read a single window.
+
+    Use this tool when the user says something like:
+    - "Read my screen"
+    - "What does this window say?"
+    - "Read the text in the top-left corner"
+    """
+    try:
+        area = None
+        if window:
+            area = window_region(window)
+            if area is None:
+                return f"No visible window matching '{window}'."
+        elif region:
+            area = parse_region(region)
+            if area is None:
+                return f"Couldn't understand region '{region}'; use x,y,width,height."
+        text = get_engine().read(grab(area), key=repr(area))
+        return text if text else "No readable text found on the screen."
+    except Exception as e:
+        return f"Failed to read the screen: {str(e)}"
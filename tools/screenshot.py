@@ -3,6 +3,8 @@ import os
 import mss
 import mss.tools
 
+__requires__ = ("mss",)
+
 @tool("capture_screenshot", return_direct=True)
 def take_screenshot() -> str:
     """
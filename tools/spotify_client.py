@@ -0,0 +1,185 @@
+"""
+Coordinated access to the Spotify Web API.
+
+`SpotifyGate` wraps the spotipy clients so every call:
+  - takes a token from one bucket shared by all clients,
+  - is retried after `Retry-After` on a 429, and with backoff on a 5xx,
+  - is coalesced with an identical read already in flight (single-flight).
+
+The clients must be built with `session()`: spotipy's own urllib3 Retry would
+otherwise sleep through any 429 that carries Retry-After (all of Spotify's do)
+inside the session, out of the gate's sight.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future
+import requests
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# The limiter the Spotify tools are using, once they've been loaded.
+current = None
+
+# Statuses the gate retries; 429 waits for Retry-After, the rest back off exponentially.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Read-only endpoints that are safe to share between concurrent callers.
+_COALESCE = {
+    "track", "tracks", "artist", "artist_related_artists", "artist_top_tracks", "search", "devices",
+    "current_playback", "currently_playing", "queue", "current_user_playlists", "current_user_saved_tracks",
+    "playlist", "playlist_items", "next",
+}
+
+
+def session() -> requests.Session:
+    """A requests session that never retries and hands error responses (with headers) back to spotipy."""
+    s = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(max_retries=Retry(total=0, raise_on_status=False))
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nobody calls again for `seconds` (Spotify said Retry-After)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class SpotifyGate:
+    """Shared limiter, retry policy and counters for one or more clients."""
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_retries: int = 3, default_retry_after: float = 1.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._inflight = {}  # coalescing key -> Future
+        self._lock = threading.Lock()
+        self.stats = Counter()  # calls, coalesced, throttled, throttle_seconds, rate_limited, server_errors, retries, failed
+
+    def wrap(self, client):
+        return _GatedClient(client, self)
+
+    def _key(self, name, args, kwargs):
+        if name not in _COALESCE:
+            return None
+        try:
+            return name + json.dumps([args, kwargs], sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+
+    def call(self, name, fn, args, kwargs):
+        key = self._key(name, args, kwargs)
+        if key is None:
+            return self._call(fn, args, kwargs)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+        try:
+            result = self._call(fn, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _call(self, fn, args, kwargs):
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.stats["calls"] += 1
+                if waited:
+                    self.stats["throttled"] += 1
+                    self.stats["throttle_seconds"] += waited
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, "http_status", None)
+                if status not in _RETRY_STATUSES:
+                    raise
+                with self._lock:
+                    self.stats["rate_limited" if status == 429 else "server_errors"] += 1
+                    if attempt >= self.max_retries:
+                        self.stats["failed"] += 1
+                if attempt >= self.max_retries:
+                    raise
+                headers = getattr(e, "headers", None) or {}
+                try:
+                    delay = float(headers.get("Retry-After"))
+                except (TypeError, ValueError):
+                    delay = self.default_retry_after * 2 ** attempt
+                attempt += 1
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning("spotify %s on %s; retrying in %.1fs", status, getattr(fn, "__name__", fn), delay)
+                if status == 429:
+                    self.bucket.pause(delay)  # Spotify limits the whole app, so everyone waits
+                else:
+                    time.sleep(delay)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"Spotify API: {s['calls']} calls, {s['coalesced']} coalesced, "
+                f"{s['throttled']} throttled ({s['throttle_seconds']:.1f}s waiting), "
+                f"{s['rate_limited']} rate-limited, {s['server_errors']} server errors, "
+                f"{s['retries']} retries, {s['failed']} gave up")
+
+
+class _GatedClient:
+    """Proxies a spotipy client; method calls go through the gate, everything else passes through."""
+
+    def __init__(self, client, gate: SpotifyGate):
+        object.__setattr__(self, "_client", client)
+        object.__setattr__(self, "_gate", gate)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        gate = self._gate
+
+        def gated(*args, **kwargs):
+            return gate.call(name, attr, args, kwargs)
+        gated.__name__ = name
+        return gated
+
+    def __setattr__(self, name, value):
+        setattr(self._client, name, value)
@@ -0,0 +1,293 @@
+"""
+Opt-in local mirror of the user's Spotify library (SPOTIFY_LIBRARY=1).
+
+Saved tracks and playlist contents are synced into SQLite under DATA_DIR so
+"play X" can resolve songs the user already owns without the Search API.
+Sync is incremental: saved tracks stop paging at the newest `added_at` we
+already have, and a playlist is only re-read when its `snapshot_id` changed.
+Paging from the newest end never shows un-likes, so saved tracks are re-listed
+in full when the API's total disagrees with the mirror, and once a day anyway.
+"""
+
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from rapidfuzz import fuzz, process
+from core.response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+# The LibraryMirror the Spotify tools are using, once they've been loaded.
+current = None
+
+SAVED = "saved"  # source name for Liked Songs; playlists use their id
+
+_FEAT_RE = re.compile(r"\(feat[^)]*\)|\(with[^)]*\)|- (?:\d{4} )?remaster(?:ed)?.*$", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    uri TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    norm_title TEXT NOT NULL,
+    norm_artists TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_norm_title ON tracks(norm_title);
+CREATE TABLE IF NOT EXISTS sources (
+    track_uri TEXT NOT NULL,
+    source TEXT NOT NULL,
+    added_at TEXT,
+    PRIMARY KEY (track_uri, source)
+);
+CREATE INDEX IF NOT EXISTS sources_source ON sources(source);
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    snapshot_id TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Only what the player needs from a track object.
+_PLAYLIST_FIELDS = "items(added_at,track(id,name,uri,type,artists(id,name,uri),external_urls)),next"
+
+
+def normalize_title(title: str) -> str:
+    return normalize_prompt(_FEAT_RE.sub("", title or ""))
+
+
+def _slim(track: dict) -> dict:
+    return {
+        "id": track.get("id"), "name": track.get("name"), "uri": track.get("uri"),
+        "artists": [{"id": a.get("id"), "name": a.get("name"), "uri": a.get("uri")} for a in track.get("artists") or []],
+        "external_urls": track.get("external_urls") or {},
+    }
+
+
+class LibraryMirror:
+    def __init__(self, db_path: Path, sp, playlist_index=None, sync_interval: float = 1800.0,
+                 reconcile_interval: float = 86400.0):
+        self.db_path = Path(db_path)
+        self.sp = sp
+        self.playlist_index = playlist_index
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval  # max age of the last full saved-tracks listing
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()       # guards the connection and the in-memory view
+        self._sync_lock = threading.Lock()  # one sync at a time
+        self._synced_at = None
+        # In-memory view for matching: parallel lists rebuilt after each sync.
+        self._titles, self._artists, self._payloads = [], [], []
+        self._load_view()
+        # reporting
+        self.lookups = 0
+        self.hits = 0
+        self.last_sync = {}
+
+    # ---------------- STORAGE ----------------
+
+    def _load_view(self):
+        with self._lock:
+            rows = self._db.execute("SELECT norm_title, norm_artists, payload FROM tracks").fetchall()
+            self._titles = [r[0] for r in rows]
+            self._artists = [r[1] for r in rows]
+            self._payloads = [r[2] for r in rows]
+
+    def _meta(self, key: str, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _store(self, source: str, items: list):
+        rows, links = [], []
+        for item in items:
+            track = item.get("track") or {}
+            if not track.get("uri") or track.get("type", "track") != "track":
+                continue  # local files, podcasts, removed tracks
+            slim = _slim(track)
+            rows.append((slim["uri"], slim["name"] or "", normalize_title(slim["name"]),
+                         normalize_prompt(" ".join(a["name"] or "" for a in slim["artists"])), json.dumps(slim)))
+            links.append((slim["uri"], source, item.get("added_at")))
+        self._db.executemany("INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?)", rows)
+        self._db.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", links)
+        return len(links)
+
+    def _prune(self):
+        """Drop tracks no source refers to any more."""
+        self._db.execute("DELETE FROM tracks WHERE uri NOT IN (SELECT track_uri FROM sources)")
+
+    # ---------------- SYNC ----------------
+
+    def _pages(self, page, calls: list):
+        calls[0] += 1
+        while page:
+            yield page
+            if not page.get("next"):
+                break
+            page = self.sp.next(page)
+            calls[0] += 1
+
+    def _sync_saved(self, calls: list) -> int:
+        """
+        Saved tracks come newest first; stop at the first one older than what we have.
+        Then compare the API's total with the mirror (plus the items it can't hold,
+        like local files) and re-list everything when they differ.
+        """
+        latest = self._meta("saved_latest_added_at")
+        first = self.sp.current_user_saved_tracks(limit=50)
+        if latest is None or time.time() - float(self._meta("saved_full_at", 0)) > self.reconcile_interval:
+            return self._relist_saved(first, calls)
+
+        fresh, newest = [], latest
+        for page in self._pages(first, calls):
+            items = page.get("items") or []
+            stop = False
+            for item in items:
+                added = item.get("added_at") or ""
+                if latest and added < latest:
+                    stop = True
+                    break
+                fresh.append(item)
+                newest = max(newest or "", added)
+            if stop:
+                break
+        with self._lock:
+            stored = self._store(SAVED, fresh)
+            if newest:
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('saved_latest_added_at', ?)", (newest,))
+            self._db.commit()
+            have = self._db.execute("SELECT COUNT(*) FROM sources WHERE source = ?", (SAVED,)).fetchone()[0]
+            have += int(self._meta("saved_skipped", 0))
+        total = first.get("total")
+        if total is None or total == have:
+            return stored
+        logger.info("library sync: %s saved tracks on Spotify, %d mirrored; re-listing", total, have)
+        return self._relist_saved(self.sp.current_user_saved_tracks(limit=50), calls)
+
+    def _relist_saved(self, first: dict, calls: list) -> int:
+        """Replace the mirrored saved tracks with the full current listing."""
+        items = [item for page in self._pages(first, calls) for item in page.get("items") or []]
+        newest = max((item.get("added_at") or "" for item in items), default="")
+        with self._lock:
+            self._db.execute("DELETE FROM sources WHERE source = ?", (SAVED,))
+            stored = self._store(SAVED, items)
+            meta = {"saved_skipped": str(len(items) - stored), "saved_full_at": str(time.time())}
+            if newest:
+                meta["saved_latest_added_at"] = newest
+            self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+            self._prune()
+            self._db.commit()
+        return stored
+
+    def _sync_playlists(self, calls: list) -> tuple:
+        index = self.playlist_index
+        index.ensure_loaded()
+        listing = {p["id"]: p for p in index.playlists()}
+        with self._lock:
+            known = dict(self._db.execute("SELECT id, snapshot_id FROM playlists").fetchall())
+        changed = [pid for pid, p in listing.items() if known.get(pid) != p.get("snapshot_id")]
+        removed = [pid for pid in known if pid not in listing]
+
+        stored = 0
+        for pid in changed:
+            items = []
+            first = self.sp.playlist_items(pid, limit=100, fields=_PLAYLIST_FIELDS, additional_types=("track",))
+            for page in self._pages(first, calls):
+                items.extend(page.get("items") or [])
+            with self._lock:
+                # a changed snapshot may also mean removals, so the playlist is replaced wholesale
+                self._db.execute("DELETE FROM sources WHERE source = ?", (pid,))
+                stored += self._store(pid, items)
+                p = listing[pid]
+                self._db.execute("INSERT OR REPLACE INTO playlists VALUES (?, ?, ?)",
+                                 (pid, p.get("name"), p.get("snapshot_id")))
+                self._db.commit()
+        with self._lock:
+            for pid in removed:
+                self._db.execute("DELETE FROM sources WHERE source = ?", (pid,))
+                self._db.execute("DELETE FROM playlists WHERE id = ?", (pid,))
+            self._prune()
+            self._db.commit()
+        return len(changed), len(removed), stored
+
+    def sync(self):
+        """Bring the mirror up to date. Concurrent callers skip rather than queue."""
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            start = time.perf_counter()
+            calls = [0]
+            saved = self._sync_saved(calls)
+            changed, removed, stored = self._sync_playlists(calls) if self.playlist_index is not None else (0, 0, 0)
+            self._load_view()
+            self._synced_at = time.monotonic()
+            self.last_sync = {"seconds": time.perf_counter() - start, "api_calls": calls[0],
+                              "saved_tracks": saved, "playlists_changed": changed,
+                              "playlists_removed": removed, "playlist_tracks": stored}
+            logger.info("library sync: %s, %d tracks mirrored", self.last_sync, len(self._titles))
+        finally:
+            self._sync_lock.release()
+
+    def maybe_sync(self):
+        """Start a background sync when the mirror has never synced or is older than sync_interval."""
+        if self._sync_lock.locked():
+            return
+        if self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+
+        def _run():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.warning("library sync failed: %s", e)
+        threading.Thread(target=_run, daemon=True).start()
+
+    # ---------------- LOOKUP ----------------
+
+    def resolve(self, title: str, artist: str | None = None, artist_threshold: float = 40.0,
+                limit: int = 10) -> tuple:
+        """
+        Best (track, score) for a title and optional artist, scored like the remote
+        search (0.7 title + 0.3 artist) when an artist is given, title-only otherwise.
+        Returns (None, 0) when the library is empty or nothing matches.
+        """
+        self.lookups += 1
+        with self._lock:
+            titles, artists, payloads = self._titles, self._artists, self._payloads
+        query = normalize_title(title)
+        if not titles or not query:
+            return None, 0
+        best, best_score = None, 0.0
+        for _, title_score, idx in process.extract(query, titles, scorer=fuzz.ratio, limit=limit):
+            score = title_score
+            if artist:
+                artist_score = fuzz.token_set_ratio(normalize_prompt(artist), artists[idx])
+                if artist_score < artist_threshold:
+                    continue
+                score = 0.7 * title_score + 0.3 * artist_score
+            if score > best_score:
+                best, best_score = idx, score
+        if best is None:
+            return None, 0
+        return json.loads(payloads[best]), best_score
+
+    def record_hit(self):
+        self.hits += 1
+
+    def summary(self) -> str:
+        rate = self.hits / self.lookups * 100 if self.lookups else 0.0
+        sync = self.last_sync
+        text = f"Library mirror: {len(self._titles)} tracks, {self.hits}/{self.lookups} local hits ({rate:.0f}%)"
+        if sync:
+            text += (f"; last sync {sync['seconds']:.1f}s, {sync['api_calls']} API calls, "
+                     f"{sync['saved_tracks']} saved + {sync['playlist_tracks']} playlist tracks "
+                     f"from {sync['playlists_changed']} changed playlists")
+        return text
@@ -5,134 +5,304 @@
 
 from langchain.tools import tool
 import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 from core.utils import wait_for_spotify_boot, start_spotify_exe, find_spotify_process
 import spotipy
-import core.audio_feedback as af
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
+from tools.spotify_playlists import PlaylistIndex
+from tools import spotify_state, spotify_library, spotify_client
+from core.cache import TTLCache
+from core.response_cache import normalize_prompt
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+__requires__ = ("spotipy",)
+# Tools that may need Spotify launched; core.warmup runs warm_up() when a turn clearly asks
+# for music: "play/put on/queue ..." up front (after an optional "please"/"can you"), or
+# Spotify / a playlist by name. Not "song" or "artist" mid-sentence.
+__warm_for__ = ("query_and_play_track", "play_user_playlist")
+__warm_when__ = (
+    r"^\W*(?:(?:hey|ok|okay)\W+\w+\W+)?(?:(?:please|can you|could you|would you|now)\W+)*(?:play|put on|queue)\b",
+    r"\bspotify\b",
+    r"\bplaylists?\b",
+)
+
 _spotify_clients = None
+_clients_lock = threading.Lock()
+_boot_lock = threading.Lock()  # a warm-up and a tool call never launch Spotify twice
 
 def initiate_spotify_clients():
     global _spotify_clients
     if _spotify_clients is not None:
         return _spotify_clients
-     
-    from core.config import  SCOPE, REDIRECT_URI, SPOTIFY_CLIENT_SECRET, SPOTIFY_CLIENT_ID, SPOTIFY_CACHE_FILE
-    # Spotify clients
-    sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-        client_id=SPOTIFY_CLIENT_ID,
-        client_secret=SPOTIFY_CLIENT_SECRET,
-        redirect_uri=REDIRECT_URI,
-        scope=SCOPE,
-        cache_path=SPOTIFY_CACHE_FILE
-    ))
-
-    sp_client = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
-        client_id=SPOTIFY_CLIENT_ID,
-        client_secret=SPOTIFY_CLIENT_SECRET
-    ))
-
-    _spotify_clients = (sp, sp_client)
+    with _clients_lock:
+        if _spotify_clients is None:
+            _spotify_clients = _create_spotify_clients()
     return _spotify_clients
-    
+
+
+def _create_spotify_clients():
+    from core.config import  SCOPE, REDIRECT_URI, SPOTIFY_CLIENT_SECRET, SPOTIFY_CLIENT_ID, SPOTIFY_CACHE_FILE
+    from core.config import SPOTIFY_API_PREFIX, SPOTIFY_ACCESS_TOKEN, SPOTIFY_RATE, SPOTIFY_BURST
+
+    if SPOTIFY_ACCESS_TOKEN:
+        sp = spotipy.Spotify(auth=SPOTIFY_ACCESS_TOKEN, requests_session=spotify_client.session())
+        sp_client = spotipy.Spotify(auth=SPOTIFY_ACCESS_TOKEN, requests_session=spotify_client.session())
+    else:
+        # Spotify clients
+        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+            client_id=SPOTIFY_CLIENT_ID,
+            client_secret=SPOTIFY_CLIENT_SECRET,
+            redirect_uri=REDIRECT_URI,
+            scope=SCOPE,
+            cache_path=SPOTIFY_CACHE_FILE
+        ), requests_session=spotify_client.session())
+
+        sp_client = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
+            client_id=SPOTIFY_CLIENT_ID,
+            client_secret=SPOTIFY_CLIENT_SECRET
+        ), requests_session=spotify_client.session())
+    if SPOTIFY_API_PREFIX:
+        sp.prefix = sp_client.prefix = SPOTIFY_API_PREFIX
+
+    # one bucket for both clients: Spotify rate-limits per app, not per token
+    gate = spotify_client.SpotifyGate(rate=SPOTIFY_RATE, burst=SPOTIFY_BURST)
+    spotify_client.current = gate
+    return gate.wrap(sp), gate.wrap(sp_client)
+
+
+_playlist_index = None
+_playback_state = None
+_library = None
+
+NO_DEVICE_MESSAGE = "No active Spotify device found. Please open Spotify on a device."
+
+def get_playlist_index() -> PlaylistIndex:
+    """Shared playlist index; all pages are fetched on first use, then kept fresh in the background."""
+    global _playlist_index
+    if _playlist_index is None:
+        from core.config import PLAYLIST_INDEX_TTL
+        sp, sp_client = initiate_spotify_clients()
+        _playlist_index = PlaylistIndex(sp, ttl=PLAYLIST_INDEX_TTL)
+    return _playlist_index
+
+
+def get_playback_state() -> spotify_state.PlaybackState:
+    """Shared device/playback cache; also published as tools.spotify_state.current for the GUI."""
+    global _playback_state
+    if _playback_state is None:
+        sp, sp_client = initiate_spotify_clients()
+        _playback_state = spotify_state.PlaybackState(sp)
+        spotify_state.current = _playback_state
+    return _playback_state
+
+
+def get_library() -> spotify_library.LibraryMirror | None:
+    """The local library mirror when SPOTIFY_LIBRARY=1, else None."""
+    global _library
+    from core.config import SPOTIFY_LIBRARY, DATA_DIR, LIBRARY_SYNC_INTERVAL
+    if not SPOTIFY_LIBRARY:
+        return None
+    if _library is None:
+        sp, sp_client = initiate_spotify_clients()
+        _library = spotify_library.LibraryMirror(DATA_DIR / "spotify_library.sqlite3", sp,
+                                                 playlist_index=get_playlist_index(),
+                                                 sync_interval=LIBRARY_SYNC_INTERVAL)
+        spotify_library.current = _library
+    return _library
+
+
+def ensure_spotify_running():
+    """Launch the Spotify client if needed and wait until it exposes a device."""
+    # If a warm-up is already booting Spotify, this waits for it rather than racing it.
+    with _boot_lock:
+        if find_spotify_process():
+            return
+        start_spotify_exe()
+        state = get_playback_state()
+        if not wait_for_spotify_boot(ready=lambda: state.device_id(force=True) is not None):
+            raise Exception("Spotify failed to execute.")
+
+
+def _cached_user_token(client) -> bool:
+    """True if the user client can call the API without an interactive sign-in (refreshes an expired token)."""
+    auth = getattr(client, "auth_manager", None)
+    if not isinstance(auth, SpotifyOAuth):
+        return True  # static SPOTIFY_ACCESS_TOKEN
+    try:
+        return auth.validate_token(auth.cache_handler.get_cached_token()) is not None
+    except Exception as e:
+        logger.info("cached Spotify token unusable: %s", e)
+        return False
+
+
+def warm_up():
+    """
+    Speculatively get Spotify ready while the completion streams: launch, tokens,
+    device. Does nothing without a cached sign-in, since the first OAuth flow
+    opens a browser and must only happen when a tool really runs.
+    """
+    sp, sp_client = initiate_spotify_clients()
+    if not _cached_user_token(sp):
+        return
+    ensure_spotify_running()
+    auth = getattr(sp_client, "auth_manager", None)
+    if auth is not None:
+        auth.get_access_token(as_dict=False)  # client credentials: no user interaction
+    get_playback_state().device_id()
+
+
+def _on_device(command) -> bool:
+    """
+    Run command(device_id) against the cached device. If Spotify says the device
+    is gone, re-resolve it once and retry. Returns False when no device is open.
+    """
+    state = get_playback_state()
+    device_id = state.device_id()
+    if device_id is None:
+        return False
+    try:
+        command(device_id)
+    except spotipy.exceptions.SpotifyException as e:
+        if not state.handle_error(e):
+            raise
+        device_id = state.device_id(force=True)
+        if device_id is None:
+            return False
+        command(device_id)
+    return True
+
 @tool
-def play_user_playlist(playlist_name):
+def play_user_playlist(playlist_name: str):
     """
     
     This function will be activated when the user wants to play one of his playlists.
-    We will be getting the current user playlists in a list, each item in the list is a tuple (playlist_name, playlist_id)
-    we will identify the right playlist by it's name and then use the id to play it.
+    The playlist is identified by fuzzy-matching its name against the user's playlists, then played by id.
     Example:
     User input - "Play my playlist `Don't Drake and Drive`"
     AI - play_user_playlist("Don't Drake and Drive")
     returns a confirm message after it plays the playlist. 
 
     """
-    if not find_spotify_process():
-        start_spotify_exe()
-        if not wait_for_spotify_boot():
-            raise Exception("Spotify failed to execute.")
+    ensure_spotify_running()
         
         
     if not playlist_name:
         raise ValueError("playlist_name was not provided to play_user_playlist")
     
     sp, sp_client = initiate_spotify_clients()
-    devices = sp.devices().get("devices", [])
-
-    if not devices:
-        return "No active Spotify device found. Please open Spotify on a device."
-    
-    device_id = devices[0]["id"]
-    user_playlists = []
-
-    for playlist in sp.current_user_playlists()["items"]:
-        user_playlists.append((playlist["name"].lower(), playlist["id"]))
-    
-    playlist_name_lower = playlist_name.lower()
-    best_match, best_score = None, 0
-    final_playlist_name = ""
-    for (name, id) in user_playlists:
-        playlist_score = fuzz.token_set_ratio(playlist_name_lower, name.lower())
-
-        if playlist_score > best_score:
-            best_score = playlist_score
-            best_match = id
-            final_playlist_name = name
-
-    if not best_match:
+    match = get_playlist_index().resolve(playlist_name)
+    if match is None:
         return "No playlist was found."
-    
-    uri = "spotify:playlist:" + best_match
-    
+
     try:
-        sp.start_playback(device_id=device_id, context_uri=uri)
-        return f"Playlist found! Name of playlist: {final_playlist_name}"
+        if not _on_device(lambda device_id: sp.start_playback(device_id=device_id, context_uri=match.uri)):
+            return NO_DEVICE_MESSAGE
+        get_playback_state().note_command(track={"name": match.name, "uri": match.uri}, is_playing=True)
+        return f"Playlist found! Name of playlist: {match.name}"
     except spotipy.exceptions.SpotifyException as e:
         return f"Error playing playlist: {e}"
 
 
 # ------------------- Search Helpers -------------------
-def regular_query(query: str, max_tracks: int = 100, artist_name: str | None = None, artist_threshold: int = 40, query_name: str = "Regular Query"):
-    """Search Spotify tracks with fuzzy scoring."""
+SEARCH_PAGE = 50  # Web API maximum for /search
+
+_search_cache = None
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spotify-search")
+
+
+def get_search_cache() -> TTLCache:
+    """Track search results keyed on (normalized query, max_tracks)."""
+    global _search_cache
+    if _search_cache is None:
+        from core.config import SEARCH_CACHE_TTL, SEARCH_CACHE_SIZE
+        _search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+    return _search_cache
+
+
+def _search_page(query: str, offset: int) -> list:
     sp, sp_client = initiate_spotify_clients()
-    tracks = []
-    offset = 0
-    limit = 50
-
-    while len(tracks) < max_tracks:
-        result = sp.search(q=query, type="track", limit=limit, offset=offset)
-        items = result.get("tracks", {}).get("items", [])
-        if not items:
-            break
-        tracks.extend(items)
-        if len(items) < limit:
-            break
-        offset += limit
+    result = sp.search(q=query, type="track", limit=SEARCH_PAGE, offset=offset)
+    return result.get("tracks", {}).get("items", []) or []
+
+
+def search_tracks(queries, max_tracks: int = 100) -> dict:
+    """
+    Search several queries at once. Queries that normalize the same ("Blinding
+    Lights" / "blinding lights") are searched once, with one lowercase spelling so
+    identical searches from other callers coalesce in SpotifyGate too. Every
+    uncached (query, page) pair is fetched concurrently; results are cached per
+    normalized query. Returns {query: tracks} for every query passed in.
+    """
+    cache = get_search_cache()
+    by_key = {}  # normalized query -> the queries asked that way
+    for query in queries:
+        by_key.setdefault(normalize_prompt(query), []).append(query)
+
+    found, pending = {}, {}
+    for key, asked in by_key.items():
+        hit = cache.get((key, max_tracks))
+        if hit is not None:
+            found[key] = hit
+            continue
+        q = " ".join(asked[0].lower().split())
+        for offset in range(0, max_tracks, SEARCH_PAGE):
+            pending[(key, offset)] = _search_pool.submit(_search_page, q, offset)
+
+    pages = {}
+    for (key, offset), future in pending.items():
+        pages.setdefault(key, {})[offset] = future.result()
+    for key, by_offset in pages.items():
+        tracks = []
+        for offset in sorted(by_offset):
+            tracks.extend(by_offset[offset])
+            if len(by_offset[offset]) < SEARCH_PAGE:
+                break  # later pages can't have anything past a short one
+        found[key] = tracks[:max_tracks]
+        cache.set((key, max_tracks), found[key])
+    return {query: found[key] for key, asked in by_key.items() for query in asked}
+
+
+def _best_track(tracks: list, query: str, artist_name: str | None, artist_threshold: int):
+    """Score every candidate in one cdist call per field; returns (track, score) or (None, 0)."""
+    titles = [t["name"].lower() for t in tracks]
+    title_scores = process.cdist([query.lower()], titles, scorer=fuzz.token_set_ratio)[0]
+    artist_scores = np.zeros(len(tracks), dtype=np.float32)
+    if artist_name:
+        owners, names = [], []
+        for i, t in enumerate(tracks):
+            for a in t["artists"]:
+                owners.append(i)
+                names.append(a["name"].lower())
+        if names:
+            per_artist = process.cdist([artist_name.lower()], names, scorer=fuzz.token_set_ratio)[0]
+            np.maximum.at(artist_scores, np.asarray(owners), per_artist)
+    combined = 0.7 * title_scores + 0.3 * artist_scores
+    if artist_name:
+        combined[artist_scores < artist_threshold] = -1
+    best = int(np.argmax(combined))
+    if combined[best] <= 0:
+        return None, 0
+    return tracks[best], float(combined[best])
+
+
+def regular_query(query: str, max_tracks: int = 100, artist_name: str | None = None, artist_threshold: int = 40,
+                  query_name: str = "Regular Query", tracks: list | None = None):
+    """Search Spotify tracks with fuzzy scoring."""
+    if tracks is None:
+        tracks = search_tracks([query], max_tracks)[query]
 
     if not tracks:
         return None, None, None, None, 0
 
-    # Fuzzy matching
-    best_match, best_score = None, 0
-    query_lower = query.lower()
-    for track in tracks:
-        title_score = fuzz.token_set_ratio(query_lower, track["name"].lower())
-        artist_score = 0
-        if artist_name:
-            artist_scores = [fuzz.token_set_ratio(artist_name.lower(), a["name"].lower()) for a in track["artists"]]
-            artist_score = max(artist_scores)
-            if artist_score < artist_threshold:
-                continue
-        combined_score = 0.7 * title_score + 0.3 * artist_score
-        if combined_score > best_score:
-            best_match = track
-            best_score = combined_score
-
+    best_match, best_score = _best_track(tracks, query, artist_name, artist_threshold)
     if not best_match:
         return None, None, None, None, 0
 
@@ -150,24 +320,45 @@ def simplify_title(title: str) -> str:
     return re.sub(r'\(feat[^\)]*\)|\(with[^\)]*\)', '', title, flags=re.IGNORECASE).strip()
 
 
-def new_query(query: str, max_tracks: int = 100, artist_threshold: int = 40):
-    """Artist-aware fuzzy search."""
+def _split_query(query: str):
     query_lower = query.lower()
     if " by " in query_lower:
         track_name, artist_name = map(str.strip, query_lower.split(" by ", 1))
-    else:
-        track_name, artist_name = query_lower, None
-    return regular_query(track_name, max_tracks=max_tracks, artist_name=artist_name, artist_threshold=artist_threshold, query_name="New Query")
+        return track_name, artist_name
+    return query_lower, None
+
+
+def new_query(query: str, max_tracks: int = 100, artist_threshold: int = 40, tracks: list | None = None):
+    """Artist-aware fuzzy search."""
+    track_name, artist_name = _split_query(query)
+    return regular_query(track_name, max_tracks=max_tracks, artist_name=artist_name, artist_threshold=artist_threshold,
+                         query_name="New Query", tracks=tracks)
 
 
 def query_best_song(query: str, max_tracks: int = 100, confidence_threshold: int = 94):
     """Return the best matching track based on fuzzy scoring."""
-    new_track, new_name, new_artist, new_uri, new_score = new_query(query, max_tracks)
+    track_name, artist_name = _split_query(query)
+
+    # Songs already in the user's library resolve locally; search only on low confidence.
+    library = get_library()
+    if library is not None:
+        library.maybe_sync()
+        local, local_score = library.resolve(track_name, artist_name)
+        if local and local_score >= confidence_threshold:
+            library.record_hit()
+            local_artist = ", ".join(a["name"] for a in local["artists"])
+            print(f"Chosen Track (library): {local['name']} - {local_artist} | Score: {local_score}")
+            return local, local["name"], local_artist, local["uri"], local_score
+
+    # Both strategies' searches go out together instead of one after the other.
+    found = search_tracks([track_name, query], max_tracks)
+
+    new_track, new_name, new_artist, new_uri, new_score = new_query(query, max_tracks, tracks=found[track_name])
     if new_score >= confidence_threshold:
         print(f"Chosen Track (artist-aware): {new_name} - {new_artist} | Score: {new_score}")
         return new_track, new_name, new_artist, new_uri, new_score
 
-    reg_track, reg_name, reg_artist, reg_uri, reg_score = regular_query(query, max_tracks)
+    reg_track, reg_name, reg_artist, reg_uri, reg_score = regular_query(query, max_tracks, tracks=found[query])
     if reg_score >= confidence_threshold:
         print(f"Chosen Track (regular fallback): {reg_name} - {reg_artist} | Score: {reg_score}")
         return reg_track, reg_name, reg_artist, reg_uri, reg_score
@@ -178,91 +369,163 @@ def query_best_song(query: str, max_tracks: int = 100, confidence_threshold: int
 
 
 # ------------------- Playback Helpers -------------------
+RECO_WORKERS = 4  # concurrent related-artist / top-track fetches
+
+# Related artists and top tracks barely change; cache them per artist.
+_artist_cache = TTLCache(maxsize=1024, ttl=6 * 3600)
+_reco_fetch_pool = ThreadPoolExecutor(max_workers=RECO_WORKERS, thread_name_prefix="spotify-reco")
+# One recommendation job at a time; a newer play supersedes it.
+_reco_job_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spotify-reco-job")
+_reco_generation = 0
+_reco_lock = threading.Lock()
+
+
+def _spotify_id(uri: str) -> str:
+    return uri.split(":")[-1] if ":" in uri else uri.split("/")[-1]
+
+
 def get_track_info(track_id: str) -> dict | None:
     sp, sp_client = initiate_spotify_clients()
     try:
         return sp_client.track(track_id)
     except Exception as e:
-        print(f"Error fetching track info: {e}")
+        logger.warning("Error fetching track info: %s", e)
         return None
 
 
 def get_artist_info(artist_id: str) -> dict | None:
+    cached = _artist_cache.get(("related", artist_id))
+    if cached is not None:
+        return cached
     sp, sp_client = initiate_spotify_clients()
     try:
-        return sp_client.artist_related_artists(artist_id)
+        info = sp_client.artist_related_artists(artist_id)
     except Exception as e:
-        print(f"Error fetching artist info: {e}")
+        logger.warning("Error fetching artist info: %s", e)
         return None
+    _artist_cache.set(("related", artist_id), info)
+    return info
 
-def play_track(uri: str, artist_uri: str | None = None):
-    if not find_spotify_process():
-        start_spotify_exe()
-        if not wait_for_spotify_boot():
-            raise Exception("Spotify failed to execute.")
-        
-    """Play a track and queue recommendations based on related artists."""
+
+def get_artist_top_tracks(artist_id: str) -> list:
+    cached = _artist_cache.get(("top", artist_id))
+    if cached is not None:
+        return cached
     sp, sp_client = initiate_spotify_clients()
-    devices = sp.devices().get("devices", [])
-    if not devices:
-         return "No active Spotify device found. Please open Spotify on a device."
-    device_id = devices[0]["id"]
-    
-    sp.start_playback(device_id=device_id, uris=[uri]) # User must have spotify premium, and be active.
+    try:
+        tracks = sp_client.artist_top_tracks(artist_id).get("tracks", [])
+    except Exception as e:
+        logger.warning("Error fetching top tracks for artist %s: %s", artist_id, e)
+        return []
+    _artist_cache.set(("top", artist_id), tracks)
+    return tracks
+
+
+def _queued_uris(sp) -> set:
+    """URIs already playing or queued, so recommendations don't repeat them."""
+    try:
+        state = sp.queue() or {}
+    except Exception as e:
+        logger.warning("Could not read the playback queue: %s", e)
+        return set()
+    items = [state.get("currently_playing")] + list(state.get("queue") or [])
+    return {t["uri"] for t in items if t and t.get("uri")}
+
+
+def play_track(uri: str, artist_uri: str | None = None, track: dict | None = None):
+    """Play a track; related-artist recommendations are queued in the background."""
+    ensure_spotify_running()
+
+    sp, sp_client = initiate_spotify_clients()
+    state = get_playback_state()
+    # User must have spotify premium, and be active.
+    if not _on_device(lambda device_id: sp.start_playback(device_id=device_id, uris=[uri])):
+        return NO_DEVICE_MESSAGE
+    state.note_command(track=track or {"uri": uri}, is_playing=True)
     print(f"Now playing: {uri}")
 
     if artist_uri:
-        queue_recommendations(uri, artist_uri=artist_uri, max_results=20)
+        schedule_recommendations(uri, artist_uri=artist_uri, max_results=20, device_id=state.device_id())
+
 
+def schedule_recommendations(track_uri, artist_uri=None, max_results=30, device_id=None):
+    """Queue recommendations off the caller's thread. Returns the job's Future."""
+    global _reco_generation
+    with _reco_lock:
+        _reco_generation += 1
+        generation = _reco_generation
 
-def queue_recommendations(track_uri, artist_uri = None, max_results = 30):
+    def _job():
+        try:
+            return queue_recommendations(track_uri, artist_uri, max_results, device_id, generation)
+        except Exception as e:
+            logger.warning("Queuing recommendations failed: %s", e)
+            return []
+    return _reco_job_pool.submit(_job)
+
+
+def queue_recommendations(track_uri, artist_uri = None, max_results = 30, device_id = None, generation = None):
     """Queue recommended tracks using related artists and their top tracks."""
     sp, sp_client = initiate_spotify_clients()
-    track_id = track_uri.split(":")[-1] if ":" in track_uri else track_uri.split("/")[-1]
+    track_id = _spotify_id(track_uri)
 
     track_info = get_track_info(track_id)
     if not track_info:
-        print(f"Cannot fetch track info for {track_id}")
+        logger.info("Cannot fetch track info for %s", track_id)
         return []
 
-    related_artist_ids = [a["id"] for artist in track_info["artists"] if (artist_info := get_artist_info(artist["id"])) for a in artist_info["artists"]]
+    related_artist_ids = []
+    for artist_info in _reco_fetch_pool.map(get_artist_info, [a["id"] for a in track_info["artists"]]):
+        if artist_info:
+            related_artist_ids.extend(a["id"] for a in artist_info["artists"])
 
     if artist_uri:
-        artist_id = artist_uri.split(":")[-1] if ":" in artist_uri else artist_uri.split("/")[-1]
+        artist_id = _spotify_id(artist_uri)
         if artist_id not in related_artist_ids:
             related_artist_ids.append(artist_id)
 
     if not related_artist_ids:
-        print("No related artists found for recommendations.")
+        logger.info("No related artists found for recommendations.")
         return []
 
+    # Fetch top tracks a batch of artists at a time and stop once there are enough.
+    skip = _queued_uris(sp) | {track_uri}
     recommended_tracks = []
-    for artist_id in related_artist_ids:
-        try:
-            recommended_tracks.extend(sp_client.artist_top_tracks(artist_id).get("tracks", []))
-        except Exception as e:
-            print(f"Error fetching top tracks for artist {artist_id}: {e}")
+    for i in range(0, len(related_artist_ids), RECO_WORKERS):
+        batch = related_artist_ids[i:i + RECO_WORKERS]
+        for tracks in _reco_fetch_pool.map(get_artist_top_tracks, batch):
+            for t in tracks:
+                if t["uri"] not in skip:
+                    skip.add(t["uri"])
+                    recommended_tracks.append(t)
+        if len(recommended_tracks) >= max_results:
+            break
 
     if not recommended_tracks:
-        print("No recommended tracks found.")
+        logger.info("No recommended tracks found.")
         return []
 
     recommended_tracks = recommended_tracks[:max_results]
 
-    devices = sp.devices().get("devices", [])
-    if not devices:
-        print("No active Spotify devices detected [NEED TTS]")
-        return []
+    if device_id is None:
+        device_id = get_playback_state().device_id()
+        if device_id is None:
+            logger.info("No active Spotify devices detected")
+            return []
 
-    device_id = devices[0]["id"]
+    queued = []
     for t in recommended_tracks:
+        if generation is not None and generation != _reco_generation:
+            logger.info("Recommendations for %s superseded after %d tracks", track_info["name"], len(queued))
+            break
         try:
             sp.add_to_queue(t["uri"], device_id=device_id)
+            queued.append(t)
         except Exception as e:
             pass
 
-    print(f"Queued {len(recommended_tracks)} recommended tracks based on {track_info['name']}")
-    return recommended_tracks
+    logger.info("Queued %d recommended tracks based on %s", len(queued), track_info["name"])
+    return queued
 
 @tool
 def stop_current_playback():
@@ -270,12 +533,14 @@ def stop_current_playback():
     sp, sp_client = initiate_spotify_clients()
     try:
         sp.pause_playback()
+        get_playback_state().note_command(is_playing=False)
         return "Playback paused successfully."
     except spotipy.exceptions.SpotifyException as e:
+        get_playback_state().handle_error(e)
         return f"Error pausing playback: {e}"
 
 @tool
-def add_song_to_playlist(playlist_name, track_name):
+def add_song_to_playlist(playlist_name: str, track_name: str):
 
     """
     Values passed to this tool are playlist_name and track_name
@@ -289,34 +554,16 @@ def add_song_to_playlist(playlist_name, track_name):
     if not playlist_name:
         raise ValueError("playlist_name was not provided to play_user_playlist")
     
-    user_playlists = []
-    
-    for playlist in sp.current_user_playlists()["items"]:
-        user_playlists.append((playlist["name"].lower(), playlist["id"]))
-    
-    playlist_name_lower = playlist_name.lower()
-    best_match, best_score = None, 0
-    final_playlist_name = ""
-    
-    for (name, id) in user_playlists:
-        playlist_score = fuzz.token_set_ratio(playlist_name_lower, name.lower())
-
-        if playlist_score > best_score:
-            best_score = playlist_score
-            best_match = id
-            final_playlist_name = name
-
-    if not best_match:
+    match = get_playlist_index().resolve(playlist_name)
+    if match is None:
         return "No playlist was found."
-    
-    uri = "spotify:playlist:" + best_match
 
     chosen, chosen_name, chosen_artist, chosen_uri, chosen_score = query_best_song(track_name)
     if not chosen_uri:
         return f"No valid track found for '{track_name}'."
     
-    sp.playlist_add_items(uri, items=[chosen_uri])
-    return f"Added '{chosen_name.capitalize()} by {chosen_artist.capitalize()}' to the playlist - {final_playlist_name}"
+    sp.playlist_add_items(match.id, items=[chosen_uri])
+    return f"Added '{chosen_name.capitalize()} by {chosen_artist.capitalize()}' to the playlist - {match.name}"
 
 @tool
 def play_next_track():
@@ -324,13 +571,15 @@ def play_next_track():
     sp, sp_client = initiate_spotify_clients()
     try:
         sp.next_track()
+        get_playback_state().note_command(is_playing=True, stale=True)
         return "Next track played."
     except spotipy.exceptions.SpotifyException as e:
+        get_playback_state().handle_error(e)
         return f"Error skipping song: {e}"
 
 
 @tool
-def query_and_play_track(query):
+def query_and_play_track(query: str):
     
     """
     Search for a song on Spotify and play the best matching track.
@@ -350,15 +599,15 @@ def query_and_play_track(query):
              stating that no valid track was found.
     """
     sp, sp_client = initiate_spotify_clients()
-    if not find_spotify_process():
-        start_spotify_exe()
-        if not wait_for_spotify_boot():
-            raise Exception("Spotify failed to execute.")
+    ensure_spotify_running()
         
     chosen, chosen_name, chosen_artist, chosen_uri, chosen_score = query_best_song(query)
     if not chosen_uri:
         return f"No valid track found for '{query}'."
     
     
-    play_track(chosen_uri, chosen["artists"][0]["uri"] if chosen else None)
+    # returns once playback starts; recommendations are queued in the background
+    error = play_track(chosen_uri, chosen["artists"][0]["uri"] if chosen else None, track=chosen)
+    if error:
+        return error
     return f"Now playing: {chosen_name} by {chosen_artist}, Enjoy!"
\ No newline at end of file
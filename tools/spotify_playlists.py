@@ -0,0 +1,123 @@
+"""
+Shared index of the user's playlists.
+
+Fetches every page of /me/playlists once and resolves names with a single
+rapidfuzz call over precomputed normalized names, so playlist commands make no
+listing calls on the hot path. After `ttl` seconds the next lookup still answers
+from the index and refreshes it in the background; a name that isn't found forces
+one refresh first, so a playlist created since the last one still resolves.
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from rapidfuzz import fuzz, process
+from core.response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50  # Web API maximum for /me/playlists
+
+
+@dataclass
+class PlaylistMatch:
+    id: str
+    name: str
+    uri: str
+    score: float
+
+
+class PlaylistIndex:
+    def __init__(self, sp, ttl: float = 600.0, score_cutoff: float = 50.0, miss_refresh: float = 10.0):
+        self.sp = sp
+        self.ttl = ttl
+        self.score_cutoff = score_cutoff
+        self.miss_refresh = miss_refresh  # a miss re-fetches only if the index is older than this
+        self._playlists = []  # raw playlist objects, same order as _names
+        self._names = []      # normalized names for rapidfuzz
+        self._loaded_at = None
+        self._lock = threading.Lock()        # guards the fields above
+        self._refresh_lock = threading.Lock()  # one refresh at a time
+        self.refreshes = 0
+        self.pages_fetched = 0
+
+    # ---------------- LOADING ----------------
+
+    def _fetch_all(self) -> list:
+        page = self.sp.current_user_playlists(limit=PAGE_SIZE)
+        self.pages_fetched += 1
+        items = list(page.get("items") or [])
+        while page.get("next"):
+            page = self.sp.next(page)
+            self.pages_fetched += 1
+            items.extend(page.get("items") or [])
+        return [p for p in items if p and p.get("id")]
+
+    def refresh(self):
+        """Re-fetch the full listing. Concurrent callers wait for the refresh already running."""
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:  # someone else is refreshing; just wait for it
+                return
+        try:
+            start = time.perf_counter()
+            playlists = self._fetch_all()
+            with self._lock:
+                self._playlists = playlists
+                self._names = [normalize_prompt(p.get("name") or "") for p in playlists]
+                self._loaded_at = time.monotonic()
+                self.refreshes += 1
+            logger.info("playlist index: %d playlists in %.0fms", len(playlists),
+                        (time.perf_counter() - start) * 1000)
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_in_background(self):
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("playlist index refresh failed: %s", e)
+        threading.Thread(target=_run, daemon=True).start()
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def ensure_loaded(self):
+        """Block only for the very first load; afterwards refresh stale data in the background."""
+        if self._loaded_at is None:
+            self.refresh()
+        elif self.stale and not self._refresh_lock.locked():
+            self._refresh_in_background()
+
+    # ---------------- LOOKUP ----------------
+
+    def resolve(self, name: str) -> PlaylistMatch | None:
+        self.ensure_loaded()
+        query = normalize_prompt(name)
+        if not query:
+            return None
+        match = self._match(query)
+        if match is None and time.monotonic() - self._loaded_at > self.miss_refresh:
+            self.refresh()  # maybe created since the last refresh
+            match = self._match(query)
+        return match
+
+    def _match(self, query: str) -> PlaylistMatch | None:
+        with self._lock:
+            names, playlists = self._names, self._playlists
+        match = process.extractOne(query, names, scorer=fuzz.token_set_ratio, score_cutoff=self.score_cutoff)
+        if match is None:
+            return None
+        _, score, idx = match
+        p = playlists[idx]
+        return PlaylistMatch(p["id"], p.get("name") or "", p.get("uri") or f"spotify:playlist:{p['id']}", score)
+
+    def playlists(self) -> list:
+        """The indexed playlist objects (id, name, snapshot_id, ...) as of the last refresh."""
+        with self._lock:
+            return list(self._playlists)
+
+    def __len__(self):
+        return len(self._playlists)
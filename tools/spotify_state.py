@@ -0,0 +1,124 @@
+"""
+Cached Spotify device and playback state.
+
+Playback tools ask this for the device to target instead of calling
+sp.devices() themselves. State is refreshed lazily with an adaptive TTL: short
+for a while after a playback command (things are changing), long when idle.
+A "no active device" error drops the cache so the next command re-resolves it.
+Deliberately free of spotipy imports so the GUI can read `current` cheaply.
+"""
+
+import time
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# The PlaybackState the Spotify tools are using, once they've been loaded.
+current = None
+
+
+def is_no_device_error(e: Exception) -> bool:
+    reason = getattr(e, "reason", None)
+    if reason == "NO_ACTIVE_DEVICE":
+        return True
+    text = str(e).lower()
+    return "no active device" in text or "device not found" in text
+
+
+class PlaybackState:
+    def __init__(self, sp, active_ttl: float = 5.0, idle_ttl: float = 60.0, active_window: float = 30.0):
+        self.sp = sp
+        self.active_ttl = active_ttl
+        self.idle_ttl = idle_ttl
+        self.active_window = active_window
+        self.device = None     # {"id", "name", "type", ...}
+        self.track = None      # Web API track object, or a partial one we set ourselves
+        self.is_playing = False
+        self._fetched_at = None
+        self._last_command = None
+        self._lock = threading.Lock()
+        self.calls = Counter()  # API calls made here, by endpoint
+        self.hits = 0
+        self.refreshes = 0
+
+    @property
+    def ttl(self) -> float:
+        recent = self._last_command is not None and time.monotonic() - self._last_command < self.active_window
+        return self.active_ttl if recent else self.idle_ttl
+
+    @property
+    def stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl
+
+    def refresh(self):
+        """One current_playback call covers device and track; fall back to the device list when idle."""
+        with self._lock:
+            self.calls["current_playback"] += 1
+            playback = self.sp.current_playback()
+            if playback and playback.get("device"):
+                self.device = playback["device"]
+                self.track = playback.get("item")
+                self.is_playing = bool(playback.get("is_playing"))
+            else:
+                self.calls["devices"] += 1
+                devices = (self.sp.devices() or {}).get("devices", [])
+                self.device = next((d for d in devices if d.get("is_active")), devices[0] if devices else None)
+                self.track, self.is_playing = None, False
+            self._fetched_at = time.monotonic()
+            self.refreshes += 1
+
+    def device_id(self, force: bool = False) -> str | None:
+        """Id of the device to target, or None when Spotify has no device open."""
+        if force or self.stale or self.device is None:
+            self.refresh()
+        else:
+            self.hits += 1
+        return self.device["id"] if self.device else None
+
+    def invalidate(self):
+        with self._lock:
+            self._fetched_at = None
+            self.device = None
+
+    def handle_error(self, e: Exception) -> bool:
+        """Drop the cache on device errors. Returns True when the command is worth retrying."""
+        if is_no_device_error(e):
+            logger.info("spotify device went away (%s); invalidating cached state", e)
+            self.invalidate()
+            return True
+        return False
+
+    def note_command(self, track: dict | None = None, is_playing: bool | None = None, stale: bool = False):
+        """
+        Record what a playback command just did, so the GUI can show it without
+        polling. `stale=True` when the outcome isn't known (e.g. skip) so the next
+        device lookup re-reads it.
+        """
+        with self._lock:
+            self._last_command = time.monotonic()
+            if stale:
+                self._fetched_at = None
+            if track is not None:
+                self.track = track
+            if is_playing is not None:
+                self.is_playing = is_playing
+
+    def summary(self) -> str:
+        lookups = self.hits + self.refreshes
+        return (f"Spotify device cache: {self.hits}/{lookups} lookups served from cache, "
+                f"API calls {dict(self.calls)}, ttl now {self.ttl:.0f}s")
+
+    def describe(self) -> str:
+        """One-line now-playing text for the GUI; never calls the API."""
+        if self.device is None and self.track is None:
+            return ""
+        parts = []
+        if self.track:
+            artists = ", ".join(a["name"] for a in self.track.get("artists") or [])
+            name = self.track.get("name") or "?"
+            parts.append(f"{'▶' if self.is_playing else '⏸'} {name}" + (f" - {artists}" if artists else ""))
+        if self.device:
+            parts.append(f"on {self.device.get('name', '?')}")
+        return " ".join(parts)
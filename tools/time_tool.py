@@ -3,23 +3,21 @@
 from langchain.tools import tool
 from datetime import datetime
 import pytz
+from tools.timezones import get_index
+
+__requires__ = ("pytz",)
 
 @tool
 def get_time(city: str) -> str:
-    """Returns the current time in a given city."""
+    """Returns the current time in a given city, country or timezone. Several can be asked at once: "London, Tokyo and New York"."""
     try:
-        city_timezones = {
-            "new york": "America/New_York",
-            "london": "Europe/London",
-            "tokyo": "Asia/Tokyo",
-            "sydney": "Australia/Sydney"
-        }
-        city_key = city.lower()
-        if city_key not in city_timezones:
-            return f"Sorry, I don't know the timezone for {city}."
-
-        timezone = pytz.timezone(city_timezones[city_key])
-        current_time = datetime.now(timezone).strftime("%I:%M %p")
-        return f"The current time in {city.title()} is {current_time}."
+        lines = []
+        for name, place in get_index().lookup_many(city):
+            if place is None:
+                lines.append(f"Sorry, I don't know the timezone for {name}.")
+                continue
+            now = datetime.now(pytz.timezone(place.zone))
+            lines.append(f"The current time in {place.name} is {now.strftime('%I:%M %p')} ({now.tzname()}, {now.strftime('%a')}).")
+        return "\n".join(lines)
     except Exception as e:
         return f"Error: {e}"
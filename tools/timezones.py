@@ -0,0 +1,227 @@
+"""
+City/country/zone name -> IANA timezone index for the time tool.
+
+Built once, on first lookup, from:
+  - every IANA zone name in pytz ("Europe/London", its city part "London", legacy "US/Eastern"),
+  - pytz's country names ("Japan" -> the zone of its biggest known city),
+  - the bundled assets/cities.tsv (major cities with aliases and population),
+  - optionally a GeoNames cities*.txt dump (TIME_CITIES_FILE) for the full world table.
+
+Keys are normalized once (accents folded, lowercase, punctuation dropped), so a
+lookup is a dict hit, then a bisect over the sorted keys for prefixes, then a
+fuzzy match restricted to keys sharing the first letter and a similar length.
+"""
+
+import re
+import bisect
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+from collections import namedtuple
+from rapidfuzz import fuzz, process
+from core.response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+CITIES_FILE = Path(__file__).resolve().parent.parent / "assets" / "cities.tsv"
+
+Place = namedtuple("Place", "name zone country population")
+
+# Later sources win ties on equal population: a bundled city beats a zone's city part.
+_ZONE, _COUNTRY, _CITY = 0, 1, 2
+
+# Everyday names pytz doesn't use.
+_COUNTRY_ALIASES = {
+    "US": ("usa", "america", "united states of america", "the states"),
+    "GB": ("uk", "britain", "great britain", "england", "scotland", "wales"),
+    "AE": ("uae", "emirates"),
+    "KR": ("south korea",),
+    "KP": ("north korea",),
+    "NL": ("holland", "the netherlands"),
+    "CZ": ("czech republic",),
+}
+
+_HARD_SPLIT_RE = re.compile(r"\s*[,;]\s*")
+# "/" is soft too: "Europe/London" and "US/Eastern" are names, "London/Tokyo" isn't
+_SOFT_SPLIT_RE = re.compile(r"\s*(?:&|\+|/|\band\b|\bplus\b|\bvs\b\.?)\s*", re.IGNORECASE)
+_LEAD_RE = re.compile(r"^(?:the\s+)?(?:(?:current\s+)?time\s+)?(?:in|at|for)\s+", re.IGNORECASE)
+
+
+def normalize_place(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return normalize_prompt(text.replace("'", "").replace("&", " and "))
+
+
+def split_places(text: str) -> list:
+    """'London, Tokyo and New York' -> ['London', 'Tokyo', 'New York']."""
+    parts = (_LEAD_RE.sub("", p.strip()) for p in _HARD_SPLIT_RE.split(text or ""))
+    return [p for p in parts if p]
+
+
+class CityIndex:
+    def __init__(self, prefix_min: int = 3, prefix_scan: int = 256, fuzzy_cutoff: float = 82):
+        self.prefix_min = prefix_min
+        self.prefix_scan = prefix_scan
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._places = {}  # key -> (Place, rank)
+        self._keys = []
+        self._buckets = {}
+        self._windows = {}  # (first letter, length) -> fuzzy candidates, filled on demand
+
+    def __len__(self):
+        return len(self._places)
+
+    def add(self, name: str, zone: str, country: str = "", population: int = 0, aliases=(), rank: int = _CITY):
+        place = Place(name, zone, country, population)
+        for alias in (name, *aliases):
+            key = normalize_place(alias)
+            if not key:
+                continue
+            have = self._places.get(key)
+            if have is None or (population, rank) > (have[0].population, have[1]):
+                self._places[key] = (place, rank)
+
+    def freeze(self):
+        """Build the sorted key list and (first letter, length) buckets; call after the last add()."""
+        self._keys = sorted(self._places)
+        buckets = {}
+        for key in self._keys:
+            buckets.setdefault((key[0], len(key)), []).append(key)
+        self._buckets = buckets
+        self._windows = {}
+        return self
+
+    def _fuzzy_candidates(self, key: str) -> list:
+        window = (key[0], len(key))
+        out = self._windows.get(window)
+        if out is None:
+            # fuzz.ratio >= c needs the lengths within a factor of (2 - c) / c of each other
+            c = self.fuzzy_cutoff / 100
+            lo, hi = int(len(key) * c / (2 - c)), int(len(key) * (2 - c) / c) + 1
+            out = []
+            for n in range(lo, hi + 1):
+                out.extend(self._buckets.get((key[0], n), ()))
+            self._windows[window] = out
+        return out
+
+    def lookup(self, text: str):
+        """Best Place for `text` and how it matched ("exact", "prefix", "fuzzy"), or (None, None)."""
+        key = normalize_place(text)
+        if not key:
+            return None, None
+        hit = self._places.get(key)
+        if hit:
+            return hit[0], "exact"
+
+        if len(key) >= self.prefix_min:
+            i = bisect.bisect_left(self._keys, key)
+            best = None
+            for k in self._keys[i:i + self.prefix_scan]:
+                if not k.startswith(key):
+                    break
+                cand = self._places[k]
+                if best is None or (cand[0].population, cand[1]) > (best[0].population, best[1]):
+                    best = cand
+            if best:
+                return best[0], "prefix"
+
+        candidates = self._fuzzy_candidates(key)
+        if candidates:
+            match = process.extractOne(key, candidates, scorer=fuzz.ratio, score_cutoff=self.fuzzy_cutoff)
+            if match:
+                return self._places[match[0]][0], "fuzzy"
+        return None, None
+
+    def lookup_many(self, text: str) -> list:
+        """
+        [(asked, Place or None)] for every place named in `text`. "and"/"&"/"/" only
+        split a part that isn't itself a name, so "Trinidad and Tobago" and
+        "America/Argentina/Buenos_Aires" stay whole.
+        """
+        place, how = self.lookup(text)
+        if how == "exact":
+            return [(text.strip(), place)]
+        out = []
+        for part in split_places(text) or [text]:
+            place, how = self.lookup(part)
+            names = [p for p in _SOFT_SPLIT_RE.split(part) if p]
+            if how != "exact" and len(names) > 1:
+                out.extend((name, self.lookup(name)[0]) for name in names)
+            else:
+                out.append((part, place))
+        return out
+
+    def largest_cities(self) -> dict:
+        """Country code -> zone of its most populous known city."""
+        best = {}
+        for place, _ in self._places.values():
+            if place.country and place.population > best.get(place.country, (0, None))[0]:
+                best[place.country] = (place.population, place.zone)
+        return {code: zone for code, (_, zone) in best.items()}
+
+
+# ---------------- SOURCES ----------------
+
+def add_iana(index: CityIndex):
+    import pytz
+    for zone in pytz.all_timezones:
+        city = zone.rsplit("/", 1)[-1].replace("_", " ")
+        index.add(city, zone, aliases=(zone.replace("/", " "),), rank=_ZONE)
+
+
+def add_countries(index: CityIndex):
+    """Country names -> the zone of their biggest city (so "Australia" is Sydney, not Lord Howe), else their first zone."""
+    import pytz
+    main_zone = index.largest_cities()
+    for code, country in pytz.country_names.items():
+        zones = pytz.country_timezones.get(code)
+        zone = main_zone.get(code.upper()) or (zones[0] if zones else None)
+        if zone:
+            index.add(country, zone, code.upper(), aliases=_COUNTRY_ALIASES.get(code.upper(), ()), rank=_COUNTRY)
+
+
+def add_table(index: CityIndex, path: Path):
+    """The bundled table: name, aliases, country, zone, population (tab-separated)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, aliases, country, zone, population = line.rstrip("\n").split("\t")
+            index.add(name, zone, country, int(population or 0), [a for a in aliases.split(",") if a])
+
+
+def add_geonames(index: CityIndex, path: Path):
+    """A GeoNames cities*.txt dump (geonameid, name, asciiname, ..., country at 8, population at 14, zone at 17)."""
+    n = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18 or not cols[17]:
+                continue
+            index.add(cols[1], cols[17], cols[8], int(cols[14] or 0), (cols[2],))
+            n += 1
+    logger.info("loaded %d GeoNames cities from %s", n, path)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> CityIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            from core.config import TIME_CITIES_FILE
+            index = CityIndex()
+            add_iana(index)
+            if TIME_CITIES_FILE:
+                try:
+                    add_geonames(index, Path(TIME_CITIES_FILE))
+                except OSError as e:
+                    logger.warning("couldn't read TIME_CITIES_FILE: %s", e)
+            add_table(index, CITIES_FILE)
+            add_countries(index)
+            _index = index.freeze()
+        return _index
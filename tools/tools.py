@@ -2,14 +2,18 @@
 Tools and helper functions for OpenAI integration.
 """
 import json
+import inspect
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 from ctypes import cast, POINTER
 from langchain.tools import tool
 from comtypes import CLSCTX_ALL
 
+__requires__ = ("pycaw",)
+__platforms__ = ("Windows",)
+
 # --------------------- Volume Tool ---------------------
 @tool
-def change_volume(new_volume):
+def change_volume(new_volume: float):
 
     """Handles Computer's volume %
        - new_volume is the argument for this function, it is a float.
@@ -52,11 +56,14 @@ def tool_to_openai(tool):
         "required": schema.get("required", [])
     }
     
+    # Docstrings carry their source indentation; it's sent on every request, so drop it.
+    description = inspect.cleandoc(tool.description or tool.__doc__ or "No description available")
+
     return {
         "type": "function",
         "function": {
             "name": tool.name,
-            "description": tool.description or tool.__doc__ or "No description available",
+            "description": description,
             "parameters": parameters
         }
     }
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Web search behind the duckduckgo_search tool.
+
+`WebSearch` asks a backend for the top N results (title, URL, snippet), then
+fetches the first few pages concurrently and pulls out their main text, each
+fetch bounded by a timeout. Reports are cached per normalized query.
+
+The backend is pluggable: DuckDuckGo by default, or any HTTP service that
+answers `GET <url>?q=...&n=...` with a JSON list of {title, href, body}
+(WEB_SEARCH_BACKEND=<url>, e.g. the benchmark's fake search server).
+"""
+
+import re
+import time
+import codecs
+import logging
+import threading
+from collections import Counter
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from core.cache import TTLCache
+from core.response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+# The WebSearch the search tool is using, once it's been loaded.
+current = None
+_current_lock = threading.Lock()
+
+_USER_AGENT = "Mozilla/5.0 (assistant web search)"
+_MAX_PAGE_BYTES = 1_500_000
+_HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+# ---------------- BACKENDS ----------------
+
+class DDGSBackend:
+    """DuckDuckGo text search over one DDGS session reused across queries."""
+
+    def __init__(self, region: str = "wt-wt", safesearch: str = "Moderate"):
+        self.region = region
+        self.safesearch = safesearch
+        self._ddgs = None
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str, n: int) -> list:
+        from duckduckgo_search import DDGS
+        with self._lock:
+            if self._ddgs is None:
+                self._ddgs = DDGS()
+            try:
+                return list(self._ddgs.text(query, region=self.region, safesearch=self.safesearch, max_results=n) or [])
+            except Exception:
+                self._ddgs = None  # don't keep a session that just failed
+                raise
+
+
+class HTTPBackend:
+    """Any service answering GET <url>?q=&n= with a JSON list of results."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def __call__(self, query: str, n: int) -> list:
+        resp = self._session.get(self.url, params={"q": query, "n": n}, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+
+# ---------------- PAGE TEXT ----------------
+
+class _TextExtractor(HTMLParser):
+    """Collects paragraph-ish text, skipping scripts, navigation and page chrome."""
+
+    SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "button", "select"}
+    BLOCKS = {"p", "li", "h1", "h2", "h3", "h4", "td", "blockquote", "pre", "div", "article", "section", "br"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._buf = []
+        self._skip = 0
+        self.title = ""
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCKS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCKS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._buf.append(data)
+
+    def _flush(self):
+        text = " ".join("".join(self._buf).split())
+        self._buf = []
+        if text:
+            self.blocks.append(text)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_text(html: str, limit: int = 1200) -> str:
+    """Main text of a page: its sentence-like blocks, in order, up to `limit` characters."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    # menus and link lists are short fragments; body text has sentences
+    blocks = [b for b in parser.blocks if len(b) >= 60 or b.endswith((".", "!", "?"))]
+    out, size = [], 0
+    for block in blocks:
+        if size + len(block) > limit:
+            out.append(block[:max(0, limit - size)].rsplit(" ", 1)[0] + "…")
+            break
+        out.append(block)
+        size += len(block) + 1
+    return "\n".join(b for b in out if b.strip("…"))
+
+
+def page_encoding(content_type: str, body: bytes) -> str:
+    """
+    The charset from the Content-Type header, else the page's <meta charset>,
+    else a guess from the bytes. requests' ISO-8859-1 default for text/html
+    without a charset would garble most of today's (UTF-8) pages.
+    """
+    found = _HEADER_CHARSET_RE.search(content_type or "") or _META_CHARSET_RE.search(body[:4096])
+    if found:
+        name = found.group(1)
+        name = name.decode("ascii", "ignore") if isinstance(name, bytes) else name
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    from requests.compat import chardet
+    guess = chardet.detect(body).get("encoding") if chardet and body else None
+    return guess or "utf-8"
+
+
+# ---------------- SEARCH ----------------
+
+class WebSearch:
+    def __init__(self, backend=None, ttl: float = 600.0, maxsize: int = 128, workers: int = 4,
+                 page_timeout: float = 4.0, text_limit: int = 1200):
+        self.backend = backend or DDGSBackend()
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.page_timeout = page_timeout
+        self.text_limit = text_limit
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="web-fetch")
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = _USER_AGENT
+        self._lock = threading.Lock()
+        self.stats = Counter()  # searches, cache_hits, pages, page_timeouts, page_errors, search_s, fetch_s
+
+    def search(self, query: str, n: int = 5, fetch: int = 2) -> dict:
+        """
+        Top `n` results for `query`, the first `fetch` of them with page text.
+        Returns {"query", "results": [{title, href, body, text}], "timings", "cached"}.
+        """
+        key = (normalize_prompt(query), n, fetch)
+        hit = self.cache.get(key)
+        with self._lock:
+            self.stats["searches"] += 1
+        if hit is not None:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return {**hit, "cached": True}
+
+        start = time.perf_counter()
+        raw = self.backend(query, n) or []
+        results = [{"title": (r.get("title") or "").strip(), "href": r.get("href") or r.get("url") or "",
+                    "body": (r.get("body") or r.get("snippet") or "").strip(), "text": ""}
+                   for r in raw[:n]]
+        searched = time.perf_counter()
+        self._fetch_pages([r for r in results if r["href"]][:fetch])
+        done = time.perf_counter()
+
+        timings = {"search": searched - start, "fetch": done - searched, "total": done - start}
+        with self._lock:
+            self.stats["search_s"] += timings["search"]
+            self.stats["fetch_s"] += timings["fetch"]
+        report = {"query": query, "results": results, "timings": timings}
+        if results:
+            self.cache.set(key, report)
+        return {**report, "cached": False}
+
+    def _fetch_pages(self, results: list):
+        if not results:
+            return
+        futures = {self._pool.submit(self._page_text, r["href"]): r for r in results}
+        # each request has its own timeout; this bounds the whole batch in case a server trickles bytes
+        finished, pending = wait(futures, timeout=self.page_timeout + 0.5)
+        for future in finished:
+            try:
+                futures[future]["text"] = future.result()
+            except Exception as e:
+                with self._lock:
+                    self.stats["page_errors"] += 1
+                logger.info("couldn't fetch %s: %s", futures[future]["href"], e)
+        with self._lock:
+            self.stats["pages"] += len(finished)
+            self.stats["page_timeouts"] += len(pending)
+        for future in pending:
+            future.cancel()
+
+    def _page_text(self, url: str) -> str:
+        deadline = time.monotonic() + self.page_timeout
+        with self._session.get(url, timeout=(min(2.0, self.page_timeout), self.page_timeout), stream=True) as resp:
+            resp.raise_for_status()
+            if "html" not in resp.headers.get("Content-Type", "text/html"):
+                return ""
+            chunks, size = [], 0
+            for chunk in resp.iter_content(chunk_size=65536):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= _MAX_PAGE_BYTES or time.monotonic() > deadline:
+                    break
+            body = b"".join(chunks)
+            html = body.decode(page_encoding(resp.headers.get("Content-Type", ""), body), errors="replace")
+        return extract_text(html, self.text_limit)
+
+    def summary(self) -> str:
+        s = self.stats
+        live = s["searches"] - s["cache_hits"]
+        text = f"Web search: {s['searches']} searches, {s['cache_hits']} from cache"
+        if live:
+            text += (f", avg {s['search_s'] / live * 1000:.0f}ms search + {s['fetch_s'] / live * 1000:.0f}ms page fetch, "
+                     f"{s['pages']} pages read, {s['page_timeouts']} timed out, {s['page_errors']} failed")
+        return text
+
+
+def get_searcher() -> WebSearch:
+    """The shared WebSearch: WEB_SEARCH_BACKEND if set, else DuckDuckGo if duckduckgo_search is installed."""
+    global current
+    with _current_lock:
+        if current is None:
+            from core.capabilities import cap
+            from core.config import (WEB_SEARCH_BACKEND, WEB_SEARCH_TTL, WEB_SEARCH_WORKERS,
+                                     WEB_SEARCH_PAGE_TIMEOUT)
+            if WEB_SEARCH_BACKEND:
+                backend = HTTPBackend(WEB_SEARCH_BACKEND)
+            elif cap.get("duckduckgo_search"):
+                backend = DDGSBackend()
+            else:
+                raise RuntimeError("no search backend; install duckduckgo_search or set WEB_SEARCH_BACKEND")
+            current = WebSearch(backend, ttl=WEB_SEARCH_TTL, workers=WEB_SEARCH_WORKERS,
+                                page_timeout=WEB_SEARCH_PAGE_TIMEOUT)
+        return current
+
+
+def format_report(report: dict, max_chars: int = 500) -> str:
+    """Readable tool output: every result's snippet, plus page text where it was fetched."""
+    lines = []
+    for i, r in enumerate(report["results"], 1):
+        lines.append(f"{i}. {r['title'] or r['href']}")
+        lines.append(f"   🔗 {r['href']}")
+        if r["body"]:
+            lines.append(f"   {r['body']}")
+        if r["text"]:
+            text = r["text"] if len(r["text"]) <= max_chars else r["text"][:max_chars].rsplit(" ", 1)[0] + "…"
+            lines.append("   » " + re.sub(r"\s*\n\s*", " ", text))
+        lines.append("")
+    return "\n".join(lines).rstrip()